@@ -4,54 +4,62 @@ import suppress_warnings
 import streamlit as st
 from openai import OpenAI
 from streamlit.logger import get_logger
-from utils import summary_generator
+from utils import openai_pool, summary_generator
 from utils.helper import check_availability
 from utils.model_config import get_flattened_models, estimate_cost, get_model_recommendation, calculate_cost
 from utils.pdf_generator import generate_pdf_from_summary, get_filename
-from utils.power_ranking_generator import generate_sleeper_power_rankings, get_sleeper_power_rankings_data
-import traceback
+from utils.power_ranking_generator import generate_power_rankings, get_power_rankings_data
+from utils.season_data import EspnSeasonSource, SleeperSeasonSource, YahooSeasonSource
+from utils.cache_policy import get_cache_stats
+from utils.http_client import get_connection_stats
+from utils.rate_limiter import get_rate_limit_stats
+from utils.hedging import get_hedging_stats
+from utils.job_runner import FAILED, get_job_runner
+from utils.completion_cache import get_completion_cache_stats
+from utils.stream_events import Error, Route, TextDelta, Timing, Usage
+from utils.stream_renderer import StreamRenderer, get_render_stats
+from utils.token_counter import tokenizer_status
+from utils.model_router import DEFAULT_COST_CEILING, DEFAULT_LATENCY_BUDGET, get_model_router_stats, stream_routed_summary
+from utils.persona_fanout import FANOUT_CONCURRENCY, build_variants, run_variants
+from utils.admission import admitted, get_admission_stats
 import requests
 import json
+import os
 import tempfile
 from requests.auth import HTTPBasicAuth
 import time
-import shutil
+import uuid
+from contextlib import ExitStack, nullcontext
 from datetime import datetime, timedelta
 import pandas as pd
 
 LOGGER = get_logger(__name__)
 
+# Seconds between checks of a running background recap job (redraws are throttled separately)
+JOB_POLL_INTERVAL = 0.05
+
 OPEN_AI_ORG_ID = st.secrets["OPENAI_ORG_ID"]
 OPEN_AI_PROJECT_ID = st.secrets["OPENAI_API_PROJECT_ID"]
 OPENAI_API_KEY = st.secrets["OPENAI_COMMISH_API_KEY"]
 
-# Initialize client as None - will be created when needed
+# Fallback client, used only if the pooled client can't be built
 client = None
 
 def get_openai_client():
-    """Initialize OpenAI client when needed to avoid startup conflicts"""
+    """Return the shared, pre-warmed OpenAI client (see utils.openai_pool)"""
     global client
+    try:
+        return openai_pool.get_openai_client(OPEN_AI_ORG_ID, OPEN_AI_PROJECT_ID, OPENAI_API_KEY)
+    except Exception as e:
+        LOGGER.error(f"Failed to initialize pooled OpenAI client: {e}")
     if client is None:
+        # Fallback to basic client without HTTP client customization
         try:
-            # Import httpx to create a clean HTTP client
-            import httpx
-            http_client = httpx.Client(
-                timeout=30.0,
-                limits=httpx.Limits(max_keepalive_connections=1, max_connections=5)
-            )
-            client = OpenAI(
-                organization=OPEN_AI_ORG_ID,
-                project=OPEN_AI_PROJECT_ID,
-                api_key=OPENAI_API_KEY,
-                http_client=http_client
-            )
-        except Exception as e:
-            # Fallback to basic client without HTTP client customization
-            try:
-                client = OpenAI(api_key=OPENAI_API_KEY)
-            except Exception as e2:
-                st.error(f"Failed to initialize OpenAI client: {e2}")
-                return None
+            client = OpenAI(api_key=OPENAI_API_KEY)
+        except Exception as e2:
+            # Called from background jobs, so log rather than st.error
+            LOGGER.error(f"Failed to initialize OpenAI client: {e2}")
+            return None
     return client
 
 def check_authentication():
@@ -110,7 +118,705 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+def fetch_league_summary(job, params):
+    """Fetch the league stats summary for a recap job (job thread, no Streamlit calls)."""
+    league_type = params['league_type']
+    league_id = params['league_id']
+
+    # Moderate the character description
+    job.update(progress=15, stage='Validating character...')
+    # if not summary_generator.moderate_text(client, character_description):
+    #     raise ValueError("The character description contains inappropriate content. Please try again.")
+
+    # Fetching league summary
+    job.update(progress=30, stage='Fetching league summary...', phase='fetch')
+    if league_type == "ESPN":
+        LOGGER.debug("Attempting ESPN summary generator...")
+        summary, debug_info = summary_generator.get_espn_league_summary(
+            league_id, params['espn2'], params['swid']
+        )
+        LOGGER.debug("~~ESPN DEBUG BELOW~~")
+        LOGGER.debug(debug_info)
+        LOGGER.debug("~~ESPN SUMMARY BELOW~~")
+        LOGGER.debug(summary)
+    elif league_type == "Yahoo":
+        # The auth directory belongs to the session; the power rankings panel keeps using it
+        summary = summary_generator.get_yahoo_league_summary(league_id, params['temp_dir'])
+        LOGGER.debug(summary)
+    else:
+        summary = summary_generator.generate_sleeper_summary(
+            league_id  
+        )
+        LOGGER.info(f"Generated Sleeper Summary: \n{summary}")
+        job.update(league_summary=summary)  # Shown with st.text to preserve formatting
+
+    return summary
+
+
+def run_recap_job(job, params):
+    """
+    Fetch league stats and stream the AI recap; runs on the background job runner.
+
+    Must not call Streamlit APIs: progress, the league summary and streamed
+    text are reported through the job and rendered by render_recap_job.
+    """
+    character_description = params['character_description']
+    trash_talk_level = params['trash_talk_level']
+    summary = fetch_league_summary(job, params)
+
+    job.update(progress=50, phase='llm')
+    LOGGER.debug("Initializing GPT Summary Stream...")
+    openai_client = get_openai_client()
+    if openai_client is None:
+        raise RuntimeError("Failed to initialize OpenAI client")
+
+    full_response = ""  # Variable to store the full response as it streams
+    usage = None  # Token usage for cost calculation
+    timing = None
+    route = None
+    ticket = None
+
+    with ExitStack() as admission:
+        job.update(stage='Generating AI summary...')
+        # The router may pick a faster or cheaper model, or fail over on 429/5xx
+        gpt4_summary_stream = stream_routed_summary(
+            openai_client, summary, character_description, trash_talk_level, params['model'], params['summary_format'],
+            latency_budget=params.get('latency_budget'), cost_ceiling=params.get('cost_ceiling'),
+        )
+        for event in gpt4_summary_stream:
+            if ticket is not None:
+                ticket.observe(event)
+            if isinstance(event, Route):
+                route = event
+                LOGGER.info(f"Summary routing: {route}")
+                # Pre-flight estimate from the exact prompt, shown while the recap streams
+                preflight = summary_generator.estimate_summary_cost(
+                    summary, character_description, trash_talk_level, route.model, params['summary_format']
+                )
+                job.update(route=route, preflight=preflight)
+                # Admission is decided on the model the router actually picked (the stream waits
+                # here before calling it); cached recaps are replayed without the API and skip the queue
+                if ticket is None and summary_generator.get_cached_summary(
+                    summary, character_description, trash_talk_level, route.model, params['summary_format']
+                ) is None:
+                    ticket = admission.enter_context(
+                        wait_for_admission(job, preflight.get('estimated_total_tokens', 0))
+                    )
+                    job.update(stage='Generating AI summary...')
+            elif isinstance(event, TextDelta):
+                full_response += event.text
+                job.append_output(event.text)
+            elif isinstance(event, Usage):
+                usage = event
+            elif isinstance(event, Timing):
+                timing = event
+                LOGGER.info(f"Summary generation timing: {timing}")
+            elif isinstance(event, Error):
+                raise RuntimeError(event.detail)
+    LOGGER.debug("GPT Stream completed!")
+
+    return {
+        'summary': summary,
+        'full_response': full_response,
+        'usage': usage,
+        'timing': timing,
+        'route': route,
+        'last_summary': {
+            'content': full_response,
+            'character': character_description,
+            'league_name': "Fantasy Football League",  # Could be made configurable
+            'week_number': "Week Recap",  # Could be extracted from data
+            'summary_format': params['summary_format'],
+            'trash_talk_level': trash_talk_level,
+            'generated_at': datetime.now().isoformat()
+        },
+    }
+
+
+def wait_for_admission(job, tokens, slots=1):
+    """Admission slot for a job's generation, reporting its place in the queue as the job stage."""
+    def on_wait(position):
+        job.update(stage=f'Waiting for an AI slot: #{position} in line...', queue_position=position)
+    return admitted(job.key[0], tokens, slots, on_wait)
+
+
+def make_async_openai_client():
+    """AsyncOpenAI client for concurrent persona variants (built once on the fan-out loop)."""
+    return openai_pool.build_async_openai_client(OPEN_AI_ORG_ID, OPEN_AI_PROJECT_ID, OPENAI_API_KEY)
+
+
+def run_variants_job(job, params):
+    """
+    Fetch league stats once and generate every persona/format variant concurrently.
+
+    Each variant streams into its own job output stream, keyed by Variant.key.
+    """
+    summary = fetch_league_summary(job, params)
+    variants = build_variants(params['characters'], params['summary_formats'])
+
+    job.update(progress=50, phase='llm')
+    results = {variant.key: {'full_response': "", 'usage': None, 'timing': None, 'error': None} for variant in variants}
+
+    def on_event(variant, event):
+        if ticket is not None:
+            ticket.observe(event)
+        result = results[variant.key]
+        if isinstance(event, TextDelta):
+            result['full_response'] += event.text
+            job.append_output(event.text, stream=variant.key)
+        elif isinstance(event, Usage):
+            result['usage'] = event
+        elif isinstance(event, Timing):
+            result['timing'] = event
+            LOGGER.info(f"Summary generation timing ({variant.key}): {event}")
+        elif isinstance(event, Error):
+            result['error'] = event.message
+            LOGGER.error(f"Variant {variant.key} failed: {event.detail}")
+
+    # One admission slot per variant generated at the same time; cached variants are replayed for free
+    uncached = [
+        variant for variant in variants
+        if summary_generator.get_cached_summary(
+            summary, variant.character, params['trash_talk_level'], params['model'], variant.summary_format
+        ) is None
+    ]
+    estimated_tokens = sum(
+        summary_generator.estimate_summary_cost(
+            summary, variant.character, params['trash_talk_level'], params['model'], variant.summary_format
+        ).get('estimated_total_tokens', 0)
+        for variant in uncached
+    )
+    slots = max(min(len(uncached), FANOUT_CONCURRENCY), 1)
+    admission_slot = wait_for_admission(job, estimated_tokens, slots) if uncached else nullcontext()
+    with admission_slot as ticket:
+        job.update(stage=f'Generating {len(variants)} AI summaries...')
+        started = time.monotonic()
+        run_variants(make_async_openai_client, summary, variants, params['trash_talk_level'], params['model'], on_event,
+                     max_concurrency=slots)
+    LOGGER.info(f"Generated {len(variants)} variants in {time.monotonic() - started:.1f}s")
+
+    if all(result['error'] for result in results.values()):
+        raise RuntimeError(next(iter(results.values()))['error'])
+
+    generated_at = datetime.now().isoformat()
+    for variant in variants:
+        results[variant.key]['last_summary'] = {
+            'content': results[variant.key]['full_response'],
+            'character': variant.character,
+            'league_name': "Fantasy Football League",
+            'week_number': "Week Recap",
+            'summary_format': variant.summary_format,
+            'trash_talk_level': params['trash_talk_level'],
+            'generated_at': generated_at
+        }
+    return {'summary': summary, 'variants': [variant.key for variant in variants], 'results': results}
+
+
+def get_session_key():
+    """Stable identifier for this browser session, used to key background jobs."""
+    if 'session_key' not in st.session_state:
+        st.session_state['session_key'] = uuid.uuid4().hex
+    return st.session_state['session_key']
+
+
+def show_recap_error(job):
+    """Display a user-friendly error for a failed recap job."""
+    error_str = job.error or ""
+    if job.data.get('phase') == 'llm':
+        LOGGER.error(f"An error occurred while streaming GPT response: {error_str}")
+        # Display user-friendly error messages for OpenAI API issues
+        if "insufficient_quota" in error_str or "429" in error_str:
+            st.error("⚠️ **OpenAI API Quota Exceeded**\n\nYour OpenAI API credits have been exhausted. Please check your billing plan at [OpenAI Platform](https://platform.openai.com/billing) or try again later.")
+        elif "401" in error_str or "unauthorized" in error_str.lower():
+            st.error("🔐 **OpenAI API Authentication Failed**\n\nThe API key appears to be invalid or expired. Please contact support to resolve this issue.")
+        elif "503" in error_str or "service_unavailable" in error_str:
+            st.error("🔧 **OpenAI Service Unavailable**\n\nOpenAI's service is temporarily unavailable. Please try again in a few minutes.")
+        elif "rate_limit" in error_str.lower() or "too_many_requests" in error_str.lower():
+            st.error("⏱️ **Rate Limit Exceeded**\n\nToo many requests have been made recently. Please wait a moment and try again.")
+        elif "generation slot" in error_str:
+            st.error("🚦 **Commish Is Busy**\n\nMany recaps are being generated right now and yours waited too long in line. Please try again in a few minutes.")
+        else:
+            st.error(f"❌ **Unexpected Error**\n\nSomething went wrong while generating your summary. Please try again later.")
+    else:
+        LOGGER.error(f"An error occurred in main form processing: {error_str}")
+        # Handle common errors gracefully
+        if "league not found" in error_str.lower() or "invalid league" in error_str.lower():
+            st.error("🏈 **League Not Found**\n\nThe league ID you provided could not be found. Please double-check your league ID and try again.")
+        elif "authentication" in error_str.lower() or "invalid credentials" in error_str.lower():
+            st.error("🔐 **Authentication Failed**\n\nThere was an issue with your login credentials. Please verify your information and try again.")
+        elif "network" in error_str.lower() or "connection" in error_str.lower():
+            st.error("🌐 **Network Error**\n\nUnable to connect to the fantasy sports service. Please check your internet connection and try again.")
+        else:
+            st.error("❌ **Something Went Wrong**\n\nAn unexpected error occurred while processing your request. Please try again.")
+
+    # Only show detailed error in debug mode
+    if st.session_state.get('debug_mode', False):
+        with st.expander("Debug Information"):
+            st.text(job.error_traceback or error_str)
+
+
+def render_recap_result(result):
+    """Cost breakdown, PDF export and copy section for a completed recap."""
+    full_response = result['full_response']
+    usage = result['usage']
+    timing = result['timing']
+    route = result.get('route')
+    last_summary = result['last_summary']
+
+    # Display cost information if usage data is available
+    if usage is not None:
+        cost_info = calculate_cost(usage, usage.model)
+        if "total_cost" in cost_info:
+            st.success("✅ **Summary Generated Successfully!**")
+            
+            # Create cost breakdown display
+            col1, col2 = st.columns(2)
+            with col1:
+                st.metric("📊 Total Tokens", f"{cost_info['total_tokens']:,}")
+                st.metric("💰 Total Cost", f"${cost_info['total_cost']:.6f}")
+            
+            with col2:
+                st.metric("📝 Input Tokens", f"{cost_info['prompt_tokens']:,}")
+                st.metric("🎯 Output Tokens", f"{cost_info['completion_tokens']:,}")
+            
+            # Show detailed breakdown
+            with st.expander("💳 **Cost Breakdown**"):
+                st.write(f"**Model Used:** {usage.model}")
+                if usage.estimated:
+                    st.warning("⚠️ **Note:** Token counts are estimated (actual usage tracking unavailable)")
+                if usage.from_cache:
+                    st.info(f"♻️ **Served from the response cache** - no API tokens billed (original generation used {usage.original_tokens:,} tokens)")
+                st.write(f"**Input Cost:** ${cost_info['prompt_cost']:.6f} ({cost_info['prompt_tokens']:,} tokens)")
+                if cost_info.get('cached_tokens'):
+                    st.write(f"**Prompt Cache:** {cost_info['cached_tokens']:,} input tokens cached, saving ${cost_info['cache_savings']:.6f}")
+                st.write(f"**Output Cost:** ${cost_info['completion_cost']:.6f} ({cost_info['completion_tokens']:,} tokens)")
+                if timing is not None:
+                    ttft = f"{timing.time_to_first_token:.2f}s" if timing.time_to_first_token is not None else "n/a"
+                    st.write(f"**Latency:** {timing.total_seconds:.1f}s total, {ttft} to first token, {timing.tokens_per_second:.0f} tokens/s")
+                if route is not None and (route.rerouted or route.notes):
+                    st.write(f"**Routing:** requested {route.requested_model}, generated with {route.model}")
+                    for note in route.notes:
+                        st.caption(f"🧭 {note}")
+                
+                # Show cost comparison with other models
+                if usage.model == 'gpt-4o-mini':
+                    st.info("💡 **Great choice!** GPT-4o Mini offers excellent creativity at a budget-friendly price.")
+                elif usage.model in ['gpt-5', 'gpt-4o']:
+                    savings_vs_gpt5 = (0.012 - cost_info['total_cost']) if cost_info['total_cost'] < 0.012 else 0
+                    if savings_vs_gpt5 > 0:
+                        st.info(f"💰 **You saved ~${savings_vs_gpt5:.4f}** compared to premium models!")
+    else:
+        # Fallback: Show a simple message if no usage data was captured
+        LOGGER.warning("No usage info available for cost display")
+        st.info("💡 **Summary generated successfully!** Cost tracking temporarily unavailable - trying to capture usage data in future versions.")
+    
+    # PDF Export Section - Generate PDF immediately and provide download
+    st.markdown("---")
+    st.markdown("**📄 Export Options**")
+    
+    # Generate PDF automatically and provide download button
+    try:
+        with st.spinner("🎨 Creating your beautiful PDF..."):
+            pdf_bytes = get_summary_pdf(last_summary)
+            
+            # Generate filename
+            filename = get_filename(
+                league_name=last_summary['league_name'],
+                week_number="Week_Recap", 
+                character=last_summary['character']
+            )
+        
+        # Create columns for the download options
+        col1, col2 = st.columns([1, 1])
+        
+        with col1:
+            # Provide download button for PDF
+            st.download_button(
+                label="🎯 Download PDF",
+                data=pdf_bytes,
+                file_name=filename,
+                mime="application/pdf",
+                help="Click to download your fantasy football recap as a PDF",
+                width='stretch'
+            )
+            st.success("✅ PDF ready for download!")
+        
+        with col2:
+            st.markdown("**Or copy the text below:**")
+        
+    except Exception as e:
+        st.error(f"❌ Error generating PDF: {str(e)}")
+        LOGGER.error(f"PDF generation error: {str(e)}")
+        # Still show copy option even if PDF fails
+        st.markdown("**Copy the text below:**")
+    
+    # Text copy section
+    st.markdown("**Click the copy icon** 📋 below in top right corner to copy your summary text:")
+    st.code(full_response, language="")
+
+
+def render_recap_job(job):
+    """
+    Poll a recap job, rendering progress and the partial stream until it finishes.
+
+    If the user interacts with another widget, Streamlit interrupts this loop
+    and reruns the script; the job keeps running and is picked up again here.
+    """
+    progress = st.progress(job.progress, text=job.stage)
+    preflight_placeholder = st.empty()
+    league_summary_placeholder = st.empty()
+    with st.chat_message("Commish", avatar="🤖"):
+        message_placeholder = st.empty()  # Placeholder for streamed message
+
+    def draw_message(text, final):
+        message_placeholder.markdown(text if final else text + "▌")  # Display partial message with a cursor-like symbol
+
+    # Chunks are coalesced and redrawn at a fixed frame rate, not once per chunk
+    renderer = StreamRenderer(draw_message)
+    shown_stage = (job.progress, job.stage)
+    read_from = 0
+    league_summary_shown = False
+    shown_preflight = None
+    while True:
+        finished = job.finished
+        if (job.progress, job.stage) != shown_stage:
+            shown_stage = (job.progress, job.stage)
+            progress.progress(job.progress, text=job.stage)
+        if not league_summary_shown and 'league_summary' in job.data:
+            league_summary_placeholder.text(job.data['league_summary'])
+            league_summary_shown = True
+        preflight = job.data.get('preflight')
+        if preflight is not shown_preflight and 'estimated_total_cost' in (preflight or {}):
+            route = job.data.get('route')
+            routed = f" with {route.model} (requested {route.requested_model})" if route is not None and route.rerouted else ""
+            preflight_placeholder.caption(
+                f"💰 Estimated cost{routed}: ~${preflight['estimated_total_cost']:.4f} "
+                f"({preflight['estimated_input_tokens']:,} input + ~{preflight['estimated_output_tokens']:,} output tokens)"
+            )
+            shown_preflight = preflight
+        new_text, read_from = job.read_output(read_from)
+        renderer.push(new_text)
+        if finished:
+            renderer.flush()
+            break
+        time.sleep(JOB_POLL_INTERVAL)
+
+    if st.session_state.get('debug_mode', False):
+        st.caption(f"Render stats: {renderer.stats()}")
+
+    if job.status == FAILED:
+        show_recap_error(job)
+        return
+
+    result = job.result
+    # Store summary data in session state for PDF export (once per job)
+    if st.session_state.get('last_summary_job_id') != job.id:
+        st.session_state['last_summary'] = result['last_summary']
+        st.session_state['last_summary_job_id'] = job.id
+    render_recap_result(result)
+
+
+def render_variants_job(job):
+    """Poll a multi-persona job, streaming each variant into its own side-by-side panel."""
+    variant_keys = [variant.key for variant in build_variants(job.data['characters'], job.data['summary_formats'])]
+    progress = st.progress(job.progress, text=job.stage)
+    shown_stage = (job.progress, job.stage)
+
+    panels = {}
+    columns_per_row = min(len(variant_keys), 3)
+    for row_start in range(0, len(variant_keys), columns_per_row):
+        for column, key in zip(st.columns(columns_per_row), variant_keys[row_start:row_start + columns_per_row]):
+            with column:
+                st.markdown(f"**{key}**")
+                placeholder = st.empty()
+                panels[key] = {
+                    'column': column,
+                    'renderer': StreamRenderer(
+                        lambda text, final, placeholder=placeholder: placeholder.markdown(text if final else text + "▌")
+                    ),
+                    'read_from': 0,
+                }
+
+    while True:
+        finished = job.finished
+        if (job.progress, job.stage) != shown_stage:
+            shown_stage = (job.progress, job.stage)
+            progress.progress(job.progress, text=job.stage)
+        for key, panel in panels.items():
+            new_text, panel['read_from'] = job.read_output(panel['read_from'], stream=key)
+            panel['renderer'].push(new_text)
+        if finished:
+            for panel in panels.values():
+                panel['renderer'].flush()
+            break
+        time.sleep(JOB_POLL_INTERVAL)
+
+    if job.status == FAILED:
+        show_recap_error(job)
+        return
+
+    results = job.result['results']
+    total_cost = 0.0
+    for key, panel in panels.items():
+        result = results[key]
+        with panel['column']:
+            if result['error']:
+                st.error(result['error'])
+                continue
+            usage, timing = result['usage'], result['timing']
+            if usage is not None:
+                cost_info = calculate_cost(usage, usage.model)
+                total_cost += cost_info.get('total_cost', 0.0)
+                caption = f"💰 ${cost_info.get('total_cost', 0.0):.6f} · {usage.total_tokens:,} tokens"
+                if usage.from_cache:
+                    caption += " · ♻️ cached"
+                if timing is not None:
+                    caption += f" · {timing.total_seconds:.1f}s"
+                st.caption(caption)
+            try:
+                st.download_button(
+                    label="🎯 Download PDF",
+                    data=get_summary_pdf(result['last_summary']),
+                    file_name=get_filename(
+                        league_name=result['last_summary']['league_name'],
+                        week_number="Week_Recap",
+                        character=result['last_summary']['character']
+                    ),
+                    mime="application/pdf",
+                    key=f"variant_pdf_{job.id}_{key}"
+                )
+            except Exception as e:
+                st.error(f"❌ Error generating PDF: {str(e)}")
+                LOGGER.error(f"PDF generation error: {str(e)}")
+    st.success(f"✅ **{len(panels)} summaries generated** - total cost ${total_cost:.6f}")
+
+
+def get_summary_pdf(summary_data):
+    """PDF bytes for a stored summary; pdf_generator builds each recap once per process."""
+    return generate_pdf_from_summary(
+        summary_content=summary_data['content'],
+        character=summary_data['character'],
+        league_name=summary_data['league_name'],
+        week_number=summary_data['week_number'],
+        summary_format=summary_data['summary_format'],
+        trash_talk_level=summary_data['trash_talk_level']
+    )
+
+
+@st.fragment
+def last_summary_panel():
+    """Last generated summary with its PDF export; reruns on its own."""
+    if 'last_summary' not in st.session_state:
+        return
+    st.markdown("---")
+    st.markdown("### 📄 Last Generated Summary")
+
+    summary_data = st.session_state['last_summary']
+    generated_time = datetime.fromisoformat(summary_data['generated_at']).strftime("%B %d, %Y at %I:%M %p")
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.markdown(f"**Generated:** {generated_time}")
+        st.markdown(f"**Character:** {summary_data['character']} | **Format:** {summary_data['summary_format']} | **Intensity:** Level {summary_data['trash_talk_level']}")
+
+    with col2:
+        # PDF export from session state
+        try:
+            pdf_bytes = get_summary_pdf(summary_data)
+
+            filename = get_filename(
+                league_name=summary_data['league_name'],
+                week_number=summary_data['week_number'],
+                character=summary_data['character']
+            )
+
+            st.download_button(
+                label="🎯 Download PDF",
+                data=pdf_bytes,
+                file_name=filename,
+                mime="application/pdf",
+                help="Download your last generated recap as a PDF",
+                key="header_pdf_download"
+            )
+        except Exception as e:
+            st.error(f"PDF Error: {str(e)}")
+
+    # Show the summary content
+    with st.expander("📖 **View Summary Content**"):
+        st.markdown(summary_data['content'])
+
+
+@st.fragment
+def recap_panel():
+    """The active recap job (also after reruns while it is still generating)."""
+    if 'recap_job_id' not in st.session_state:
+        return
+    job = get_job_runner().get(st.session_state['recap_job_id'])
+    if job is None:
+        return
+    if job.kind == "recap_variants":
+        render_variants_job(job)
+    else:
+        render_recap_job(job)
+
+
+def render_power_rankings_table(power_rankings_data):
+    """Table view of power rankings with methodology and alternative rankings."""
+    # Display header
+    current_week = power_rankings_data["current_week"]
+    st.markdown(f"### 🏆 Power Rankings - After Week {current_week}")
+
+    # Create DataFrame for table display
+    rankings = power_rankings_data["rankings"]
+
+    # Prepare data for table
+    table_data = []
+    for team in rankings:
+        table_data.append({
+            "Rank": f"#{team['power_rank']}",
+            "Team": team['team_name'],
+            "Record": team['record'],
+            "Power Score": f"{team['comprehensive_score']:.3f}",
+            "Avg Points": f"{team['avg_points_for']:.1f}",
+            "Point Diff": f"{team['avg_point_differential']:+.1f}",
+            "Win %": f"{team['win_percentage']:.1%}",
+            "High Score": f"{team['highest_score']:.1f}",
+            "Low Score": f"{team['lowest_score']:.1f}"
+        })
+
+    df = pd.DataFrame(table_data)
+
+    # Calculate dynamic height: header (35px) + rows (35px each) + padding (20px)
+    dynamic_height = 35 + (len(rankings) * 35) + 20
+
+    # Display main table with custom styling
+    st.dataframe(
+        df,
+        width='stretch',
+        height=dynamic_height,
+        hide_index=True,
+        column_config={
+            "Rank": st.column_config.TextColumn("Rank", width=50),
+            "Team": st.column_config.TextColumn("Team", width=140),
+            "Record": st.column_config.TextColumn("Record", width=60),
+            "Power Score": st.column_config.TextColumn("Power Score", width=80),
+            "Avg Points": st.column_config.TextColumn("Avg Points", width=75),
+            "Point Diff": st.column_config.TextColumn("Point Diff", width=75),
+            "Win %": st.column_config.TextColumn("Win %", width=60),
+            "High Score": st.column_config.TextColumn("High Score", width=75),
+            "Low Score": st.column_config.TextColumn("Low Score", width=75)
+        }
+    )
+
+    # Display methodology and alternative rankings
+    with st.expander("📋 Ranking Methodology & Alternative Rankings"):
+        st.markdown("**Power Score Breakdown:**")
+        st.markdown("• 30% Win Percentage (managerial skill)")
+        st.markdown("• 25% Scoring Average (offensive production)")  
+        st.markdown("• 20% Point Differential (dominance)")
+        st.markdown("• 15% Recent Form (momentum)")
+        st.markdown("• 10% Consistency (reliability)")
+
+        st.markdown("---")
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown("**🔬 Oberon Mt. Power Rating**")
+            st.caption("60% Avg Score, 20% High/Low, 20% Win %")
+            st.write("*A balanced approach emphasizing consistent scoring performance with win rate consideration.*")
+            st.write("**Goal:** Higher scores indicate better overall team strength")
+            st.write("")
+            oberon_rankings = sorted(rankings, key=lambda x: x['oberon_rating'], reverse=True)
+            for i, team in enumerate(oberon_rankings):
+                st.text(f"{i+1}. {team['team_name']}: {team['oberon_rating']:.2f}")
+
+        with col2:
+            st.markdown("**💎 Team Value Index**")
+            st.caption("Points For/Against × Win %")
+            st.write("*Measures efficiency by combining scoring differential with actual wins achieved.*")
+            st.write("**Goal:** Higher values show you're winning games efficiently relative to points")
+            st.write("")
+            tvi_rankings = sorted(rankings, key=lambda x: x['team_value_index'], reverse=True)
+            for i, team in enumerate(tvi_rankings):
+                st.text(f"{i+1}. {team['team_name']}: {team['team_value_index']:.3f}")
+
+
+@st.fragment
+def power_rankings_panel(league_type, temp_dir):
+    """
+    Power rankings controls and results.
+
+    Runs as a fragment so calculating rankings or switching the display
+    format reruns only this panel; the last result is kept in session state
+    and redrawn on reruns rather than recalculated.
+    """
+    st.subheader("📊 Statistical Power Rankings")
+    st.write("Generate objective power rankings based on statistical analysis (no AI personality)")
+    
+    # View selection
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        view_type = st.selectbox(
+            "Display Format",
+            ["📋 List View", "📊 Table View"],
+            help="Choose how to display the power rankings"
+        )
+    
+    with col2:
+        power_rankings_button = st.button(
+            label='📊 Calculate Power Rankings',
+            help="Generate statistical power rankings based on wins, points, consistency, and recent form"
+        )
+    
+    league_id = st.session_state.get('LeagueID', '')
+    rankings_key = (league_type, league_id, view_type)
+
+    # Handling Power Rankings
+    if power_rankings_button:
+        if not league_id:
+            st.error("League ID is required for power rankings.")
+            return
+        try:
+            with st.spinner('Calculating power rankings...'):
+                if league_type == "ESPN":
+                    season_source = EspnSeasonSource(
+                        league_id, st.session_state.get('ESPN2_Id', ''), st.session_state.get('SWID', '')
+                    )
+                elif league_type == "Yahoo":
+                    season_source = YahooSeasonSource(league_id, temp_dir)
+                else:
+                    season_source = SleeperSeasonSource(league_id)
+
+                if view_type == "📋 List View":
+                    power_rankings_result = generate_power_rankings(season_source)
+                else:  # Table View
+                    power_rankings_result = get_power_rankings_data(season_source)
+            st.session_state['power_rankings'] = (rankings_key, power_rankings_result)
+        except Exception as e:
+            st.error(f"Error generating power rankings: {str(e)}")
+            LOGGER.error(f"Power rankings error: {str(e)}")
+            return
+
+    # Redraw the last result for this league and view without recalculating
+    cached = st.session_state.get('power_rankings')
+    if cached is None or cached[0] != rankings_key:
+        return
+    power_rankings_result = cached[1]
+    if view_type == "📋 List View":
+        st.success("Power rankings generated successfully!")
+        st.text(power_rankings_result)
+    elif "error" in power_rankings_result:
+        st.error(power_rankings_result["error"])
+    else:
+        st.success("Power rankings generated successfully!")
+        render_power_rankings_table(power_rankings_result)
+
+
 def main():
+    # Build the shared OpenAI client early so its connections warm up while the user logs in
+    get_openai_client()
+
     # Check authentication first
     if not check_authentication():
         return
@@ -128,50 +834,7 @@ def main():
         """)
 
     # Show last generated summary and PDF export option if available
-    if 'last_summary' in st.session_state:
-        st.markdown("---")
-        st.markdown("### 📄 Last Generated Summary")
-        
-        summary_data = st.session_state['last_summary']
-        generated_time = datetime.fromisoformat(summary_data['generated_at']).strftime("%B %d, %Y at %I:%M %p")
-        
-        col1, col2 = st.columns([3, 1])
-        with col1:
-            st.markdown(f"**Generated:** {generated_time}")
-            st.markdown(f"**Character:** {summary_data['character']} | **Format:** {summary_data['summary_format']} | **Intensity:** Level {summary_data['trash_talk_level']}")
-        
-        with col2:
-            # PDF export from session state
-            try:
-                pdf_bytes = generate_pdf_from_summary(
-                    summary_content=summary_data['content'],
-                    character=summary_data['character'],
-                    league_name=summary_data['league_name'],
-                    week_number=summary_data['week_number'],
-                    summary_format=summary_data['summary_format'],
-                    trash_talk_level=summary_data['trash_talk_level']
-                )
-                
-                filename = get_filename(
-                    league_name=summary_data['league_name'],
-                    week_number=summary_data['week_number'],
-                    character=summary_data['character']
-                )
-                
-                st.download_button(
-                    label="🎯 Download PDF",
-                    data=pdf_bytes,
-                    file_name=filename,
-                    mime="application/pdf",
-                    help="Download your last generated recap as a PDF",
-                    key="header_pdf_download"
-                )
-            except Exception as e:
-                st.error(f"PDF Error: {str(e)}")
-        
-        # Show the summary content
-        with st.expander("📖 **View Summary Content**"):
-            st.markdown(summary_data['content'])
+    last_summary_panel()
 
     with st.sidebar:
         st.sidebar.image('./logo.png', width='stretch')
@@ -186,6 +849,7 @@ def main():
         league_type = st.selectbox("Select League Type", ["ESPN", "Sleeper"], index=1, key='league_type')
 
     if league_type:
+        temp_dir = None  # Set by the Yahoo login flow
         with st.sidebar.form(key='my_form'):
             if league_type == "ESPN":
                 st.text_input("LeagueID", key='LeagueID')
@@ -258,7 +922,10 @@ def main():
 
                     # Allow user to input league ID
                     # league_id = st.text_input("Enter your Yahoo Fantasy Sports league ID:")
-                    temp_dir = tempfile.mkdtemp()
+                    # One auth directory per session, reused across reruns by recap jobs and power rankings
+                    if 'yahoo_auth_dir' not in st.session_state:
+                        st.session_state['yahoo_auth_dir'] = tempfile.mkdtemp(prefix="commish-yahoo-")
+                    temp_dir = st.session_state['yahoo_auth_dir']
                     if league_id:
                         # Define the paths to the token and private files
                         token_file_path = os.path.join(temp_dir, "token.json")
@@ -290,6 +957,7 @@ def main():
             
             st.text_input("Character Description", key='Character Description', value="John Madden", help= "Describe a persona for the AI to adopt. E.g. 'Dwight Schrute' or 'A very drunk Captain Jack Sparrow'")
             st.slider("Trash Talk Level", 1, 10, key='Trash Talk Level', value=5, help="Scale of 1 to 10, where 1 is friendly banter and 10 is more extreme trash talk")
+            st.text_input("Additional Characters", key='Additional Characters', help="Optional, comma-separated personas to recap side by side, e.g. 'Dwight Schrute, Bob Ross'")
             
             # Summary format selection
             summary_format = st.radio(
@@ -299,6 +967,7 @@ def main():
                 key='summary_format',
                 help="Classic: Concise, character-driven recap. Detailed: Comprehensive matchup-by-matchup analysis with player stats and storylines."
             )
+            st.checkbox("Compare both formats", key='compare_formats', help="Also generate the other format, side by side")
             
             # Model selection dropdown with pricing information
             model_options = get_flattened_models()
@@ -323,430 +992,83 @@ def main():
             if "estimated_total_cost" in estimated_cost_info:
                 st.caption(f"💰 Estimated cost: ~${estimated_cost_info['estimated_total_cost']:.4f} for typical summary")
             
+            # Limits for the model router; a faster/cheaper fallback is used when the model would exceed them
+            st.number_input("Latency Budget (seconds)", min_value=0.0, max_value=600.0, value=DEFAULT_LATENCY_BUDGET, step=5.0, key='latency_budget', help="Switch to a faster model when the selected one is expected to take longer than this. 0 = no limit")
+            st.number_input("Cost Ceiling ($)", min_value=0.0, value=DEFAULT_COST_CEILING, step=0.01, format="%.2f", key='cost_ceiling', help="Switch to a cheaper model when the selected one is expected to cost more than this. 0 = no limit")
+            
             submit_button = st.form_submit_button(label='🤖 Generate AI Summary')
 
-        # Power Rankings Button (outside the form for independent operation)
+        with st.sidebar:
+            st.checkbox("🛠️ Debug mode", key='debug_mode', help="Show cache diagnostics and detailed error information")
+            if st.session_state.get('debug_mode', False):
+                with st.expander("🗄️ League Cache"):
+                    st.json(get_cache_stats())
+                with st.expander("🔌 Connection Pools"):
+                    st.json(get_connection_stats())
+                with st.expander("🚦 Rate Limits"):
+                    st.json(get_rate_limit_stats())
+                with st.expander("⏱️ Request Hedging"):
+                    st.json(get_hedging_stats())
+                with st.expander("🧵 Background Jobs"):
+                    st.json(get_job_runner().stats())
+                with st.expander("♻️ Completion Cache"):
+                    st.json(get_completion_cache_stats())
+                with st.expander("🖋️ Stream Rendering"):
+                    st.json(get_render_stats())
+                with st.expander("🔢 Tokenizer"):
+                    st.json(tokenizer_status())
+                with st.expander("🧭 Model Router"):
+                    st.json(get_model_router_stats())
+                with st.expander("🚥 LLM Admission"):
+                    st.json(get_admission_stats())
+
+        # Power Rankings (outside the form for independent operation)
         st.markdown("---")
-        st.subheader("📊 Statistical Power Rankings")
-        st.write("Generate objective power rankings based on statistical analysis (no AI personality)")
-        
-        # View selection
-        col1, col2 = st.columns([1, 3])
-        with col1:
-            view_type = st.selectbox(
-                "Display Format",
-                ["📋 List View", "📊 Table View"],
-                help="Choose how to display the power rankings"
-            )
-        
-        with col2:
-            power_rankings_button = st.button(
-                label='📊 Calculate Power Rankings',
-                help="Generate statistical power rankings based on wins, points, consistency, and recent form"
-            )
-        
-        # Handling Power Rankings
-        if power_rankings_button:
-            if league_type == "Sleeper":
-                league_id = st.session_state.get('LeagueID', '')
-                if not league_id:
-                    st.error("League ID is required for power rankings.")
-                else:
-                    try:
-                        with st.spinner('Calculating power rankings...'):
-                            if view_type == "📋 List View":
-                                power_rankings_result = generate_sleeper_power_rankings(league_id)
-                                st.success("Power rankings generated successfully!")
-                                st.text(power_rankings_result)
-                            else:  # Table View
-                                power_rankings_data = get_sleeper_power_rankings_data(league_id)
-                                
-                                if "error" in power_rankings_data:
-                                    st.error(power_rankings_data["error"])
-                                else:
-                                    st.success("Power rankings generated successfully!")
-                                    
-                                    # Display header
-                                    current_week = power_rankings_data["current_week"]
-                                    st.markdown(f"### 🏆 Power Rankings - After Week {current_week}")
-                                    
-                                    # Create DataFrame for table display
-                                    rankings = power_rankings_data["rankings"]
-                                    
-                                    # Prepare data for table
-                                    table_data = []
-                                    for team in rankings:
-                                        table_data.append({
-                                            "Rank": f"#{team['power_rank']}",
-                                            "Team": team['team_name'],
-                                            "Record": team['record'],
-                                            "Power Score": f"{team['comprehensive_score']:.3f}",
-                                            "Avg Points": f"{team['avg_points_for']:.1f}",
-                                            "Point Diff": f"{team['avg_point_differential']:+.1f}",
-                                            "Win %": f"{team['win_percentage']:.1%}",
-                                            "High Score": f"{team['highest_score']:.1f}",
-                                            "Low Score": f"{team['lowest_score']:.1f}"
-                                        })
-                                    
-                                    df = pd.DataFrame(table_data)
-                                    
-                                    # Calculate dynamic height: header (35px) + rows (35px each) + padding (20px)
-                                    dynamic_height = 35 + (len(rankings) * 35) + 20
-                                    
-                                    # Display main table with custom styling
-                                    st.dataframe(
-                                        df,
-                                        width='stretch',
-                                        height=dynamic_height,
-                                        hide_index=True,
-                                        column_config={
-                                            "Rank": st.column_config.TextColumn("Rank", width=50),
-                                            "Team": st.column_config.TextColumn("Team", width=140),
-                                            "Record": st.column_config.TextColumn("Record", width=60),
-                                            "Power Score": st.column_config.TextColumn("Power Score", width=80),
-                                            "Avg Points": st.column_config.TextColumn("Avg Points", width=75),
-                                            "Point Diff": st.column_config.TextColumn("Point Diff", width=75),
-                                            "Win %": st.column_config.TextColumn("Win %", width=60),
-                                            "High Score": st.column_config.TextColumn("High Score", width=75),
-                                            "Low Score": st.column_config.TextColumn("Low Score", width=75)
-                                        }
-                                    )
-                                    
-                                    # Display methodology and alternative rankings
-                                    with st.expander("📋 Ranking Methodology & Alternative Rankings"):
-                                        st.markdown("**Power Score Breakdown:**")
-                                        st.markdown("• 30% Win Percentage (managerial skill)")
-                                        st.markdown("• 25% Scoring Average (offensive production)")  
-                                        st.markdown("• 20% Point Differential (dominance)")
-                                        st.markdown("• 15% Recent Form (momentum)")
-                                        st.markdown("• 10% Consistency (reliability)")
-                                        
-                                        st.markdown("---")
-                                        
-                                        col1, col2 = st.columns(2)
-                                        
-                                        with col1:
-                                            st.markdown("**🔬 Oberon Mt. Power Rating**")
-                                            st.caption("60% Avg Score, 20% High/Low, 20% Win %")
-                                            st.write("*A balanced approach emphasizing consistent scoring performance with win rate consideration.*")
-                                            st.write("**Goal:** Higher scores indicate better overall team strength")
-                                            st.write("")
-                                            oberon_rankings = sorted(rankings, key=lambda x: x['oberon_rating'], reverse=True)
-                                            for i, team in enumerate(oberon_rankings):
-                                                st.text(f"{i+1}. {team['team_name']}: {team['oberon_rating']:.2f}")
-                                        
-                                        with col2:
-                                            st.markdown("**💎 Team Value Index**")
-                                            st.caption("Points For/Against × Win %")
-                                            st.write("*Measures efficiency by combining scoring differential with actual wins achieved.*")
-                                            st.write("**Goal:** Higher values show you're winning games efficiently relative to points")
-                                            st.write("")
-                                            tvi_rankings = sorted(rankings, key=lambda x: x['team_value_index'], reverse=True)
-                                            for i, team in enumerate(tvi_rankings):
-                                                st.text(f"{i+1}. {team['team_name']}: {team['team_value_index']:.3f}")
-                        
-                    except Exception as e:
-                        st.error(f"Error generating power rankings: {str(e)}")
-                        LOGGER.error(f"Power rankings error: {str(e)}")
-            else:
-                st.info("Power rankings are currently only available for Sleeper leagues.")
+        power_rankings_panel(league_type, temp_dir)
         
         st.markdown("---")
     
         # Handling form 
         if submit_button:
-            try:
-                progress = st.progress(0)
-                progress.text('Starting...')
-                
-                required_fields = ['LeagueID', 'Character Description', 'Trash Talk Level']
-                if league_type == "ESPN":
-                    required_fields.extend(['SWID', 'ESPN2_Id'])
-                
-                # Input validation
-                progress.text('Validating credentials...')
-                progress.progress(5)
-                for field in required_fields:
-                    value = st.session_state.get(field, None)
-                    if not value:
-                        st.error(f"{field} is required.")
-                        return  # Stop execution if any required field is empty
-                
-                league_id = st.session_state.get('LeagueID', 'Not provided')
-                character_description = st.session_state.get('Character Description', 'Not provided')
-                trash_talk_level = st.session_state.get('Trash Talk Level', 'Not provided')
-                swid = st.session_state.get('SWID', 'Not provided')
-                espn2 = st.session_state.get('ESPN2_Id', 'Not provided')
-
-                # Moderate the character description
-                progress.text('Validating character...')
-                progress.progress(15)
-                # if not summary_generator.moderate_text(client, character_description):
-                #     st.error("The character description contains inappropriate content. Please try again.")
-                #     return  # Stop execution if moderation fails
-                
-                # Fetching league summary
-                progress.text('Fetching league summary...')
-                progress.progress(30)
-                if league_type == "ESPN":
-                    LOGGER.debug("Attempting ESPN summary generator...")
-                    summary, debug_info = summary_generator.get_espn_league_summary(
-                        league_id, espn2, swid 
-                    )
-                    LOGGER.debug("~~ESPN DEBUG BELOW~~")
-                    LOGGER.debug(debug_info)
-                    LOGGER.debug("~~ESPN SUMMARY BELOW~~")
-                    LOGGER.debug(summary)
-                elif league_type == "Yahoo":
-                    summary = summary_generator.get_yahoo_league_summary(league_id, temp_dir)
-                    LOGGER.debug(summary)
-                    st.write("Completed summary query, cleaning up...")
-                    shutil.rmtree(temp_dir)
-                    st.write("Done with cleanup! Creating AI summary now...")
-                elif league_type == "Sleeper":
-                    summary = summary_generator.generate_sleeper_summary(
-                        league_id  
-                    )
-                    LOGGER.debug(summary)
-                    LOGGER.info(f"Generated Sleeper Summary: \n{summary}")
-                    st.text(summary)  # Use st.text to preserve formatting
-                
-                progress.text('Generating AI summary...')
-                progress.progress(50)
-
-                LOGGER.debug("Initializing GPT Summary Stream...")
-                try:
-                    openai_client = get_openai_client()
-                    if openai_client is None:
-                        st.error("Failed to initialize OpenAI client")
-                        return
-                    
-                    gpt4_summary_stream = summary_generator.generate_gpt4_summary_streaming(
-                        openai_client, summary, character_description, trash_talk_level, selected_model_id, summary_format
-                    )
-                    LOGGER.debug(f"Generator object initialized: {gpt4_summary_stream}")
-                    
-                    with st.chat_message("Commish", avatar="🤖"):
-                        message_placeholder = st.empty()  # Placeholder for streamed message
-                        full_response = ""  # Variable to store the full response as it streams
-                        usage_info = None  # Store usage data for cost calculation
-                
-                        # Iterate over the generator streaming responses
-                        for chunk in gpt4_summary_stream:
-                            # Ensure that 'chunk' is not None before processing
-                            if chunk is not None:
-                                # Check if this chunk contains usage data
-                                if chunk.startswith("__USAGE_DATA__") and chunk.endswith("__"):
-                                    LOGGER.debug(f"Found usage data chunk: {chunk}")
-                                    # Parse usage data: __USAGE_DATA__prompt,completion,total__model__
-                                    # Remove the prefix and suffix, then split by the remaining __
-                                    content = chunk[14:-2]  # Remove "__USAGE_DATA__" (14 chars) and final "__" (2 chars)
-                                    parts = content.split("__")
-                                    LOGGER.debug(f"Parsing content: '{content}' -> parts: {parts}")
-                                    
-                                    if len(parts) >= 2:
-                                        tokens = parts[0].split(",")
-                                        model_used = parts[1]
-                                        LOGGER.debug(f"Tokens: {tokens}, Model: {model_used}")
-                                        
-                                        if len(tokens) == 3:
-                                            # Create usage object-like structure
-                                            class UsageData:
-                                                def __init__(self, prompt, completion, total):
-                                                    self.prompt_tokens = int(prompt)
-                                                    self.completion_tokens = int(completion)
-                                                    self.total_tokens = int(total)
-                                            
-                                            usage_info = {
-                                                "usage": UsageData(tokens[0], tokens[1], tokens[2]),
-                                                "model": model_used
-                                            }
-                                            LOGGER.debug(f"Successfully parsed usage info: {usage_info}")
-                                elif chunk.startswith("__USAGE_DATA_FALLBACK__") and chunk.endswith("__"):
-                                    # Handle fallback case with estimated tokens
-                                    LOGGER.debug(f"Found fallback usage data: {chunk}")
-                                    # Remove prefix and suffix properly
-                                    content = chunk[23:-2]  # Remove "__USAGE_DATA_FALLBACK__" (23 chars) and final "__" (2 chars)  
-                                    parts = content.split("__")
-                                    LOGGER.debug(f"Fallback parsing content: '{content}' -> parts: {parts}")
-                                    
-                                    if len(parts) >= 2:
-                                        estimated_output = int(parts[0])
-                                        model_used = parts[1]
-                                        # Estimate input tokens from the instruction length
-                                        estimated_input = len(str(character_description) + str(trash_talk_level) + str(summary)) // 4
-                                        
-                                        class UsageData:
-                                            def __init__(self, prompt, completion, total):
-                                                self.prompt_tokens = int(prompt)
-                                                self.completion_tokens = int(completion)
-                                                self.total_tokens = int(total)
-                                        
-                                        usage_info = {
-                                            "usage": UsageData(estimated_input, estimated_output, estimated_input + estimated_output),
-                                            "model": model_used,
-                                            "estimated": True
-                                        }
-                                        LOGGER.debug(f"Created fallback usage info: {usage_info}")
-                                else:
-                                    # Regular content chunk
-                                    full_response += chunk  # Append each streamed chunk to the full response
-                                    message_placeholder.markdown(full_response + "▌")  # Display partial message with a cursor-like symbol
-                                    LOGGER.debug(f"Received chunk: {chunk}")  # Log each chunk for debugging
-                            
-                        # Once streaming is done, update the message with the complete response
-                        message_placeholder.markdown(full_response)
-                        
-                        # Store summary data in session state for PDF export
-                        st.session_state['last_summary'] = {
-                            'content': full_response,
-                            'character': character_description,
-                            'league_name': "Fantasy Football League",  # Could be made configurable
-                            'week_number': "Week Recap",  # Could be extracted from data
-                            'summary_format': summary_format,
-                            'trash_talk_level': trash_talk_level,
-                            'generated_at': datetime.now().isoformat()
-                        }
-                
-                    LOGGER.debug("GPT Stream completed!")
-                    
-                    # Display cost information if usage data is available
-                    if usage_info and "usage" in usage_info:
-                        cost_info = calculate_cost(usage_info["usage"], usage_info["model"])
-                        if "total_cost" in cost_info:
-                            # Check if this is estimated data
-                            is_estimated = usage_info.get("estimated", False)
-                            st.success("✅ **Summary Generated Successfully!**")
-                            
-                            # Create cost breakdown display
-                            col1, col2 = st.columns(2)
-                            with col1:
-                                st.metric("📊 Total Tokens", f"{cost_info['total_tokens']:,}")
-                                st.metric("💰 Total Cost", f"${cost_info['total_cost']:.6f}")
-                            
-                            with col2:
-                                st.metric("📝 Input Tokens", f"{cost_info['prompt_tokens']:,}")
-                                st.metric("🎯 Output Tokens", f"{cost_info['completion_tokens']:,}")
-                            
-                            # Show detailed breakdown
-                            with st.expander("💳 **Cost Breakdown**"):
-                                st.write(f"**Model Used:** {usage_info['model']}")
-                                if is_estimated:
-                                    st.warning("⚠️ **Note:** Token counts are estimated (actual usage tracking unavailable)")
-                                st.write(f"**Input Cost:** ${cost_info['prompt_cost']:.6f} ({cost_info['prompt_tokens']:,} tokens)")
-                                st.write(f"**Output Cost:** ${cost_info['completion_cost']:.6f} ({cost_info['completion_tokens']:,} tokens)")
-                                
-                                # Show cost comparison with other models
-                                if usage_info['model'] == 'gpt-4o-mini':
-                                    st.info("💡 **Great choice!** GPT-4o Mini offers excellent creativity at a budget-friendly price.")
-                                elif usage_info['model'] in ['gpt-5', 'gpt-4o']:
-                                    savings_vs_gpt5 = (0.012 - cost_info['total_cost']) if cost_info['total_cost'] < 0.012 else 0
-                                    if savings_vs_gpt5 > 0:
-                                        st.info(f"💰 **You saved ~${savings_vs_gpt5:.4f}** compared to premium models!")
-                    else:
-                        # Fallback: Show a simple message if no usage data was captured
-                        LOGGER.warning("No usage info available for cost display")
-                        st.info("💡 **Summary generated successfully!** Cost tracking temporarily unavailable - trying to capture usage data in future versions.")
-                    
-                    # PDF Export Section - Generate PDF immediately and provide download
-                    st.markdown("---")
-                    st.markdown("**📄 Export Options**")
-                    
-                    # Generate PDF automatically and provide download button
-                    try:
-                        with st.spinner("🎨 Creating your beautiful PDF..."):
-                            # Generate PDF using the data from session state
-                            pdf_bytes = generate_pdf_from_summary(
-                                summary_content=full_response,
-                                character=character_description,
-                                league_name="Fantasy Football League",  # Could be made configurable
-                                week_number="Week Recap",  # Could be extracted from data
-                                summary_format=summary_format,
-                                trash_talk_level=trash_talk_level
-                            )
-                            
-                            # Generate filename
-                            filename = get_filename(
-                                league_name="Fantasy Football League",
-                                week_number="Week_Recap", 
-                                character=character_description
-                            )
-                        
-                        # Create columns for the download options
-                        col1, col2 = st.columns([1, 1])
-                        
-                        with col1:
-                            # Provide download button for PDF
-                            st.download_button(
-                                label="🎯 Download PDF",
-                                data=pdf_bytes,
-                                file_name=filename,
-                                mime="application/pdf",
-                                help="Click to download your fantasy football recap as a PDF",
-                                width='stretch'
-                            )
-                            st.success("✅ PDF ready for download!")
-                        
-                        with col2:
-                            st.markdown("**Or copy the text below:**")
-                        
-                    except Exception as e:
-                        st.error(f"❌ Error generating PDF: {str(e)}")
-                        LOGGER.error(f"PDF generation error: {str(e)}")
-                        # Still show copy option even if PDF fails
-                        st.markdown("**Copy the text below:**")
-                    
-                    # Text copy section
-                    st.markdown("**Click the copy icon** 📋 below in top right corner to copy your summary text:")
-                    st.code(full_response, language="")
-                
-                except Exception as e:
-                    LOGGER.error(f"An error occurred while streaming GPT response: {str(e)}")
-                    error_str = str(e)
-                    
-                    # Display user-friendly error messages for OpenAI API issues
-                    if "insufficient_quota" in error_str or "429" in error_str:
-                        st.error("⚠️ **OpenAI API Quota Exceeded**\n\nYour OpenAI API credits have been exhausted. Please check your billing plan at [OpenAI Platform](https://platform.openai.com/billing) or try again later.")
-                    elif "401" in error_str or "unauthorized" in error_str.lower():
-                        st.error("🔐 **OpenAI API Authentication Failed**\n\nThe API key appears to be invalid or expired. Please contact support to resolve this issue.")
-                    elif "503" in error_str or "service_unavailable" in error_str:
-                        st.error("🔧 **OpenAI Service Unavailable**\n\nOpenAI's service is temporarily unavailable. Please try again in a few minutes.")
-                    elif "rate_limit" in error_str.lower() or "too_many_requests" in error_str.lower():
-                        st.error("⏱️ **Rate Limit Exceeded**\n\nToo many requests have been made recently. Please wait a moment and try again.")
-                    else:
-                        st.error(f"❌ **Unexpected Error**\n\nSomething went wrong while generating your summary. Please try again later.")
-                    
-                    # Only show detailed error in debug mode
-                    if st.session_state.get('debug_mode', False):
-                        with st.expander("Debug Information"):
-                            st.text(traceback.format_exc())
-                    
-                    LOGGER.exception(e)
-                    
-                LOGGER.debug("GPT Stream done!")
-                progress.text('Done!')
-                progress.progress(100)
-                
-            except Exception as e:
-                LOGGER.error(f"An error occurred in main form processing: {str(e)}")
-                error_str = str(e)
-                
-                # Handle common errors gracefully
-                if "league not found" in error_str.lower() or "invalid league" in error_str.lower():
-                    st.error("🏈 **League Not Found**\n\nThe league ID you provided could not be found. Please double-check your league ID and try again.")
-                elif "authentication" in error_str.lower() or "invalid credentials" in error_str.lower():
-                    st.error("🔐 **Authentication Failed**\n\nThere was an issue with your login credentials. Please verify your information and try again.")
-                elif "network" in error_str.lower() or "connection" in error_str.lower():
-                    st.error("🌐 **Network Error**\n\nUnable to connect to the fantasy sports service. Please check your internet connection and try again.")
-                else:
-                    st.error("❌ **Something Went Wrong**\n\nAn unexpected error occurred while processing your request. Please try again.")
-                
-                # Only show detailed error in debug mode
-                if st.session_state.get('debug_mode', False):
-                    with st.expander("Debug Information"):
-                        st.text(traceback.format_exc())
-                
-                LOGGER.exception(e)
+            required_fields = ['LeagueID', 'Character Description', 'Trash Talk Level']
+            if league_type == "ESPN":
+                required_fields.extend(['SWID', 'ESPN2_Id'])
+            
+            # Input validation
+            for field in required_fields:
+                value = st.session_state.get(field, None)
+                if not value:
+                    st.error(f"{field} is required.")
+                    return  # Stop execution if any required field is empty
+            
+            recap_params = {
+                'league_type': league_type,
+                'league_id': st.session_state.get('LeagueID', 'Not provided'),
+                'character_description': st.session_state.get('Character Description', 'Not provided'),
+                'trash_talk_level': st.session_state.get('Trash Talk Level', 'Not provided'),
+                'swid': st.session_state.get('SWID', 'Not provided'),
+                'espn2': st.session_state.get('ESPN2_Id', 'Not provided'),
+                'temp_dir': temp_dir if league_type == "Yahoo" else None,
+                'model': selected_model_id,
+                'summary_format': summary_format,
+                'latency_budget': st.session_state.get('latency_budget') or None,
+                'cost_ceiling': st.session_state.get('cost_ceiling') or None,
+            }
+            characters = [recap_params['character_description']] + [
+                character for character in st.session_state.get('Additional Characters', '').split(',') if character.strip()
+            ]
+            summary_formats = ["Classic", "Detailed"] if st.session_state.get('compare_formats') else [summary_format]
+            # Runs in the background so reruns don't discard it; identical requests reuse the same job
+            if len(build_variants(characters, summary_formats)) > 1:
+                recap_params.update(characters=characters, summary_formats=summary_formats)
+                job = get_job_runner().submit(get_session_key(), "recap_variants", recap_params, run_variants_job)
+                job.update(characters=characters, summary_formats=summary_formats)
+            else:
+                job = get_job_runner().submit(get_session_key(), "recap", recap_params, run_recap_job)
+            st.session_state['recap_job_id'] = job.id
+
+        # Render the active recap job (also after reruns while it is still generating)
+        recap_panel()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,234 @@
+"""
+Admission Control for LLM Generations
+
+Every session used to call OpenAI the moment its button was pressed. Under
+load that tripped the organization's rate limits, and the resulting 429s
+only became error messages. Generations now pass through one process-wide
+AdmissionController before calling the API:
+
+- At most COMMISH_LLM_MAX_IN_FLIGHT generations run at once. A multi-variant
+  recap takes one slot per concurrent variant.
+- A token bucket (rate_limiter.TokenBucket) holds a COMMISH_LLM_TPM budget.
+  Each request reserves its pre-flight token estimate, and the reservation
+  is corrected once the real usage is known. A 429 halves the rate and
+  pauses the bucket; successful generations restore it gradually.
+- Waiting requests are queued per user (browser session) and admitted
+  round-robin, so a user who submits many recaps cannot starve everyone
+  else. Callers are told their queue position while they wait.
+
+The job runner keeps recaps alive across reruns. The admission queue decides
+when they may call the API.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+from streamlit.logger import get_logger
+
+from utils.rate_limiter import TokenBucket
+from utils.stream_events import Error, Usage
+
+LOGGER = get_logger(__name__)
+
+MAX_IN_FLIGHT = int(os.environ.get("COMMISH_LLM_MAX_IN_FLIGHT", "4"))
+# Organization tokens-per-minute budget (prompt + completion); 0 disables it
+TOKENS_PER_MINUTE = int(os.environ.get("COMMISH_LLM_TPM", "200000"))
+ADMISSION_TIMEOUT = 300.0  # seconds a generation may wait for a slot
+ADMISSION_POLL_INTERVAL = 0.25  # seconds between re-checks of the token budget
+THROTTLE_PAUSE = 5.0  # seconds the budget is paused after a 429
+
+
+class AdmissionTimeout(Exception):
+    """Raised when a generation waited longer than ADMISSION_TIMEOUT for a slot."""
+
+
+class Ticket:
+    """One generation's place in the admission queue and, once admitted, its reservation."""
+
+    def __init__(self, user: str, tokens: int, slots: int):
+        self.user = user
+        self.tokens = tokens
+        self.slots = slots
+        self.reserved = 0
+        self.admitted = False
+        self.used_tokens: Optional[int] = None
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+
+    def observe(self, event: Any):
+        """Track a stream event: usage settles the reservation, a 429 throttles the budget."""
+        if isinstance(event, Usage):
+            self.used_tokens = (self.used_tokens or 0) + event.total_tokens
+        elif isinstance(event, Error) and "429" in event.detail:
+            get_admission_controller().record_throttle()
+
+
+class AdmissionController:
+    """Max in-flight generations plus a tokens-per-minute budget, shared fairly between users."""
+
+    def __init__(self, max_in_flight: int = MAX_IN_FLIGHT, tokens_per_minute: int = TOKENS_PER_MINUTE):
+        self.max_in_flight = max(max_in_flight, 1)
+        self.tokens_per_minute = tokens_per_minute
+        self._bucket = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute > 0 else None
+        # user -> their waiting tickets; the first user in the dict is served next
+        self._queues: "OrderedDict[str, deque]" = OrderedDict()
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stats = {"admitted": 0, "timed_out": 0, "throttled": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0}
+
+    def _dispatch(self):
+        """Admit waiting tickets round-robin while slots and tokens allow (caller holds the lock)."""
+        while self._queues:
+            user, queue = next(iter(self._queues.items()))
+            ticket = queue[0]
+            if self._in_flight + ticket.slots > self.max_in_flight:
+                return
+            reserve = min(ticket.tokens, self.tokens_per_minute)
+            if self._bucket is not None and not self._bucket.try_acquire(reserve):
+                return
+            queue.popleft()
+            # The user goes to the back of the line for their next ticket
+            del self._queues[user]
+            if queue:
+                self._queues[user] = queue
+            ticket.reserved = reserve if self._bucket is not None else 0
+            ticket.admitted = True
+            ticket.admitted_at = time.monotonic()
+            self._in_flight += ticket.slots
+            waited = ticket.admitted_at - ticket.enqueued_at
+            self._stats["admitted"] += 1
+            self._stats["wait_seconds"] += waited
+            self._stats["max_wait_seconds"] = max(self._stats["max_wait_seconds"], waited)
+            self._cond.notify_all()
+
+    def _position(self, ticket: Ticket) -> int:
+        """1-based place in the round-robin order (caller holds the lock)."""
+        position = 0
+        queues = list(self._queues.values())
+        for round_index in range(max(len(queue) for queue in queues)):
+            for queue in queues:
+                if round_index < len(queue):
+                    position += 1
+                    if queue[round_index] is ticket:
+                        return position
+        return position
+
+    def _remove(self, ticket: Ticket):
+        queue = self._queues.get(ticket.user)
+        if queue is not None and ticket in queue:
+            queue.remove(ticket)
+            if not queue:
+                del self._queues[ticket.user]
+
+    def acquire(self, user: str, tokens: int, slots: int = 1,
+                on_wait: Optional[Callable[[int], None]] = None,
+                timeout: float = ADMISSION_TIMEOUT) -> Ticket:
+        """
+        Wait for permission to start a generation.
+
+        Args:
+            user: Identifier of the requesting user (e.g. the session key)
+            tokens: Estimated prompt + completion tokens
+            slots: Concurrent API requests the generation makes (capped at max_in_flight)
+            on_wait: Called with the 1-based queue position whenever it changes while waiting
+            timeout: Most seconds to wait
+
+        Returns:
+            The admitted Ticket; pass it to release() when the generation ends
+
+        Raises:
+            AdmissionTimeout: When no slot frees up within the timeout
+        """
+        ticket = Ticket(user, tokens, min(max(slots, 1), self.max_in_flight))
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._queues.setdefault(user, deque()).append(ticket)
+            self._dispatch()
+            reported = None
+            while not ticket.admitted:
+                position = self._position(ticket)
+                if on_wait is not None and position != reported:
+                    on_wait(position)
+                    reported = position
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._remove(ticket)
+                    self._stats["timed_out"] += 1
+                    self._dispatch()
+                    raise AdmissionTimeout(f"Timed out after {timeout:.0f}s waiting for a generation slot")
+                # Woken by releases; the timeout re-checks the refilling token budget
+                self._cond.wait(min(remaining, ADMISSION_POLL_INTERVAL))
+                self._dispatch()
+        return ticket
+
+    def release(self, ticket: Ticket):
+        """Free the ticket's slots and settle its token reservation against the real usage."""
+        with self._cond:
+            self._in_flight -= ticket.slots
+            if self._bucket is not None:
+                if ticket.used_tokens is not None:
+                    self._bucket.adjust(ticket.used_tokens - ticket.reserved)
+                self._bucket.recover()
+            self._dispatch()
+            self._cond.notify_all()
+
+    def record_throttle(self, delay: float = THROTTLE_PAUSE):
+        """The API answered 429: slow the token budget down and pause it."""
+        with self._cond:
+            self._stats["throttled"] += 1
+            if self._bucket is not None:
+                self._bucket.throttle(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                "in_flight": self._in_flight,
+                "max_in_flight": self.max_in_flight,
+                "waiting": sum(len(queue) for queue in self._queues.values()),
+                "waiting_users": len(self._queues),
+                "tokens_per_minute": self.tokens_per_minute,
+                "current_tpm_rate": round(self._bucket.rate * 60) if self._bucket is not None else None,
+            })
+        admitted = stats["admitted"]
+        stats["avg_wait_seconds"] = round(stats.pop("wait_seconds") / admitted, 3) if admitted else 0.0
+        stats["max_wait_seconds"] = round(stats["max_wait_seconds"], 3)
+        return stats
+
+
+_CONTROLLER: Optional[AdmissionController] = None
+_CONTROLLER_LOCK = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller."""
+    global _CONTROLLER
+    with _CONTROLLER_LOCK:
+        if _CONTROLLER is None:
+            _CONTROLLER = AdmissionController()
+        return _CONTROLLER
+
+
+@contextmanager
+def admitted(user: str, tokens: int, slots: int = 1,
+             on_wait: Optional[Callable[[int], None]] = None) -> Iterator[Ticket]:
+    """
+    Hold an admission slot for the duration of a generation.
+
+    Feed the generation's stream events to ticket.observe() so the token
+    reservation is settled and 429s slow the budget down.
+    """
+    controller = get_admission_controller()
+    ticket = controller.acquire(user, tokens, slots, on_wait)
+    try:
+        yield ticket
+    finally:
+        controller.release(ticket)
+
+
+def get_admission_stats() -> Dict[str, Any]:
+    return get_admission_controller().stats()
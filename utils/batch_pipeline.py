@@ -0,0 +1,299 @@
+"""
+Offline Batch Generation for Many Leagues
+
+Recapping a whole league network every Tuesday by streaming each recap at
+full price is slow and expensive. This pipeline runs the same recaps through
+OpenAI's Batch API at half the token price instead:
+
+1. build_batch   - fetch every league's stats with the summary generators and
+                   write one chat completion request per league to a JSONL file
+2. submit        - upload the file and create the batch
+3. wait_for_batch - poll until the batch reaches a terminal state
+4. collect_results - store each recap in the completion cache (so opening it in
+                   the app replays it instantly) and pre-build its PDF
+
+Each request's custom_id is the completion cache key of its exact messages,
+so collected recaps are the ones the interactive path would look up.
+LocalBatchBackend mimics the Batch API lifecycle in process for tests and dry
+runs without an API key.
+
+Usage:
+    python -m utils.batch_pipeline leagues.json --model gpt-4o-mini [--local]
+
+leagues.json holds a list of objects with platform ('sleeper' or 'espn'),
+league_id, character, trash_talk_level, summary_format and, for ESPN, swid
+and espn2.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from streamlit.logger import get_logger
+
+from utils import completion_cache, summary_generator
+from utils.model_config import calculate_cost
+from utils.pdf_generator import generate_pdf_from_summary
+from utils.stream_events import Usage
+from utils.token_counter import count_message_tokens, count_tokens
+
+LOGGER = get_logger(__name__)
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+COMPLETION_WINDOW = "24h"
+# League stats are fetched concurrently; the upstream rate limiters still apply
+BATCH_FETCH_WORKERS = 4
+POLL_INTERVAL = 30.0  # seconds
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def _fetch_league_summary(league: Dict[str, Any]) -> str:
+    platform = league.get("platform", "sleeper").lower()
+    if platform == "espn":
+        summary, _ = summary_generator.get_espn_league_summary(league["league_id"], league["espn2"], league["swid"])
+        return summary
+    if platform == "sleeper":
+        return summary_generator.generate_sleeper_summary(league["league_id"])
+    # Yahoo needs an interactive OAuth login, so it can't be batched
+    raise ValueError(f"Unsupported platform for batch generation: {platform}")
+
+
+def build_batch(leagues: List[Dict[str, Any]], model: str, path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch league stats and write the batch input file.
+
+    Args:
+        leagues: League specs (see module docstring)
+        model: Model id for every request
+        path: Where to write the JSONL file
+
+    Returns:
+        Manifest mapping custom_id to the league spec it was built from
+    """
+    def prepare(league):
+        try:
+            return league, _fetch_league_summary(league), None
+        except Exception as e:
+            return league, None, e
+
+    with ThreadPoolExecutor(max_workers=BATCH_FETCH_WORKERS) as pool:
+        prepared = list(pool.map(prepare, leagues))
+
+    manifest = {}
+    with open(path, "w", encoding="utf-8") as f:
+        for league, summary, error in prepared:
+            if error is not None:
+                LOGGER.error(f"Skipping league {league.get('league_id')}: {error}")
+                continue
+            character = league.get("character", "John Madden")
+            trash_talk_level = league.get("trash_talk_level", 5)
+            summary_format = league.get("summary_format", "Classic")
+            messages = summary_generator.build_summary_messages(summary, character, trash_talk_level, summary_format)
+            custom_id = completion_cache.completion_key(model, messages, summary_generator.SUMMARY_REQUEST_PARAMS)
+            if custom_id in manifest:
+                continue  # Identical request already in this batch
+            f.write(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {"model": model, "messages": messages, **summary_generator.SUMMARY_REQUEST_PARAMS},
+            }) + "\n")
+            manifest[custom_id] = {**league, "character": character, "trash_talk_level": trash_talk_level,
+                                   "summary_format": summary_format, "model": model}
+    LOGGER.info(f"Wrote {len(manifest)} batch requests to {path}")
+    return manifest
+
+
+class OpenAIBatchBackend:
+    """Submits batches to the OpenAI Batch API."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def submit(self, path: str) -> str:
+        with open(path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id, endpoint=BATCH_ENDPOINT, completion_window=COMPLETION_WINDOW
+        )
+        return batch.id
+
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        batch = self.client.batches.retrieve(batch_id)
+        return {"status": batch.status, "output_file_id": batch.output_file_id,
+                "request_counts": batch.request_counts.model_dump() if batch.request_counts else {}}
+
+    def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        output_file_id = self.status(batch_id)["output_file_id"]
+        if not output_file_id:
+            return []
+        text = self.client.files.content(output_file_id).text
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+class LocalBatchBackend:
+    """
+    In-process stand-in for the Batch API, for tests and dry runs.
+
+    Batches move through validating -> in_progress -> completed on successive
+    status checks. Each request is answered by respond(body), which returns a
+    chat completion dict; by default a canned recap with locally counted usage.
+    """
+
+    def __init__(self, respond: Optional[Callable[[Dict[str, Any]], Dict[str, Any]]] = None):
+        self.respond = respond or self._canned_response
+        self._batches: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def _canned_response(body: Dict[str, Any]) -> Dict[str, Any]:
+        content = f"[local batch stand-in] {body['messages'][-1]['content'][:200]}"
+        prompt_tokens = count_message_tokens(body["messages"], body["model"])
+        completion_tokens = count_tokens(content, body["model"])
+        return {
+            "model": body["model"],
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def submit(self, path: str) -> str:
+        with open(path, encoding="utf-8") as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        batch_id = f"batch_local_{uuid.uuid4().hex[:12]}"
+        self._batches[batch_id] = {"status": "validating", "requests": requests, "output": None}
+        return batch_id
+
+    def status(self, batch_id: str) -> Dict[str, Any]:
+        batch = self._batches[batch_id]
+        if batch["status"] == "validating":
+            batch["status"] = "in_progress"
+        elif batch["status"] == "in_progress":
+            batch["output"] = [self._run(request) for request in batch["requests"]]
+            batch["status"] = "completed"
+        return {"status": batch["status"], "output_file_id": batch_id if batch["output"] is not None else None,
+                "request_counts": {"total": len(batch["requests"])}}
+
+    def _run(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            body = self.respond(request["body"])
+            return {"custom_id": request["custom_id"], "response": {"status_code": 200, "body": body}, "error": None}
+        except Exception as e:
+            return {"custom_id": request["custom_id"], "response": None, "error": {"message": str(e)}}
+
+    def results(self, batch_id: str) -> List[Dict[str, Any]]:
+        return self._batches[batch_id]["output"] or []
+
+
+def wait_for_batch(backend, batch_id: str, poll_interval: float = POLL_INTERVAL,
+                   timeout: Optional[float] = None) -> Dict[str, Any]:
+    """Poll a batch until it reaches a terminal state (or the timeout passes)."""
+    started = time.monotonic()
+    while True:
+        status = backend.status(batch_id)
+        LOGGER.info(f"Batch {batch_id}: {status['status']} {status.get('request_counts', {})}")
+        if status["status"] in TERMINAL_STATUSES:
+            return status
+        if timeout is not None and time.monotonic() - started >= timeout:
+            raise TimeoutError(f"Batch {batch_id} still {status['status']} after {timeout:.0f}s")
+        time.sleep(poll_interval)
+
+
+def _usage_from(body: Dict[str, Any], model: str) -> Usage:
+    usage = body.get("usage") or {}
+    cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    return Usage(usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0), usage.get("total_tokens", 0),
+                 model, cached_tokens=cached_tokens)
+
+
+def collect_results(output: List[Dict[str, Any]], manifest: Dict[str, Dict[str, Any]],
+                    build_pdfs: bool = True) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Store batch output in the completion cache and pre-build the PDFs.
+
+    Args:
+        output: Output lines from the backend
+        manifest: custom_id -> league spec, from build_batch
+        build_pdfs: Also render each recap into the PDF cache
+
+    Returns:
+        Tuple of (per-league results, cost totals at batch pricing)
+    """
+    results = []
+    totals = {"succeeded": 0, "failed": 0, "prompt_tokens": 0, "completion_tokens": 0, "total_cost": 0.0}
+    for line in output:
+        league = manifest.get(line.get("custom_id"))
+        if league is None:
+            continue
+        response = line.get("response") or {}
+        if line.get("error") or response.get("status_code") != 200:
+            totals["failed"] += 1
+            error = line.get("error") or response.get("body", {}).get("error")
+            LOGGER.error(f"Batch request for league {league['league_id']} failed: {error}")
+            results.append({"league": league, "error": error})
+            continue
+
+        body = response["body"]
+        content = body["choices"][0]["message"]["content"]
+        usage = _usage_from(body, league["model"])
+        completion_cache.store_completion(
+            line["custom_id"], content, league["model"],
+            (usage.prompt_tokens, usage.completion_tokens, usage.total_tokens),
+        )
+        if build_pdfs:
+            generate_pdf_from_summary(
+                summary_content=content,
+                character=league["character"],
+                league_name="Fantasy Football League",
+                week_number="Week Recap",
+                summary_format=league["summary_format"],
+                trash_talk_level=league["trash_talk_level"]
+            )
+        cost = calculate_cost(usage, league["model"], batch=True)
+        totals["succeeded"] += 1
+        totals["prompt_tokens"] += usage.prompt_tokens
+        totals["completion_tokens"] += usage.completion_tokens
+        totals["total_cost"] += cost.get("total_cost", 0.0)
+        results.append({"league": league, "content": content, "cost": cost})
+    return results, totals
+
+
+def run_batch(leagues: List[Dict[str, Any]], model: str, backend, poll_interval: float = POLL_INTERVAL,
+              timeout: Optional[float] = None, workdir: Optional[str] = None) -> Dict[str, Any]:
+    """Build, submit, wait for and collect one batch; returns the batch status and cost totals."""
+    workdir = workdir or tempfile.mkdtemp(prefix="commish-batch-")
+    path = os.path.join(workdir, "batch_input.jsonl")
+    manifest = build_batch(leagues, model, path)
+    if not manifest:
+        return {"status": "empty", "totals": {}}
+    batch_id = backend.submit(path)
+    LOGGER.info(f"Submitted batch {batch_id} with {len(manifest)} requests")
+    status = wait_for_batch(backend, batch_id, poll_interval, timeout)
+    _, totals = collect_results(backend.results(batch_id), manifest)
+    return {"batch_id": batch_id, "status": status["status"], "input_file": path, "totals": totals}
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Generate recaps for many leagues with the OpenAI Batch API")
+    parser.add_argument("leagues", help="JSON file with a list of league specs")
+    parser.add_argument("--model", default="gpt-4o-mini")
+    parser.add_argument("--local", action="store_true", help="Use the in-process stand-in instead of OpenAI")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    args = parser.parse_args(argv)
+
+    with open(args.leagues, encoding="utf-8") as f:
+        leagues = json.load(f)
+    if args.local:
+        backend = LocalBatchBackend()
+    else:
+        from openai import OpenAI
+        backend = OpenAIBatchBackend(OpenAI())
+    print(json.dumps(run_batch(leagues, args.model, backend, poll_interval=args.poll_interval), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Week-Aware Cache Policy for League Data
+
+Replaces flat time-based caching of league summaries with a policy that knows
+where we are in the NFL season:
+
+- Results for a completed week never change, so they are kept for the rest
+  of the season and dropped once the next season starts.
+- While the most recent week is still being played (e.g. during Monday Night
+  Football) results only live for a short TTL, in a namespace of their own.
+- When a new week completes, the provisional entries of the weeks before it
+  are invalidated explicitly; completed weeks are left alone.
+
+Entries live in the multi-tier store from utils.cache_store, so completed
+weeks survive restarts and are shared between replicas. Concurrent misses
+for the same league and week are coalesced into a single fetch. Hit/miss
+counters are kept per platform and exposed through get_cache_stats().
+"""
+
+import datetime
+import functools
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from utils import season_calendar
+from utils.cache_store import get_cache, get_store_stats
+from utils.single_flight import league_fetches
+
+# Short TTL (seconds) for data from a week whose games are still in progress
+LIVE_WEEK_TTL = 60
+
+# A week is final once its last game is in the books: Tuesday 4am after the
+# Monday the next week starts on (matches helper.check_availability and
+# the week boundaries in utils.season_calendar)
+WEEK_FINALIZATION_DELAY = datetime.timedelta(days=1, hours=4)
+
+
+def get_recap_week(now: Optional[datetime.datetime] = None) -> int:
+    """Return the week a recap generated now would cover (most recent week)."""
+    return season_calendar.recap_week(now)
+
+
+def is_week_final(week: int, now: Optional[datetime.datetime] = None) -> bool:
+    """Return True once every game of the given week has been played."""
+    now = now or datetime.datetime.now()
+    return get_recap_week(now - WEEK_FINALIZATION_DELAY) >= week
+
+
+def season_week(week: int, now: Optional[datetime.datetime] = None) -> int:
+    """Week tag that also orders weeks across seasons (e.g. 202605 for week 5 of 2026)."""
+    now = now or datetime.datetime.now()
+    return season_calendar.season_for(now) * 100 + week
+
+
+class WeekAwareCache:
+    """Cache whose entries are tagged with the season week they describe."""
+
+    def __init__(self, namespace: str = "league_summaries", live_ttl: int = LIVE_WEEK_TTL):
+        self.live_ttl = live_ttl
+        self._store = get_cache(namespace)
+        self._live_store = get_cache(f"{namespace}_live")
+        self._lock = threading.Lock()
+        self._active_week = None
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, platform: str, counter: str, amount: int = 1):
+        with self._lock:
+            platform_stats = self._stats.setdefault(
+                platform, {"hits": 0, "misses": 0, "invalidations": 0}
+            )
+            platform_stats[counter] += amount
+
+    def _roll_week(self, week: int):
+        """
+        Invalidate what the current recap week (a season_week tag) outdates.
+
+        Provisional entries of earlier weeks go; completed weeks stay until
+        the season changes.
+        """
+        with self._lock:
+            if self._active_week is not None and self._active_week >= week:
+                return
+            self._active_week = week
+        purged = self._live_store.purge_weeks_before(week)
+        purged += self._store.purge_weeks_before(week - week % 100)
+        if purged:
+            self._count("all", "invalidations", purged)
+
+    def get(self, key: tuple, week: int, final: bool):
+        """
+        Look up a cached value for the given week.
+
+        Provisional entries written while the week was in progress are keyed
+        separately from final ones, so they stop being served the moment the
+        week completes.
+
+        Args:
+            key: Cache key; the first element is the platform name
+            week: Week the caller is asking about, as a season_week tag
+            final: Whether that week has completed
+
+        Returns:
+            Tuple of (found, value)
+        """
+        self._roll_week(week)
+        store = self._store if final else self._live_store
+        found, value = store.get(key + (week, final))
+        self._count(key[0], "hits" if found else "misses")
+        return found, value
+
+    def set(self, key: tuple, value: Any, week: int, final: bool):
+        """Store a value; completed weeks last the season, live weeks use the short TTL."""
+        if final:
+            self._store.set(key + (week, final), value, week=week)
+        else:
+            self._live_store.set(key + (week, final), value, ttl=self.live_ttl, week=week)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of hit/miss counters per platform."""
+        with self._lock:
+            platforms = {platform: dict(counters) for platform, counters in self._stats.items()}
+        for counters in platforms.values():
+            lookups = counters["hits"] + counters["misses"]
+            counters["hit_rate"] = round(counters["hits"] / lookups, 3) if lookups else 0.0
+        return {"platforms": platforms, "store": get_store_stats()}
+
+
+_LEAGUE_CACHE = WeekAwareCache()
+
+
+def make_cache_key(platform: str, func_name: str, args: tuple, kwargs: dict) -> tuple:
+    """Build a cache key without keeping credentials (e.g. ESPN cookies) in memory as plain text."""
+    digest = hashlib.sha256(repr((args, sorted(kwargs.items()))).encode("utf-8")).hexdigest()
+    return (platform, func_name, digest)
+
+
+def week_cached(platform: str, cache_if: Optional[Callable[[Any], bool]] = None,
+                key_args: Optional[Callable[..., tuple]] = None):
+    """
+    Decorator caching a league data function according to the season calendar.
+
+    Args:
+        platform: Platform name used for the cache key and stats ('espn', 'sleeper', 'yahoo')
+        cache_if: Optional predicate; results for which it returns False (e.g. errors) are not cached
+        key_args: Optional function given the call's arguments that returns the ones identifying
+            the result (e.g. leaving out a per-session auth path); default is all of them
+
+    Returns:
+        Decorator for the league data function
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            now = datetime.datetime.now()
+            recap_week = get_recap_week(now)
+            final = is_week_final(recap_week, now)
+            week = season_week(recap_week, now)
+            if key_args is None:
+                key = make_cache_key(platform, func.__name__, args, kwargs)
+            else:
+                key = make_cache_key(platform, func.__name__, key_args(*args, **kwargs), {})
+
+            found, value = _LEAGUE_CACHE.get(key, week, final)
+            if found:
+                return value
+
+            def fetch():
+                result = func(*args, **kwargs)
+                if cache_if is None or cache_if(result):
+                    _LEAGUE_CACHE.set(key, result, week, final)
+                return result
+
+            # Concurrent sessions asking for the same league and week share one fetch
+            return league_fetches.do(key + (week,), fetch)
+
+        return wrapper
+    return decorator
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters for the league data cache and coalesced fetch counts."""
+    stats = _LEAGUE_CACHE.stats()
+    stats["single_flight"] = league_fetches.stats()
+    return stats
+
@@ -0,0 +1,518 @@
+"""
+Multi-Tier Cache Store for League Data
+
+Layers three caches so league data survives restarts and is shared between
+Streamlit replicas:
+
+1. In-process LRU  - holds live Python objects, so warm hits never leave the process
+2. Local disk      - compressed payloads under COMMISH_CACHE_DIR, survives restarts
+3. Shared store    - optional SQLite file on shared storage (COMMISH_SHARED_CACHE_PATH)
+                     so every replica benefits from a single fetch
+
+Lookups fall through the tiers in order and promote hits into the faster
+tiers. Writes go through to every tier. Each tier is size-bounded and evicts
+its least recently used entries; payloads on disk and in the shared store are
+zlib-compressed pickles. The disk tier therefore lives in a directory owned by
+the app user and closed to everyone else (mode 0700) and is disabled if the
+directory is shared, and the shared store must only be writable by trusted
+replicas. An entry that fails to decode is dropped and treated as a miss.
+
+Entries can be tagged with a season week so whole weeks can be invalidated
+when a new week completes.
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from streamlit.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+CACHE_DIR = os.environ.get("COMMISH_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "commish"))
+SHARED_CACHE_PATH = os.environ.get("COMMISH_SHARED_CACHE_PATH")
+
+MEMORY_CACHE_MAX_BYTES = int(os.environ.get("COMMISH_MEMORY_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+MEMORY_CACHE_MAX_ENTRIES = 2048
+DISK_CACHE_MAX_BYTES = int(os.environ.get("COMMISH_DISK_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+SHARED_CACHE_MAX_BYTES = int(os.environ.get("COMMISH_SHARED_CACHE_MAX_BYTES", 1024 * 1024 * 1024))
+
+COMPRESSION_LEVEL = 6
+NO_WEEK = -1
+
+# Disk entry header: expires_at (0 = never) followed by the compressed payload
+_HEADER = struct.Struct("<d")
+
+
+def encode_payload(value: Any) -> bytes:
+    """Serialize and compress a value for the disk and shared tiers."""
+    return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), COMPRESSION_LEVEL)
+
+
+def decode_payload(payload: bytes) -> Any:
+    """Inverse of encode_payload."""
+    return pickle.loads(zlib.decompress(payload))
+
+
+def _is_expired(expires_at: Optional[float]) -> bool:
+    return expires_at is not None and expires_at <= time.time()
+
+
+class MemoryTier:
+    """Size-bounded in-process LRU holding live objects."""
+
+    name = "memory"
+
+    def __init__(self, max_bytes: int = MEMORY_CACHE_MAX_BYTES, max_entries: int = MEMORY_CACHE_MAX_ENTRIES):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry is None:
+                return False, None
+            if _is_expired(entry["expires_at"]):
+                self._remove((namespace, key))
+                return False, None
+            self._entries.move_to_end((namespace, key))
+            return True, entry["value"]
+
+    def set(self, namespace: str, key: str, value: Any, size: int, expires_at: Optional[float], week: int):
+        with self._lock:
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key))
+            if size > self.max_bytes:
+                return
+            self._entries[(namespace, key)] = {"value": value, "size": size, "expires_at": expires_at, "week": week}
+            self._bytes += size
+            while self._entries and (self._bytes > self.max_bytes or len(self._entries) > self.max_entries):
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, namespace: str, key: str):
+        with self._lock:
+            if (namespace, key) in self._entries:
+                self._remove((namespace, key))
+
+    def purge_weeks_before(self, namespace: str, week: int) -> int:
+        with self._lock:
+            stale = [k for k, entry in self._entries.items()
+                     if k[0] == namespace and entry["week"] != NO_WEEK and entry["week"] < week]
+            for k in stale:
+                self._remove(k)
+            return len(stale)
+
+    def _remove(self, entry_key):
+        entry = self._entries.pop(entry_key)
+        self._bytes -= entry["size"]
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+class DiskTier:
+    """Size-bounded local disk store: <root>/<namespace>/w<week>/<key>.bin"""
+
+    name = "disk"
+
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = DISK_CACHE_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._bytes = None
+        self._claim_root()
+
+    def _claim_root(self):
+        """
+        Create the cache directory private to the app user.
+
+        Payloads are unpickled on read, so a directory anyone else can write
+        to must not be used.
+
+        Raises:
+            PermissionError: When the directory belongs to another user
+        """
+        os.makedirs(self.root, mode=0o700, exist_ok=True)
+        if not hasattr(os, "getuid"):
+            return
+        stat = os.stat(self.root)
+        if stat.st_uid != os.getuid():
+            raise PermissionError(f"{self.root} is owned by another user")
+        if stat.st_mode & 0o077:
+            os.chmod(self.root, 0o700)
+
+    def _path(self, namespace: str, key: str, week: int) -> str:
+        return os.path.join(self.root, namespace, f"w{week}", f"{key}.bin")
+
+    def _find(self, namespace: str, key: str) -> Optional[str]:
+        namespace_dir = os.path.join(self.root, namespace)
+        if not os.path.isdir(namespace_dir):
+            return None
+        for week_dir in os.listdir(namespace_dir):
+            path = os.path.join(namespace_dir, week_dir, f"{key}.bin")
+            if os.path.exists(path):
+                return path
+        return None
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Optional[bytes], Optional[float], int]:
+        path = self._find(namespace, key)
+        if path is None:
+            return False, None, None, NO_WEEK
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False, None, None, NO_WEEK
+        if len(data) < _HEADER.size:
+            self._unlink(path)  # Truncated write
+            return False, None, None, NO_WEEK
+        (expires_at,) = _HEADER.unpack_from(data)
+        expires_at = expires_at or None
+        if _is_expired(expires_at):
+            self._unlink(path)
+            return False, None, None, NO_WEEK
+        try:
+            os.utime(path)  # Bump mtime so eviction is least-recently-used
+        except OSError:
+            pass
+        week = int(os.path.basename(os.path.dirname(path))[1:])
+        return True, data[_HEADER.size:], expires_at, week
+
+    def set(self, namespace: str, key: str, payload: bytes, expires_at: Optional[float], week: int):
+        existing = self._find(namespace, key)
+        if existing:
+            self._unlink(existing)
+        path = self._path(namespace, key, week)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_HEADER.pack(expires_at or 0))
+            f.write(payload)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._bytes = self._scan_bytes() if self._bytes is None else self._bytes + _HEADER.size + len(payload)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, namespace: str, key: str):
+        path = self._find(namespace, key)
+        if path:
+            self._unlink(path)
+
+    def purge_weeks_before(self, namespace: str, week: int) -> int:
+        namespace_dir = os.path.join(self.root, namespace)
+        if not os.path.isdir(namespace_dir):
+            return 0
+        purged = 0
+        for week_dir in os.listdir(namespace_dir):
+            entry_week = int(week_dir[1:])
+            if entry_week == NO_WEEK or entry_week >= week:
+                continue
+            for path in self._files(os.path.join(namespace_dir, week_dir)):
+                self._unlink(path)
+                purged += 1
+        return purged
+
+    def _files(self, directory: str) -> List[str]:
+        paths = []
+        for dirpath, _, filenames in os.walk(directory):
+            paths.extend(os.path.join(dirpath, name) for name in filenames if name.endswith(".bin"))
+        return paths
+
+    def _scan_bytes(self) -> int:
+        total = 0
+        for path in self._files(self.root):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                continue
+        return total
+
+    def _evict(self):
+        """Remove least recently used files until the tier is 90% full. Caller holds the lock."""
+        entries = []
+        for path in self._files(self.root):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes * 0.9:
+                break
+            self._unlink(path)
+            total -= size
+        self._bytes = total
+
+    def _unlink(self, path: str):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        if self._bytes is not None:
+            self._bytes -= size
+
+    def usage(self) -> Dict[str, int]:
+        files = self._files(self.root) if os.path.isdir(self.root) else []
+        return {"entries": len(files), "bytes": self._scan_bytes() if files else 0}
+
+
+class SQLiteTier:
+    """Size-bounded shared store backed by a SQLite file that every replica can open."""
+
+    name = "shared"
+
+    def __init__(self, path: str, max_bytes: int = SHARED_CACHE_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entries ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, week INTEGER NOT NULL,"
+                " expires_at REAL, accessed_at REAL NOT NULL, size INTEGER NOT NULL, payload BLOB NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache_entries (accessed_at)")
+
+    def get(self, namespace: str, key: str) -> Tuple[bool, Optional[bytes], Optional[float], int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, expires_at, week FROM cache_entries WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is None:
+                return False, None, None, NO_WEEK
+            payload, expires_at, week = row
+            with self._conn:
+                if _is_expired(expires_at):
+                    self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+                    return False, None, None, NO_WEEK
+                self._conn.execute(
+                    "UPDATE cache_entries SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (time.time(), namespace, key),
+                )
+            return True, payload, expires_at, week
+
+    def set(self, namespace: str, key: str, payload: bytes, expires_at: Optional[float], week: int):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, week, expires_at, time.time(), len(payload), payload),
+            )
+            (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_entries").fetchone()
+            if total > self.max_bytes:
+                self._evict(total)
+
+    def _evict(self, total: int):
+        """Delete least recently used rows until the store is 90% full. Caller holds the lock."""
+        rows = self._conn.execute("SELECT namespace, key, size FROM cache_entries ORDER BY accessed_at").fetchall()
+        for namespace, key, size in rows:
+            if total <= self.max_bytes * 0.9:
+                break
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+            total -= size
+
+    def delete(self, namespace: str, key: str):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (namespace, key))
+
+    def purge_weeks_before(self, namespace: str, week: int) -> int:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND week != ? AND week < ?",
+                (namespace, NO_WEEK, week),
+            )
+            return cursor.rowcount
+
+    def usage(self) -> Dict[str, int]:
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache_entries"
+            ).fetchone()
+        return {"entries": entries, "bytes": total}
+
+
+class TieredCache:
+    """A namespaced view over the memory, disk and (optional) shared tiers."""
+
+    def __init__(self, namespace: str, memory: MemoryTier, lower_tiers: List[Any]):
+        self.namespace = namespace
+        self.memory = memory
+        self.lower_tiers = lower_tiers
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, **{f"{tier.name}_hits": 0 for tier in [memory] + lower_tiers}}
+
+    @staticmethod
+    def make_key(key: Any) -> str:
+        """Hash any repr-able key into a filesystem and SQL safe string."""
+        return hashlib.sha256(repr(key).encode("utf-8")).hexdigest()
+
+    def _count(self, *counters: str):
+        with self._lock:
+            for counter in counters:
+                self._stats[counter] += 1
+
+    def get(self, key: Any) -> Tuple[bool, Any]:
+        """
+        Look up a value, falling through memory -> disk -> shared.
+
+        Args:
+            key: Any repr-able key
+
+        Returns:
+            Tuple of (found, value)
+        """
+        hashed = self.make_key(key)
+        found, value = self.memory.get(self.namespace, hashed)
+        if found:
+            self._count("hits", "memory_hits")
+            return True, value
+
+        for index, tier in enumerate(self.lower_tiers):
+            try:
+                found, payload, expires_at, week = tier.get(self.namespace, hashed)
+            except Exception as e:
+                LOGGER.warning(f"Cache tier {tier.name} unavailable: {e}")
+                continue
+            if not found:
+                continue
+            try:
+                value = decode_payload(payload)
+            except Exception as e:
+                LOGGER.warning(f"Dropping corrupt {self.namespace} entry from the {tier.name} cache tier: {e}")
+                try:
+                    tier.delete(self.namespace, hashed)
+                except Exception:
+                    pass
+                continue
+            # Promote into every faster tier
+            self.memory.set(self.namespace, hashed, value, len(payload), expires_at, week)
+            for faster in self.lower_tiers[:index]:
+                try:
+                    faster.set(self.namespace, hashed, payload, expires_at, week)
+                except Exception as e:
+                    LOGGER.warning(f"Cache tier {faster.name} unavailable: {e}")
+            self._count("hits", f"{tier.name}_hits")
+            return True, value
+
+        self._count("misses")
+        return False, None
+
+    def set(self, key: Any, value: Any, ttl: Optional[float] = None, week: Optional[int] = None):
+        """
+        Store a value in every tier.
+
+        Args:
+            key: Any repr-able key
+            value: Picklable value
+            ttl: Seconds until the entry expires (None = never)
+            week: Optional season week tag used by purge_weeks_before
+        """
+        hashed = self.make_key(key)
+        payload = encode_payload(value)
+        expires_at = time.time() + ttl if ttl is not None else None
+        week = NO_WEEK if week is None else week
+        self.memory.set(self.namespace, hashed, value, len(payload), expires_at, week)
+        for tier in self.lower_tiers:
+            try:
+                tier.set(self.namespace, hashed, payload, expires_at, week)
+            except Exception as e:
+                LOGGER.warning(f"Cache tier {tier.name} unavailable: {e}")
+
+    def delete(self, key: Any):
+        hashed = self.make_key(key)
+        for tier in [self.memory] + self.lower_tiers:
+            try:
+                tier.delete(self.namespace, hashed)
+            except Exception as e:
+                LOGGER.warning(f"Cache tier {tier.name} unavailable: {e}")
+
+    def purge_weeks_before(self, week: int) -> int:
+        """Invalidate every entry tagged with a week older than the given week."""
+        purged = 0
+        for tier in [self.memory] + self.lower_tiers:
+            try:
+                purged = max(purged, tier.purge_weeks_before(self.namespace, week))
+            except Exception as e:
+                LOGGER.warning(f"Cache tier {tier.name} unavailable: {e}")
+        return purged
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+
+_TIERS = None
+_TIERS_LOCK = threading.Lock()
+_CACHES: Dict[str, TieredCache] = {}
+
+
+def _get_tiers():
+    global _TIERS
+    with _TIERS_LOCK:
+        if _TIERS is None:
+            lower_tiers = []
+            try:
+                lower_tiers.append(DiskTier())
+            except Exception as e:
+                LOGGER.warning(f"Disk cache disabled: {e}")
+            if SHARED_CACHE_PATH:
+                try:
+                    lower_tiers.append(SQLiteTier(SHARED_CACHE_PATH))
+                except Exception as e:
+                    LOGGER.warning(f"Shared cache disabled: {e}")
+            _TIERS = (MemoryTier(), lower_tiers)
+        return _TIERS
+
+
+def get_cache(namespace: str, max_bytes: Optional[int] = None, persistent: bool = True) -> TieredCache:
+    """
+    Return the process-wide tiered cache for a namespace (e.g. 'league_summaries').
+
+    Options only take effect when the namespace is first created.
+
+    Args:
+        namespace: Cache namespace
+        max_bytes: Give the namespace its own in-process LRU of this size instead of the shared one
+        persistent: False keeps the namespace in process memory only (no disk or shared tier)
+    """
+    memory, lower_tiers = _get_tiers()
+    with _TIERS_LOCK:
+        if namespace not in _CACHES:
+            if max_bytes is not None:
+                memory = MemoryTier(max_bytes=max_bytes)
+            _CACHES[namespace] = TieredCache(namespace, memory, lower_tiers if persistent else [])
+        return _CACHES[namespace]
+
+
+def get_store_stats() -> Dict[str, Any]:
+    """Return per-namespace hit counters and per-tier usage."""
+    memory, lower_tiers = _get_tiers()
+    usage = {}
+    for tier in [memory] + lower_tiers:
+        try:
+            usage[tier.name] = tier.usage()
+        except Exception as e:
+            usage[tier.name] = {"error": str(e)}
+    with _TIERS_LOCK:
+        namespaces = {name: cache.stats() for name, cache in _CACHES.items()}
+    return {"tiers": usage, "namespaces": namespaces}
@@ -0,0 +1,107 @@
+"""
+LLM Completion Cache
+
+Generating twice with identical league stats, character, trash talk level,
+model and format used to pay full latency and token cost again. Completed
+summaries are stored here under a hash of the exact messages and model
+parameters sent to OpenAI, so a repeat request is replayed from the cache
+through the same streaming interface instead.
+
+Entries live in the 'completions' namespace of utils.cache_store with their
+own size-bounded LRU and the disk/shared tiers for persistence. A replay ends
+with a zero-cost Usage event so the cost panel records it as free.
+"""
+
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from streamlit.logger import get_logger
+
+from utils.cache_store import get_cache
+from utils.stream_events import TextDelta, Timing, Usage
+from utils.token_counter import count_tokens
+
+LOGGER = get_logger(__name__)
+
+COMPLETION_CACHE_ENABLED = os.environ.get("COMMISH_COMPLETION_CACHE", "1") != "0"
+COMPLETION_CACHE_MAX_BYTES = int(os.environ.get("COMMISH_COMPLETION_CACHE_MAX_BYTES", 8 * 1024 * 1024))
+# Seconds between replayed chunks; 0 replays a cached summary instantly
+REPLAY_DELAY = float(os.environ.get("COMMISH_COMPLETION_REPLAY_DELAY", "0"))
+REPLAY_CHUNK_CHARS = 40
+
+_COMPLETIONS = get_cache("completions", max_bytes=COMPLETION_CACHE_MAX_BYTES)
+
+
+def completion_key(model: str, messages: List[Dict[str, str]], params: Dict[str, Any]) -> str:
+    """
+    Fingerprint of a chat completion request.
+
+    Args:
+        model: Model id
+        messages: The final messages array
+        params: Remaining request parameters that affect the output (e.g. max_tokens)
+
+    Returns:
+        Hex digest identifying the request
+    """
+    request = {"model": model, "messages": messages, "params": params}
+    return hashlib.sha256(json.dumps(request, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_completion(key: str) -> Optional[Dict[str, Any]]:
+    """Return the cached completion for a request fingerprint, if any."""
+    if not COMPLETION_CACHE_ENABLED:
+        return None
+    found, record = _COMPLETIONS.get(("completion", key))
+    return record if found else None
+
+
+def store_completion(key: str, content: str, model: str, usage: Optional[Tuple[int, int, int]]):
+    """
+    Cache a finished completion.
+
+    Args:
+        key: Request fingerprint from completion_key
+        content: Full generated text
+        model: Model that produced it
+        usage: (prompt, completion, total) tokens of the original call, if known
+    """
+    if not COMPLETION_CACHE_ENABLED or not content:
+        return
+    _COMPLETIONS.set(("completion", key), {
+        "content": content,
+        "model": model,
+        "usage": tuple(usage) if usage else (0, count_tokens(content, model), count_tokens(content, model)),
+        "created_at": time.time(),
+    })
+
+
+def replay(record: Dict[str, Any], delay: float = REPLAY_DELAY) -> Iterator[Any]:
+    """
+    Stream a cached completion like a live response.
+
+    Args:
+        record: Cached completion from get_completion
+        delay: Seconds to pause between chunks (0 = no pacing)
+
+    Yields:
+        TextDelta events, then a zero-cost Usage and the replay's Timing
+    """
+    started = time.monotonic()
+    content = record["content"]
+    for start in range(0, len(content), REPLAY_CHUNK_CHARS):
+        if delay and start:
+            time.sleep(delay)
+        yield TextDelta(content[start:start + REPLAY_CHUNK_CHARS])
+    prompt, completion, total = record["usage"]
+    yield Usage(0, 0, 0, record["model"], from_cache=True, original_tokens=total)
+    yield Timing(0.0, time.monotonic() - started, completion, record["model"])
+
+
+def get_completion_cache_stats() -> Dict[str, Any]:
+    stats = _COMPLETIONS.stats()
+    stats["enabled"] = COMPLETION_CACHE_ENABLED
+    return stats
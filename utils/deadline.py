@@ -0,0 +1,71 @@
+"""
+Deadline Budgets for Upstream Work
+
+A Deadline is an absolute point in time that propagates implicitly through a
+call tree via a context variable. Code that waits on upstream APIs (the rate
+limiter, hedged reads) checks the current deadline and raises
+DeadlineExceeded rather than waiting past it.
+
+Worker threads do not inherit context variables automatically; submit work
+with contextvars.copy_context().run to carry the deadline along.
+"""
+
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised when work cannot finish within the current deadline."""
+
+
+class Deadline:
+    """A fixed point in time by which work must finish."""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, what: str = "operation"):
+        """Raise DeadlineExceeded if the deadline has passed."""
+        if self.expired:
+            raise DeadlineExceeded(f"{what} exceeded its {self.budget:.1f}s budget")
+
+
+_CURRENT_DEADLINE: contextvars.ContextVar = contextvars.ContextVar("commish_deadline", default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Return the deadline in effect for the calling context, if any."""
+    return _CURRENT_DEADLINE.get()
+
+
+def set_deadline(deadline: Optional[Deadline]) -> contextvars.Token:
+    """Install a deadline in the current context (use deadline_scope where possible)."""
+    return _CURRENT_DEADLINE.set(deadline)
+
+
+@contextmanager
+def deadline_scope(seconds: float) -> Iterator[Deadline]:
+    """
+    Run a block under a deadline of the given number of seconds.
+
+    A nested scope never extends an outer deadline.
+    """
+    deadline = Deadline(seconds)
+    outer = current_deadline()
+    if outer is not None and outer.expires_at < deadline.expires_at:
+        deadline = outer
+    token = _CURRENT_DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _CURRENT_DEADLINE.reset(token)
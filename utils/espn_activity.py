@@ -0,0 +1,139 @@
+"""
+Incremental ESPN Activity Ingestion
+
+team_with_most_transactions used to pull the last 100 activities on every
+recap and recount them, silently dropping anything older. This module keeps a
+persistent tally per league and season with a high-water mark on the activity
+date, so each run only pages through activity newer than the mark and updates
+per-team Claims/Trades counters incrementally. Raw activities are not kept
+once counted, so the stored tally stays small all season.
+
+Raw communication topics are read directly rather than through
+League.recent_activity, which resolves every dropped player with an extra
+player_info request that the counters never need.
+"""
+
+import copy
+import json
+import threading
+from typing import Any, Dict, List
+
+from streamlit.logger import get_logger
+
+from utils.cache_store import NO_WEEK, get_cache
+from utils.rate_limiter import ESPN_HOST, guarded_call
+from utils.single_flight import league_fetches
+
+LOGGER = get_logger(__name__)
+
+ACTIVITY_PAGE_SIZE = 50
+MAX_PAGES_PER_RUN = 40
+TRANSACTION_MESSAGE_TYPES = [178, 180, 179, 239, 181, 244]
+# messageTypeId -> counter; other types (drops) are fetched but not counted
+COUNTED_MESSAGE_TYPES = {
+    178: "Claims",  # FA ADDED
+    180: "Claims",  # WAIVER ADDED
+    244: "Trades",  # TRADED
+}
+
+_ACTIVITY_LOGS = get_cache("espn_activity")
+_LOG_LOCK = threading.Lock()
+
+
+def _empty_log() -> Dict[str, Any]:
+    return {"high_water": 0, "high_water_ids": [], "counts": {}}
+
+
+def _message_team_id(message: dict) -> Any:
+    """The team an activity message belongs to, matching espn_api's Activity."""
+    message_type = message.get("messageTypeId")
+    if message_type == 244:
+        return message.get("from")
+    if message_type == 239:
+        return message.get("for")
+    return message.get("to")
+
+
+def _fetch_page(league, offset: int) -> List[dict]:
+    filters = {"topics": {
+        "filterType": {"value": ["ACTIVITY_TRANSACTIONS"]},
+        "limit": ACTIVITY_PAGE_SIZE,
+        "limitPerMessageSet": {"value": 25},
+        "offset": offset,
+        "sortMessageDate": {"sortPriority": 1, "sortAsc": False},
+        "sortFor": {"sortPriority": 2, "sortAsc": False},
+        "filterIncludeMessageTypeIds": {"value": TRANSACTION_MESSAGE_TYPES},
+    }}
+    data = guarded_call(
+        ESPN_HOST,
+        league.espn_request.league_get,
+        extend="/communication/",
+        params={"view": "kona_league_communication"},
+        headers={"x-fantasy-filter": json.dumps(filters)},
+    )
+    return data.get("topics", [])
+
+
+def _ingest(league) -> Dict[str, Any]:
+    key = ("espn", str(league.league_id), league.year)
+    with _LOG_LOCK:
+        found, log = _ACTIVITY_LOGS.get(key)
+    # Work on a copy so readers of the memory tier never see a half-applied update
+    log = copy.deepcopy(log) if found else _empty_log()
+    log.pop("entries", None)  # Raw activity kept by earlier versions
+
+    high_water = log["high_water"]
+    seen_at_high_water = set(log["high_water_ids"])
+    new_topics = []
+    for page in range(MAX_PAGES_PER_RUN):
+        topics = _fetch_page(league, page * ACTIVITY_PAGE_SIZE)
+        reached_mark = False
+        for topic in topics:
+            date = topic.get("date", 0)
+            if date < high_water or (date == high_water and topic.get("id") in seen_at_high_water):
+                reached_mark = True
+                break
+            new_topics.append(topic)
+        if reached_mark or len(topics) < ACTIVITY_PAGE_SIZE:
+            break
+    else:
+        LOGGER.warning(f"ESPN activity for league {league.league_id} exceeded {MAX_PAGES_PER_RUN} pages; older activity was not ingested")
+
+    if not new_topics:
+        return log
+
+    counts = log["counts"]
+    for topic in new_topics:
+        for message in topic.get("messages", []):
+            team_id = _message_team_id(message)
+            counter = COUNTED_MESSAGE_TYPES.get(message.get("messageTypeId"))
+            if counter and team_id is not None:
+                team_counts = counts.setdefault(team_id, {"Claims": 0, "Trades": 0})
+                team_counts[counter] += 1
+
+    newest = max(topic.get("date", 0) for topic in new_topics)
+    if newest > high_water:
+        seen_at_high_water = set()
+    log["high_water"] = max(newest, high_water)
+    log["high_water_ids"] = sorted(seen_at_high_water | {
+        topic.get("id") for topic in new_topics if topic.get("date", 0) == log["high_water"]
+    })
+
+    with _LOG_LOCK:
+        _ACTIVITY_LOGS.set(key, log, week=NO_WEEK)
+    LOGGER.info(f"Ingested {len(new_topics)} new ESPN activities for league {league.league_id}")
+    return log
+
+
+def get_transaction_counts(league) -> Dict[Any, Dict[str, int]]:
+    """
+    Bring the league's activity log up to date and return season transaction counts.
+
+    Args:
+    - league (League): The league object.
+
+    Returns:
+    - Dict[int, Dict[str, int]]: Team id -> {"Claims": n, "Trades": n}
+    """
+    log = league_fetches.do(("espn", str(league.league_id), league.year, "activity"), _ingest, league)
+    return log["counts"]
@@ -1,7 +1,17 @@
 import re
+import threading
 import time
+import weakref
 #import datetime
 
+from utils import espn_activity
+from utils.rate_limiter import ESPN_HOST, guarded_call
+from utils.single_flight import league_fetches
+
+# Box scores per League object and week; several stats in one recap read the same week
+_BOX_SCORES = weakref.WeakKeyDictionary()
+_BOX_SCORES_LOCK = threading.Lock()
+
 def clean_team_name(name):
     # This regex pattern will match any character outside the regular ASCII range
     cleaned_name = re.sub(r'[^\x00-\x7F]+', '', name)
@@ -33,7 +43,15 @@ def extract_players_weekly_scores(league, week):
     Returns:
     - List[BoxScore]: List of box scores containing player scores for the given week.
     """
-    return league.box_scores(week)
+    with _BOX_SCORES_LOCK:
+        memo = _BOX_SCORES.setdefault(league, {})
+    if week not in memo:
+        # Stats computed concurrently share a single in-flight request
+        memo[week] = league_fetches.do(
+            ("espn", league.league_id, "box_scores", week, id(league)),
+            guarded_call, ESPN_HOST, league.box_scores, week, hedge_endpoint="espn/box_scores",
+        )
+    return memo[week]
 
 
 def extract_recent_activities(league, size=25, msg_type=None):
@@ -48,7 +66,7 @@ def extract_recent_activities(league, size=25, msg_type=None):
     Returns:
     - List[Activity]: List of recent league activities.
     """
-    return league.recent_activity(size=size, msg_type=msg_type)
+    return guarded_call(ESPN_HOST, league.recent_activity, size=size, msg_type=msg_type)
 
 
 def extract_match_results(league, week):
@@ -62,7 +80,7 @@ def extract_match_results(league, week):
     Returns:
     - List[Matchup]: List of matchups for the given week.
     """
-    return league.scoreboard(week)
+    return guarded_call(ESPN_HOST, league.scoreboard, week, hedge_endpoint="espn/scoreboard")
 
 # Step 2: Top/Bottom Stats
 
@@ -187,35 +205,25 @@ def worst_scorer_of_season(league):
 
 # Step 3: Team-Specific Stats
 
-# Optimized version of the team_with_most_transactions function
 def team_with_most_transactions(league):
-    # Extract all recent league activities
-    activities = extract_recent_activities(league, size=100)  # Reduced size to fetch recent activities
-
-    # Define a direct mapping for action types
-    action_types = {
-        "FA ADDED": "Claims",
-        "WAIVER ADDED": "Claims",
-        "TRADED": "Trades"
-    }
-    
-    # Count transactions for each team
-    transaction_counts = {}
-    for activity in activities:
-        for action in activity.actions:
-            team = action[0]
-            action_type = action[1]
-            if team not in transaction_counts:
-                transaction_counts[team] = {"Claims": 0, "Trades": 0}
-            
-            # Use direct mapping for action types
-            if action_type in action_types:
-                transaction_counts[team][action_types[action_type]] += 1
-    
+    """
+    Identify the team with the most transactions this season.
+
+    Counts come from the league's incrementally maintained activity log, so
+    only activity newer than the last run is fetched.
+
+    Args:
+    - league (League): The league object.
+
+    Returns:
+    - Tuple(Team, int, int): Team with the most transactions, its claims and its trades.
+    """
+    transaction_counts = espn_activity.get_transaction_counts(league)
+
     # Get team with most combined transactions
-    team_with_most_transactions = max(transaction_counts, key=lambda k: transaction_counts[k]["Claims"] + transaction_counts[k]["Trades"])
-    
-    return team_with_most_transactions, transaction_counts[team_with_most_transactions]["Claims"], transaction_counts[team_with_most_transactions]["Trades"]
+    team_id = max(transaction_counts, key=lambda k: transaction_counts[k]["Claims"] + transaction_counts[k]["Trades"])
+
+    return league.get_team_data(team_id), transaction_counts[team_id]["Claims"], transaction_counts[team_id]["Trades"]
 
 
 def team_with_most_injured_players(league):
@@ -254,7 +262,7 @@ def highest_scoring_benched_player(league, current_week):
     Returns:
     - Tuple: Player object representing the highest scoring benched player and the Team object representing the team that rosters them.
     """
-    box_scores = league.box_scores(current_week)
+    box_scores = extract_players_weekly_scores(league, current_week)
     benched_highest_player = None
     benched_highest_points = float('-inf')
 
@@ -277,7 +285,7 @@ def lowest_scoring_starting_player(league, current_week):
     Returns:
     - Tuple: Player object representing the lowest scoring starting player and the Team object representing the team that rosters them.
     """
-    box_scores = league.box_scores(current_week)
+    box_scores = extract_players_weekly_scores(league, current_week)
     current_week_lowest_player = None
     current_week_lowest_points = float('inf')
 
@@ -302,7 +310,7 @@ def biggest_blowout_match(league, week):
     Returns:
     - BoxScore: Box score of the match with the largest score difference.
     """
-    box_scores = league.box_scores(week)
+    box_scores = extract_players_weekly_scores(league, week)
     max_diff = float('-inf')
     blowout_match = None
 
@@ -329,7 +337,7 @@ def closest_game_match(league, week):
     Returns:
     - BoxScore: Box score of the match with the smallest score difference.
     """
-    box_scores = league.box_scores(week)
+    box_scores = extract_players_weekly_scores(league, week)
     min_diff = float('inf')
     closest_match = None
 
@@ -356,7 +364,7 @@ def highest_scoring_team(league: int, week: int) -> str:
     - str: Formatted string "Team Name (Score)"
     """
     # Get the matchups for the specified week
-    matchups = league.scoreboard(week)
+    matchups = extract_match_results(league, week)
     
     # Determine the team with the highest score for the week
     max_score = 0
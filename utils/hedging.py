@@ -0,0 +1,259 @@
+"""
+Hedged Requests for Idempotent Upstream Reads
+
+Most league reads answer quickly, but the occasional ESPN or Sleeper request
+stalls for seconds and dominates recap latency. When a read has not answered
+by its endpoint's learned p95 latency, a duplicate is sent and whichever
+answers first wins.
+
+- LatencyTracker keeps a ring buffer of recent latencies per endpoint and
+  derives the hedge threshold from it.
+- HedgeBudget caps hedges to a fraction of primary requests so a slow
+  upstream is never hit with double traffic.
+
+Only idempotent GETs are hedged. Set COMMISH_HEDGE_REQUESTS=0 to disable.
+"""
+
+import asyncio
+import contextvars
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils.deadline import DeadlineExceeded, current_deadline
+
+HEDGING_ENABLED = os.environ.get("COMMISH_HEDGE_REQUESTS", "1") != "0"
+LATENCY_WINDOW = 200  # samples kept per endpoint
+MIN_SAMPLES = 20  # samples needed before the learned p95 is trusted
+DEFAULT_HEDGE_DELAY = 2.0  # seconds, used until enough samples exist
+MIN_HEDGE_DELAY = 0.05  # seconds
+HEDGE_BUDGET_RATIO = 0.05  # at most ~5% extra requests
+HEDGE_BUDGET_BURST = 3.0
+
+
+def endpoint_key(host: str, path: str) -> str:
+    """Normalize a request path into an endpoint key (ids and weeks collapsed)."""
+    return host + re.sub(r"/\d+", "/{n}", path)
+
+
+class LatencyTracker:
+    """Per-endpoint ring buffers of recent latencies."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float):
+        with self._lock:
+            samples = self._samples.setdefault(endpoint, deque(maxlen=self.window))
+            samples.append(seconds)
+
+    def percentile(self, endpoint: str, pct: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(endpoint, ()))
+        if len(samples) < MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, int(round(pct / 100 * (len(samples) - 1))))
+        return samples[index]
+
+    def hedge_delay(self, endpoint: str) -> float:
+        """Seconds to wait on the primary request before hedging."""
+        p95 = self.percentile(endpoint, 95)
+        if p95 is None:
+            return DEFAULT_HEDGE_DELAY
+        return max(MIN_HEDGE_DELAY, p95)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            endpoints = list(self._samples)
+        return {
+            endpoint: {
+                "samples": len(self._samples[endpoint]),
+                "p50": self.percentile(endpoint, 50),
+                "p95": self.percentile(endpoint, 95),
+            }
+            for endpoint in endpoints
+        }
+
+
+class HedgeBudget:
+    """Each primary request earns HEDGE_BUDGET_RATIO of a hedge; a hedge spends one."""
+
+    def __init__(self, ratio: float = HEDGE_BUDGET_RATIO, burst: float = HEDGE_BUDGET_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._balance = burst
+        self._lock = threading.Lock()
+        self.primaries = 0
+        self.hedges = 0
+        self.hedges_won = 0
+        self.denied = 0
+
+    def record_primary(self):
+        with self._lock:
+            self.primaries += 1
+            self._balance = min(self.burst, self._balance + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self._balance < 1.0:
+                self.denied += 1
+                return False
+            self._balance -= 1.0
+            self.hedges += 1
+            return True
+
+    def record_hedge_win(self):
+        with self._lock:
+            self.hedges_won += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "primaries": self.primaries,
+                "hedges": self.hedges,
+                "hedges_won": self.hedges_won,
+                "denied_by_budget": self.denied,
+                "hedge_rate": round(self.hedges / self.primaries, 3) if self.primaries else 0.0,
+            }
+
+
+latencies = LatencyTracker()
+budget = HedgeBudget()
+_HEDGE_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+
+
+def _timed(endpoint: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    latencies.record(endpoint, time.perf_counter() - start)
+    return result
+
+
+def hedged_call(endpoint: str, fn: Callable[..., Any], *args, can_hedge: Optional[Callable[[], bool]] = None, **kwargs) -> Any:
+    """
+    Run an idempotent read, sending a duplicate if it outlives the endpoint's p95.
+
+    Args:
+        endpoint: Endpoint key used for latency learning (see endpoint_key)
+        fn: Function performing the read
+        *args, **kwargs: Passed through to fn
+        can_hedge: Optional extra admission check for the duplicate (e.g. a rate limiter)
+
+    Returns:
+        The result of whichever attempt succeeds first
+
+    Raises:
+        DeadlineExceeded: When no attempt answers before the current deadline
+    """
+    deadline = current_deadline()
+    if not HEDGING_ENABLED and deadline is None:
+        return _timed(endpoint, fn, *args, **kwargs)
+
+    def remaining() -> Optional[float]:
+        return deadline.remaining() if deadline is not None else None
+
+    def submit(started: Optional[threading.Event] = None) -> Any:
+        def run():
+            if started is not None:
+                started.set()
+            return _timed(endpoint, fn, *args, **kwargs)
+
+        # Worker threads run in a copy of the caller's context so the deadline propagates
+        return _HEDGE_POOL.submit(contextvars.copy_context().run, run)
+
+    def result_within_deadline(future) -> Any:
+        try:
+            return future.result(timeout=remaining())
+        except FutureTimeoutError:
+            raise DeadlineExceeded(f"{endpoint} did not answer within the remaining budget") from None
+
+    started = threading.Event()
+    primary = submit(started)
+    if not HEDGING_ENABLED:
+        return result_within_deadline(primary)
+
+    budget.record_primary()
+    # Time queued for a worker is local saturation, not upstream slowness (and
+    # _timed never learns from it), so the hedge clock starts with the primary
+    if not started.wait(remaining()):
+        primary.cancel()
+        raise DeadlineExceeded(f"{endpoint} did not start within the remaining budget")
+    hedge_delay = latencies.hedge_delay(endpoint)
+    if deadline is not None and hedge_delay >= deadline.remaining():
+        # A hedge could not answer in time either
+        return result_within_deadline(primary)
+    done, _ = wait([primary], timeout=hedge_delay)
+    if done or not budget.try_spend() or (can_hedge is not None and not can_hedge()):
+        return result_within_deadline(primary)
+
+    hedge = submit()
+    pending = {primary, hedge}
+    error = None
+    while pending:
+        done, pending = wait(pending, timeout=remaining(), return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded(f"{endpoint} did not answer within the remaining budget")
+        for future in done:
+            if future.exception() is None:
+                if future is hedge:
+                    budget.record_hedge_win()
+                # The losing attempt finishes in the background and returns its connection to the pool
+                return future.result()
+            error = future.exception()
+    raise error
+
+
+async def hedged_call_async(endpoint: str, make_request: Callable[[], Awaitable[Any]], can_hedge: Optional[Callable[[], bool]] = None) -> Any:
+    """
+    Async variant of hedged_call; the losing attempt is cancelled.
+
+    Args:
+        endpoint: Endpoint key used for latency learning
+        make_request: Zero-argument factory returning a new request coroutine
+        can_hedge: Optional extra admission check for the duplicate
+
+    Returns:
+        The result of whichever attempt succeeds first
+    """
+    async def timed():
+        start = time.perf_counter()
+        result = await make_request()
+        latencies.record(endpoint, time.perf_counter() - start)
+        return result
+
+    if not HEDGING_ENABLED:
+        return await timed()
+
+    budget.record_primary()
+    primary = asyncio.ensure_future(timed())
+    done, _ = await asyncio.wait({primary}, timeout=latencies.hedge_delay(endpoint))
+    if done or not budget.try_spend() or (can_hedge is not None and not can_hedge()):
+        return await primary
+
+    hedge = asyncio.ensure_future(timed())
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        budget.record_hedge_win()
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def get_hedging_stats() -> Dict[str, Any]:
+    """Return hedge budget usage and learned per-endpoint latencies."""
+    return {"enabled": HEDGING_ENABLED, "budget": budget.stats(), "endpoints": latencies.stats()}
@@ -0,0 +1,189 @@
+"""
+Shared Pooled HTTP Client for Fantasy Platform APIs
+
+A recap makes many small requests to the same hosts, so paying a TCP + TLS
+handshake for each one dominates latency. This module keeps one pooled
+httpx.Client per upstream (HTTP/2 when the h2 package is installed) with
+keep-alive, timeouts, gzip and retries with jittered exponential backoff.
+
+Connection reuse is tracked per client so it can be inspected in debug mode.
+"""
+
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional
+
+import httpx
+from streamlit.logger import get_logger
+
+from utils.hedging import endpoint_key, hedged_call
+from utils.rate_limiter import get_guard
+
+LOGGER = get_logger(__name__)
+
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=5.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=30.0)
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "commish/1.0",
+}
+
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.25  # seconds
+BACKOFF_CAP = 4.0  # seconds
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class ConnectionStats:
+    """Counts requests and how many of them reused an existing connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._streams = weakref.WeakSet()
+        self.requests = 0
+        self.new_connections = 0
+        self.retries = 0
+        self.errors = 0
+        self.http_versions: Dict[str, int] = {}
+
+    def record_response(self, response: httpx.Response):
+        stream = response.extensions.get("network_stream")
+        http_version = response.http_version
+        with self._lock:
+            self.requests += 1
+            self.http_versions[http_version] = self.http_versions.get(http_version, 0) + 1
+            if stream is not None and stream not in self._streams:
+                self._streams.add(stream)
+                self.new_connections += 1
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(self.requests - self.new_connections, 0)
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": reused,
+                "reuse_rate": round(reused / self.requests, 3) if self.requests else 0.0,
+                "retries": self.retries,
+                "errors": self.errors,
+                "http_versions": dict(self.http_versions),
+            }
+
+
+class PooledHttpClient:
+    """A keep-alive connection pool with timeouts and jittered retries."""
+
+    def __init__(self, name: str, timeout: httpx.Timeout = DEFAULT_TIMEOUT, limits: httpx.Limits = DEFAULT_LIMITS):
+        self.name = name
+        self.stats = ConnectionStats()
+        self.client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            timeout=timeout,
+            limits=limits,
+            headers=DEFAULT_HEADERS,
+            follow_redirects=True,
+            event_hooks={"response": [self.stats.record_response]},
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, hedge: bool = True) -> httpx.Response:
+        """
+        GET a URL, retrying transport errors and retryable status codes.
+
+        Each attempt is hedged: if it outlives the endpoint's p95 latency a
+        duplicate is sent (budget and rate limit permitting).
+
+        Args:
+            url: Absolute URL
+            params: Optional query parameters
+            hedge: False for bulk or static downloads, whose duration says
+                nothing about a stall and which are too big to send twice
+
+        Returns:
+            httpx.Response with a successful status code
+
+        Raises:
+            httpx.HTTPError: When the request still fails after MAX_RETRIES retries
+            CircuitOpenError: When the upstream host's circuit breaker is open
+        """
+        parsed = httpx.URL(url)
+        guard = get_guard(parsed.host)
+        endpoint = endpoint_key(parsed.host, parsed.path)
+        for attempt in range(MAX_RETRIES + 1):
+            guard.before_request()
+            try:
+                if hedge:
+                    response = hedged_call(endpoint, self.client.get, url, params=params, can_hedge=guard.try_acquire)
+                else:
+                    response = self.client.get(url, params=params)
+                throttle_delay = guard.record_status(response.status_code, response.headers.get("Retry-After"))
+                if response.status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
+                    self.stats.record_retry()
+                    # Throttled responses wait in the guard's paused bucket instead
+                    if throttle_delay is None:
+                        time.sleep(self._backoff(attempt))
+                    continue
+                response.raise_for_status()
+                return response
+            except httpx.TransportError as e:
+                guard.record_failure()
+                if attempt >= MAX_RETRIES:
+                    self.stats.record_error()
+                    raise
+                LOGGER.debug(f"{self.name} request to {url} failed ({type(e).__name__}), retrying")
+                self.stats.record_retry()
+                time.sleep(self._backoff(attempt))
+            except httpx.HTTPStatusError:
+                self.stats.record_error()
+                raise
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, hedge: bool = True) -> Any:
+        """GET a URL and decode its JSON body (see get for hedge)."""
+        return self.get(url, params=params, hedge=hedge).json()
+
+
+_CLIENTS: Dict[str, PooledHttpClient] = {}
+_CLIENTS_LOCK = threading.Lock()
+_EXTRA_STATS: Dict[str, ConnectionStats] = {}
+
+
+def get_http_client(name: str) -> PooledHttpClient:
+    """Return the process-wide pooled client for an upstream (e.g. 'sleeper')."""
+    with _CLIENTS_LOCK:
+        if name not in _CLIENTS:
+            _CLIENTS[name] = PooledHttpClient(name)
+        return _CLIENTS[name]
+
+
+def register_connection_stats(name: str, stats: ConnectionStats):
+    """Expose stats for a client managed elsewhere (e.g. the async Sleeper client)."""
+    with _CLIENTS_LOCK:
+        _EXTRA_STATS[name] = stats
+
+
+def get_connection_stats() -> Dict[str, Any]:
+    """Return connection reuse statistics for every pooled client."""
+    with _CLIENTS_LOCK:
+        stats = {name: client.stats for name, client in _CLIENTS.items()}
+        stats.update(_EXTRA_STATS)
+    return {name: client_stats.snapshot() for name, client_stats in stats.items()}
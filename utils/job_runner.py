@@ -0,0 +1,200 @@
+"""
+Background Job Runner for Long-Running Recap Work
+
+Streamlit reruns the whole script on every widget interaction, which used to
+throw away an in-flight recap (league fetch, stats, LLM stream, PDF). Jobs
+submitted here run on a shared thread pool outside the script thread; the UI
+polls their progress and partial output and picks them back up after a rerun.
+
+Jobs are keyed by the submitting session and a hash of their parameters, so
+resubmitting the same request reuses the running or completed job instead of
+starting a new one. The work is I/O bound (HTTP and streaming), so threads
+are used rather than processes.
+
+Job functions must not call Streamlit APIs; they report through the Job.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from streamlit.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+# Generations wait for utils.admission on these threads, so there are more
+# workers than LLM slots; the fair queue can only order jobs that reach it
+JOB_WORKERS = int(os.environ.get("COMMISH_JOB_WORKERS", "16"))
+# Finished jobs are kept this long (seconds) so reruns and revisits can reuse them
+JOB_RETENTION = 3600
+
+# Name of the output stream used when a job produces a single one
+DEFAULT_STREAM = "main"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+def params_hash(params: Dict[str, Any]) -> str:
+    """Stable digest of job parameters (credentials never appear in the key in plain text)."""
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class Job:
+    """State of one background job, safe to read from the script thread while it runs."""
+
+    def __init__(self, key: tuple, kind: str):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.kind = kind
+        self.status = QUEUED
+        self.progress = 0
+        self.stage = "Queued..."
+        self.data: Dict[str, Any] = {}
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.error_traceback: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self._streams: Dict[str, List[str]] = {DEFAULT_STREAM: []}
+        self._lock = threading.Lock()
+
+    # Called from the job thread
+
+    def update(self, progress: Optional[int] = None, stage: Optional[str] = None, **data):
+        """Report progress, the current stage and any intermediate data."""
+        with self._lock:
+            if progress is not None:
+                self.progress = progress
+            if stage is not None:
+                self.stage = stage
+            self.data.update(data)
+
+    def append_output(self, text: str, stream: str = DEFAULT_STREAM):
+        """Append streamed output so the UI can render it while the job runs."""
+        with self._lock:
+            self._streams.setdefault(stream, []).append(text)
+
+    # Called from the script thread
+
+    @property
+    def output(self) -> str:
+        with self._lock:
+            return "".join(self._streams[DEFAULT_STREAM])
+
+    def read_output(self, start: int = 0, stream: str = DEFAULT_STREAM):
+        """
+        Output chunks appended since a previous read.
+
+        Returns:
+            Tuple of (new text, index to pass as start next time)
+        """
+        with self._lock:
+            chunks = self._streams.get(stream, [])
+            return "".join(chunks[start:]), len(chunks)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "id": self.id,
+                "kind": self.kind,
+                "status": self.status,
+                "progress": self.progress,
+                "stage": self.stage,
+                "output_chars": sum(len(chunk) for chunks in self._streams.values() for chunk in chunks),
+                "age_seconds": round(time.time() - self.created_at, 1),
+            }
+
+
+class JobRunner:
+    """Thread pool plus a registry of jobs keyed by (session, kind, params hash)."""
+
+    def __init__(self, max_workers: int = JOB_WORKERS):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="commish-job")
+        self._jobs: Dict[tuple, Job] = {}
+        self._lock = threading.Lock()
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION
+        for key, job in list(self._jobs.items()):
+            if job.finished and job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[key]
+
+    def _run(self, job: Job, fn: Callable[..., Any], params: Dict[str, Any]):
+        job.status = RUNNING
+        # finished_at is set before the terminal status is published, so
+        # _prune never sees a finished job without it
+        try:
+            job.result = fn(job, params)
+            job.update(progress=100, stage="Done!")
+            job.finished_at = time.time()
+            job.status = DONE
+        except Exception as e:
+            LOGGER.exception(e)
+            job.error = str(e)
+            job.error_traceback = traceback.format_exc()
+            job.finished_at = time.time()
+            job.status = FAILED
+
+    def submit(self, session_id: str, kind: str, params: Dict[str, Any], fn: Callable[[Job, Dict[str, Any]], Any]) -> Job:
+        """
+        Start a job, or return the existing one for the same session and parameters.
+
+        Failed jobs are replaced so the user can retry.
+
+        Args:
+            session_id: Identifier of the submitting session
+            kind: Job type, e.g. 'recap'
+            params: Job parameters; also passed to fn
+            fn: Callable run on the pool as fn(job, params)
+
+        Returns:
+            The Job
+        """
+        key = (session_id, kind, params_hash(params))
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and job.status != FAILED:
+                return job
+            job = Job(key, kind)
+            self._jobs[key] = job
+        self._pool.submit(self._run, job, fn, params)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return next((job for job in self._jobs.values() if job.id == job_id), None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts: Dict[str, int] = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"workers": self._pool._max_workers, "jobs": counts}
+
+
+_RUNNER: Optional[JobRunner] = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner."""
+    global _RUNNER
+    with _RUNNER_LOCK:
+        if _RUNNER is None:
+            _RUNNER = JobRunner()
+        return _RUNNER
@@ -3,6 +3,8 @@ OpenAI Model Configuration and Pricing
 Contains model definitions, pricing data, and helper functions for model selection and cost calculation.
 """
 
+from utils import token_counter
+
 # Available OpenAI models organized by category with pricing information
 OPENAI_MODELS = {
     "💰 Best for Creative Tasks": {
@@ -37,6 +39,52 @@ MODEL_PRICING = {
     "gpt-3.5-turbo": {"input": 0.50, "output": 1.50}
 }
 
+# Discount OpenAI gives on prompt tokens served from its prompt cache, by model
+# family: 50% for GPT-4o and o3-mini, 75% for o3 and o4-mini, 90% for GPT-5.
+# Models without an entry don't cache prompts. The resulting "cached_input"
+# price is derived from "input" so the two can't drift apart.
+CACHED_INPUT_DISCOUNTS = {
+    "gpt-4o": 0.50,
+    "gpt-4o-mini": 0.50,
+    "gpt-5": 0.90,
+    "o3": 0.75,
+    "o3-mini": 0.50,
+    "o4-mini": 0.75,
+}
+for _model, _discount in CACHED_INPUT_DISCOUNTS.items():
+    MODEL_PRICING[_model]["cached_input"] = round(MODEL_PRICING[_model]["input"] * (1 - _discount), 6)
+
+# The Batch API bills input and output tokens at half the synchronous price
+BATCH_PRICE_MULTIPLIER = 0.5
+
+# Fallback chains for the model router (utils.model_router): when a model is
+# too slow, over the cost ceiling or overloaded, the next one is tried in order.
+# A fallback never costs more per token than the model it replaces; gpt-4o-mini
+# is the cheapest model, so its chain ends there.
+MODEL_FALLBACKS = {
+    "o3": ["o4-mini", "gpt-4o-mini"],
+    "o3-mini": ["o4-mini", "gpt-4o-mini"],
+    "o4-mini": ["gpt-4o-mini"],
+    "gpt-5": ["o4-mini", "gpt-4o-mini"],
+    "gpt-4-turbo": ["gpt-4o", "gpt-4o-mini"],
+    "gpt-4o": ["gpt-4o-mini"],
+    "gpt-4o-mini": [],
+    "gpt-3.5-turbo": ["gpt-4o-mini"],
+}
+
+# Typical latency per model, used by the router until it has measured one:
+# seconds to the first token (reasoning models think first) and output tokens/s
+MODEL_LATENCY_PRIORS = {
+    "gpt-4o": {"ttft": 0.8, "tokens_per_second": 80},
+    "gpt-4o-mini": {"ttft": 0.5, "tokens_per_second": 100},
+    "gpt-5": {"ttft": 10.0, "tokens_per_second": 60},
+    "o3": {"ttft": 15.0, "tokens_per_second": 60},
+    "o3-mini": {"ttft": 6.0, "tokens_per_second": 120},
+    "o4-mini": {"ttft": 6.0, "tokens_per_second": 110},
+    "gpt-4-turbo": {"ttft": 1.0, "tokens_per_second": 30},
+    "gpt-3.5-turbo": {"ttft": 0.4, "tokens_per_second": 100},
+}
+
 # Model recommendations for fantasy football summaries
 MODEL_RECOMMENDATIONS = {
     "gpt-4o-mini": {"badge": "⭐ Recommended", "reason": "Best creativity/cost balance"},
@@ -54,34 +102,57 @@ def get_flattened_models():
             all_models.append((f"{category}: {description}", model_id))
     return all_models
 
-def calculate_cost(usage_data, model_id):
+def get_fallback_chain(model_id):
+    """The model followed by its configured fallbacks, without repeats"""
+    chain = [model_id]
+    for fallback in MODEL_FALLBACKS.get(model_id, []):
+        if fallback not in chain:
+            chain.append(fallback)
+    return chain
+
+def calculate_cost(usage_data, model_id, batch=False):
     """
     Calculate the cost of an OpenAI API call based on usage data
     
     Args:
         usage_data: Object with prompt_tokens, completion_tokens, total_tokens
+            and optionally cached_tokens (prompt tokens served from the prompt cache)
         model_id: The model identifier (e.g., 'gpt-4o-mini')
+        batch: Price the call at Batch API rates
     
     Returns:
-        dict: Cost breakdown with prompt_cost, completion_cost, total_cost
+        dict: Cost breakdown with prompt_cost, completion_cost, total_cost and cache_savings
     """
     if model_id not in MODEL_PRICING:
         return {"error": f"Pricing not available for model: {model_id}"}
     
     pricing = MODEL_PRICING[model_id]
+    cached_tokens = min(getattr(usage_data, "cached_tokens", 0) or 0, usage_data.prompt_tokens)
+    cached_rate = pricing.get("cached_input", pricing["input"])
     
     # Convert tokens to cost (pricing is per 1M tokens)
-    prompt_cost = (usage_data.prompt_tokens / 1_000_000) * pricing["input"]
+    prompt_cost = (
+        ((usage_data.prompt_tokens - cached_tokens) / 1_000_000) * pricing["input"]
+        + (cached_tokens / 1_000_000) * cached_rate
+    )
     completion_cost = (usage_data.completion_tokens / 1_000_000) * pricing["output"]
+    cache_savings = (cached_tokens / 1_000_000) * (pricing["input"] - cached_rate)
+    if batch:
+        prompt_cost *= BATCH_PRICE_MULTIPLIER
+        completion_cost *= BATCH_PRICE_MULTIPLIER
+        cache_savings *= BATCH_PRICE_MULTIPLIER
     total_cost = prompt_cost + completion_cost
     
     return {
         "prompt_tokens": usage_data.prompt_tokens,
+        "cached_tokens": cached_tokens,
         "completion_tokens": usage_data.completion_tokens,
         "total_tokens": usage_data.total_tokens,
         "prompt_cost": prompt_cost,
         "completion_cost": completion_cost,
         "total_cost": total_cost,
+        "cache_savings": cache_savings,
+        "batch": batch,
         "model": model_id
     }
 
@@ -90,7 +161,7 @@ def estimate_cost(input_text, estimated_output_tokens, model_id):
     Estimate the cost before making an API call
     
     Args:
-        input_text: The input text to be sent
+        input_text: The input text to be sent, or the chat messages
         estimated_output_tokens: Estimated number of output tokens
         model_id: The model identifier
     
@@ -100,8 +171,11 @@ def estimate_cost(input_text, estimated_output_tokens, model_id):
     if model_id not in MODEL_PRICING:
         return {"error": f"Pricing not available for model: {model_id}"}
     
-    # Rough estimation: 4 characters = 1 token for English text
-    estimated_input_tokens = len(input_text) // 4
+    # Counted with the model's tokenizer (see utils.token_counter)
+    if isinstance(input_text, str):
+        estimated_input_tokens = token_counter.count_tokens(input_text, model_id)
+    else:
+        estimated_input_tokens = token_counter.count_message_tokens(input_text, model_id)
     
     pricing = MODEL_PRICING[model_id]
     
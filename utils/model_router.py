@@ -0,0 +1,266 @@
+"""
+Latency- and Cost-Aware Model Routing
+
+The recap used to go to whichever model was picked in the sidebar, even when
+that meant a minute-long wait on o3, and a 429 or 5xx just ended in an error
+message. The router sits in front of summary_generator.stream_summary:
+
+- ModelHealth records each model's time to first token, output throughput
+  and recent errors, falling back to model_config.MODEL_LATENCY_PRIORS until
+  a model has been measured.
+- ModelRouter.plan walks the model's fallback chain (model_config.MODEL_FALLBACKS)
+  and skips models predicted to miss the latency budget, exceed the cost
+  ceiling or that have been failing (timeouts, 429s and 5xx errors only; a
+  bad request says nothing about the model's health).
+- stream_routed_summary starts with the first remaining model and, if it
+  answers 429/5xx or the connection fails before any text was streamed,
+  moves on to the next one.
+
+Each choice is reported as a Route event so the cost panel can show it.
+Once text has been streamed, a failure is reported rather than mixing two
+models' output in one recap.
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import openai
+from streamlit.logger import get_logger
+
+from utils import summary_generator
+from utils.admission import get_admission_controller
+from utils.model_config import MODEL_LATENCY_PRIORS, estimate_cost, get_fallback_chain
+from utils.stream_events import Error, Route, TextDelta, Timing, Usage
+
+LOGGER = get_logger(__name__)
+
+# 0 means no limit
+DEFAULT_LATENCY_BUDGET = float(os.environ.get("COMMISH_LATENCY_BUDGET", "0"))  # seconds
+DEFAULT_COST_CEILING = float(os.environ.get("COMMISH_COST_CEILING", "0"))  # dollars
+
+HEALTH_WINDOW = 50  # generations kept per model
+MIN_HEALTH_SAMPLES = 3  # measurements needed before they replace the priors
+# A model whose recent requests mostly failed is skipped until they age out
+ERROR_RATE_THRESHOLD = 0.5
+ERROR_WINDOW_SECONDS = 300
+FAILOVER_STATUS_CODES = {429, 500, 502, 503, 504}
+UNKNOWN_MODEL_PRIOR = {"ttft": 2.0, "tokens_per_second": 50}
+
+
+class ModelHealth:
+    """Recent latency, throughput and outcomes of one model."""
+
+    def __init__(self, model: str, window: int = HEALTH_WINDOW):
+        self.model = model
+        self._ttft = deque(maxlen=window)
+        self._tokens_per_second = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)  # (timestamp, succeeded)
+        self._lock = threading.Lock()
+
+    def record_success(self, timing: Timing):
+        with self._lock:
+            if timing.time_to_first_token is not None:
+                self._ttft.append(timing.time_to_first_token)
+            if timing.tokens_per_second > 0:
+                self._tokens_per_second.append(timing.tokens_per_second)
+            self._outcomes.append((time.time(), True))
+
+    def record_error(self):
+        with self._lock:
+            self._outcomes.append((time.time(), False))
+
+    def _measured(self, samples: deque, prior_key: str) -> float:
+        if len(samples) >= MIN_HEALTH_SAMPLES:
+            return statistics.median(samples)
+        return MODEL_LATENCY_PRIORS.get(self.model, UNKNOWN_MODEL_PRIOR)[prior_key]
+
+    def expected_latency(self, output_tokens: int) -> float:
+        """Predicted seconds to generate output_tokens, first token included."""
+        with self._lock:
+            ttft = self._measured(self._ttft, "ttft")
+            tokens_per_second = self._measured(self._tokens_per_second, "tokens_per_second")
+        return ttft + output_tokens / max(tokens_per_second, 1.0)
+
+    def error_rate(self) -> Optional[float]:
+        """Share of failed requests in the last ERROR_WINDOW_SECONDS, or None with too few."""
+        cutoff = time.time() - ERROR_WINDOW_SECONDS
+        with self._lock:
+            recent = [succeeded for at, succeeded in self._outcomes if at >= cutoff]
+        if len(recent) < MIN_HEALTH_SAMPLES:
+            return None
+        return recent.count(False) / len(recent)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            ttft = statistics.median(self._ttft) if self._ttft else None
+            tokens_per_second = statistics.median(self._tokens_per_second) if self._tokens_per_second else None
+            outcomes = len(self._outcomes)
+            errors = sum(1 for _, succeeded in self._outcomes if not succeeded)
+        return {
+            "requests": outcomes,
+            "errors": errors,
+            "recent_error_rate": self.error_rate(),
+            "median_ttft": ttft,
+            "median_tokens_per_second": tokens_per_second,
+        }
+
+
+class ModelRouter:
+    """Picks and orders models for a request from their health and the request's limits."""
+
+    def __init__(self):
+        self._health: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+        self.decisions = {"requested": 0, "rerouted": 0, "failovers": 0}
+
+    def health(self, model: str) -> ModelHealth:
+        with self._lock:
+            if model not in self._health:
+                self._health[model] = ModelHealth(model)
+            return self._health[model]
+
+    def count_decision(self, decision: str):
+        with self._lock:
+            self.decisions[decision] += 1
+
+    def plan(self, model: str, messages: List[Dict[str, str]], output_tokens: int,
+             latency_budget: Optional[float] = None,
+             cost_ceiling: Optional[float] = None) -> Tuple[List[str], List[str]]:
+        """
+        Order the fallback chain of a model for one request.
+
+        Args:
+            model: The requested model
+            messages: Chat messages to be sent (for the cost estimate)
+            output_tokens: Expected completion length
+            latency_budget: Seconds the whole generation should take (None/0 = no limit)
+            cost_ceiling: Most the generation should cost in dollars (None/0 = no limit)
+
+        Returns:
+            Tuple of (models to try in order, notes explaining skipped models)
+        """
+        candidates, notes = [], []
+        chain = get_fallback_chain(model)
+        for candidate in chain:
+            health = self.health(candidate)
+            latency = health.expected_latency(output_tokens)
+            cost = estimate_cost(messages, output_tokens, candidate).get("estimated_total_cost")
+            error_rate = health.error_rate()
+            if error_rate is not None and error_rate >= ERROR_RATE_THRESHOLD:
+                notes.append(f"{candidate} skipped: {error_rate:.0%} of recent requests failed")
+            elif latency_budget and latency > latency_budget:
+                notes.append(f"{candidate} skipped: ~{latency:.0f}s expected, over the {latency_budget:.0f}s budget")
+            elif cost_ceiling and cost is not None and cost > cost_ceiling:
+                notes.append(f"{candidate} skipped: ~${cost:.4f} expected, over the ${cost_ceiling:.4f} ceiling")
+            else:
+                candidates.append(candidate)
+
+        if not candidates:
+            # Nothing meets the limits; try the whole chain, fastest first
+            candidates = sorted(chain, key=lambda candidate: self.health(candidate).expected_latency(output_tokens))
+            notes.append(f"no model meets the limits; trying {candidates[0]} first as the fastest")
+        self.count_decision("requested")
+        if candidates[0] != model:
+            self.count_decision("rerouted")
+        return candidates, notes
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            health = dict(self._health)
+            decisions = dict(self.decisions)
+        return {"decisions": decisions, "models": {model: h.stats() for model, h in health.items()}}
+
+
+def should_fail_over(error: Exception) -> bool:
+    """
+    Whether another model may succeed where this error occurred.
+
+    True for overloads and outages (429, 5xx, timeouts, connection errors),
+    which also count against the model's health; False for bad requests.
+    """
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in FAILOVER_STATUS_CODES
+    return isinstance(error, openai.APIConnectionError)
+
+
+def stream_routed_summary(client, summary, character_choice, trash_talk_level, model="gpt-4o-mini",
+                          summary_format="Classic", latency_budget: Optional[float] = None,
+                          cost_ceiling: Optional[float] = None) -> Iterator[Any]:
+    """
+    generate_gpt4_summary_streaming with model routing and failover.
+
+    Args:
+        client: OpenAI client
+        summary: League summary
+        character_choice: Persona to write as
+        trash_talk_level: Trash talk intensity (1-10)
+        model: The requested model
+        summary_format: 'Classic' or 'Detailed'
+        latency_budget: Seconds the recap should take (None/0 = no limit)
+        cost_ceiling: Most the recap should cost in dollars (None/0 = no limit)
+
+    Yields:
+        A Route event before each attempt, then the usual stream events
+    """
+    router = get_model_router()
+    if summary_generator.get_cached_summary(summary, character_choice, trash_talk_level, model, summary_format) is not None:
+        # A cached recap of the requested model is instant and free; no reason to route
+        candidates, notes = [model], [f"{model} served from the completion cache"]
+    else:
+        messages = summary_generator.build_summary_messages(summary, character_choice, trash_talk_level, summary_format)
+        output_tokens = summary_generator.EXPECTED_OUTPUT_TOKENS.get(summary_format, 1500)
+        candidates, notes = router.plan(model, messages, output_tokens, latency_budget, cost_ceiling)
+
+    for index, candidate in enumerate(candidates):
+        last = index == len(candidates) - 1
+        yield Route(model, candidate, list(notes))
+        # Leave retrying overloads to the next model rather than the SDK's backoff
+        attempt_client = client if last else client.with_options(max_retries=0)
+        streamed = False
+        replayed = False
+        try:
+            for event in summary_generator.stream_summary(
+                attempt_client, summary, character_choice, trash_talk_level, candidate, summary_format
+            ):
+                if isinstance(event, TextDelta):
+                    streamed = True
+                elif isinstance(event, Usage):
+                    replayed = event.from_cache
+                elif isinstance(event, Timing) and not replayed:
+                    router.health(candidate).record_success(event)
+                yield event
+            return
+        except Exception as e:
+            if should_fail_over(e):
+                router.health(candidate).record_error()
+            if streamed or last or not should_fail_over(e):
+                LOGGER.error(f"Summary generation failed on {candidate}: {e}")
+                yield Error(summary_generator.friendly_error_message(e), str(e))
+                return
+            LOGGER.warning(f"{candidate} failed before streaming ({e}); failing over to {candidates[index + 1]}")
+            notes.append(f"{candidate} failed ({getattr(e, 'status_code', type(e).__name__)}); failed over")
+            if getattr(e, "status_code", None) == 429:
+                # No Error event reaches the admission ticket for this one
+                get_admission_controller().record_throttle()
+            router.count_decision("failovers")
+
+
+_ROUTER: Optional[ModelRouter] = None
+_ROUTER_LOCK = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide model router."""
+    global _ROUTER
+    with _ROUTER_LOCK:
+        if _ROUTER is None:
+            _ROUTER = ModelRouter()
+        return _ROUTER
+
+
+def get_model_router_stats() -> Dict[str, Any]:
+    return get_model_router().stats()
@@ -0,0 +1,273 @@
+"""
+Shared, Right-Sized OpenAI Connection Pools
+
+The OpenAI client used to be built in app.py with room for five connections,
+only one of which was kept alive. Every concurrent session shared it, so
+simultaneous recaps queued for a connection or paid a new TLS handshake.
+Because app.py is re-executed on every rerun, its module global did not
+reliably survive either. The clients here are process-wide:
+
+- The pools are sized from the expected number of concurrent completions,
+  which the admission controller caps at COMMISH_LLM_MAX_IN_FLIGHT.
+  Keep-alive covers the whole pool, so connections are not closed between
+  recaps.
+- At startup, a few connections are opened in the background with a free
+  models.list() call, so the first recap skips the TCP/TLS setup.
+- An instrumented transport records how long each request waited for a
+  pooled connection, plus new connections and TLS handshakes (churn). These
+  appear next to the other pools under "Connection Pools" in debug mode.
+"""
+
+import os
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+from streamlit.logger import get_logger
+
+from utils.admission import MAX_IN_FLIGHT
+from utils.http_client import ConnectionStats, register_connection_stats
+
+LOGGER = get_logger(__name__)
+
+# Concurrent completions to size the pools for (default: the admission limit)
+OPENAI_POOL_SIZE = int(os.environ.get("COMMISH_OPENAI_POOL_SIZE", str(MAX_IN_FLIGHT)))
+# Extra connections for moderation calls, failover attempts and warm-up overlap
+OPENAI_POOL_HEADROOM = 2
+OPENAI_KEEPALIVE_EXPIRY = float(os.environ.get("COMMISH_OPENAI_KEEPALIVE_EXPIRY", "90"))  # seconds
+OPENAI_PREWARM_CONNECTIONS = int(os.environ.get("COMMISH_OPENAI_PREWARM", "2"))
+
+# One policy for the sync and async clients, both of which stream recaps: reasoning
+# models can think for minutes before the first token, so reads get the SDK's
+# default 600s while a dead host still fails fast on connect
+OPENAI_TIMEOUT = httpx.Timeout(600.0, connect=5.0)
+POOL_WAIT_WINDOW = 500  # samples kept
+# Waits shorter than this are bookkeeping, not queueing for a connection
+POOL_WAIT_THRESHOLD = 0.005  # seconds
+
+
+def pool_limits(concurrency: int) -> httpx.Limits:
+    """Connection limits for a pool serving `concurrency` simultaneous completions."""
+    size = max(concurrency, 1) + OPENAI_POOL_HEADROOM
+    return httpx.Limits(max_connections=size, max_keepalive_connections=size,
+                        keepalive_expiry=OPENAI_KEEPALIVE_EXPIRY)
+
+
+class PoolStats(ConnectionStats):
+    """ConnectionStats plus time spent waiting for a pooled connection and connection churn."""
+
+    def __init__(self, limits: httpx.Limits):
+        super().__init__()
+        self.limits = limits
+        self.transport = None
+        self.pool_waits = deque(maxlen=POOL_WAIT_WINDOW)
+        self.waited_requests = 0
+        self.connections_opened = 0
+        self.tls_handshakes = 0
+        self.tls_seconds = 0.0
+        self.prewarmed = 0
+
+    def record_pool_wait(self, seconds: float):
+        with self._lock:
+            self.pool_waits.append(seconds)
+            if seconds >= POOL_WAIT_THRESHOLD:
+                self.waited_requests += 1
+
+    def record_connect(self):
+        with self._lock:
+            self.connections_opened += 1
+
+    def record_tls(self, seconds: float):
+        with self._lock:
+            self.tls_handshakes += 1
+            self.tls_seconds += seconds
+
+    def record_prewarm(self, connections: int):
+        with self._lock:
+            self.prewarmed += connections
+
+    def _pool_state(self) -> Dict[str, int]:
+        pool = getattr(self.transport, "_pool", None)
+        if pool is None:
+            return {}
+        connections = list(pool.connections)
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {"open_connections": len(connections), "idle_connections": idle}
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = super().snapshot()
+        with self._lock:
+            waits = sorted(self.pool_waits)
+            snapshot.update({
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry,
+                "prewarmed_connections": self.prewarmed,
+                "connections_opened": self.connections_opened,
+                "churn_rate": round(self.connections_opened / self.requests, 3) if self.requests else 0.0,
+                "tls_handshakes": self.tls_handshakes,
+                "avg_tls_seconds": round(self.tls_seconds / self.tls_handshakes, 3) if self.tls_handshakes else None,
+                "waited_for_connection": self.waited_requests,
+                "pool_wait_p50": round(statistics.median(waits), 4) if waits else None,
+                "pool_wait_p95": round(waits[int(0.95 * (len(waits) - 1))], 4) if waits else None,
+                "pool_wait_max": round(waits[-1], 4) if waits else None,
+            })
+        snapshot.update(self._pool_state())
+        return snapshot
+
+
+class _RequestTrace:
+    """
+    httpcore trace events of one request.
+
+    The request has its connection once a new one starts connecting or a
+    pooled one starts sending headers; the time until then is the pool wait.
+    """
+
+    def __init__(self, stats: PoolStats):
+        self.stats = stats
+        self.started = time.monotonic()
+        self.acquired = False
+        self.tls_started: Optional[float] = None
+
+    def on_event(self, name: str):
+        now = time.monotonic()
+        if not self.acquired and (name == "connection.connect_tcp.started"
+                                  or name.endswith(".send_request_headers.started")):
+            self.acquired = True
+            self.stats.record_pool_wait(now - self.started)
+        if name == "connection.connect_tcp.started":
+            self.stats.record_connect()
+        elif name == "connection.start_tls.started":
+            self.tls_started = now
+        elif name == "connection.start_tls.complete" and self.tls_started is not None:
+            self.stats.record_tls(now - self.tls_started)
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    """HTTPTransport that reports pool waits and new connections to PoolStats."""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(limits=stats.limits, **kwargs)
+        self.stats = stats
+        stats.transport = self
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        trace = _RequestTrace(self.stats)
+        previous = request.extensions.get("trace")
+
+        def on_trace(name, info):
+            trace.on_event(name)
+            if previous is not None:
+                previous(name, info)
+
+        request.extensions = {**request.extensions, "trace": on_trace}
+        return super().handle_request(request)
+
+
+class AsyncInstrumentedTransport(httpx.AsyncHTTPTransport):
+    """AsyncHTTPTransport counterpart of InstrumentedTransport."""
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        super().__init__(limits=stats.limits, **kwargs)
+        self.stats = stats
+        stats.transport = self
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        trace = _RequestTrace(self.stats)
+        previous = request.extensions.get("trace")
+
+        async def on_trace(name, info):
+            trace.on_event(name)
+            if previous is not None:
+                await previous(name, info)
+
+        request.extensions = {**request.extensions, "trace": on_trace}
+        return await super().handle_async_request(request)
+
+
+def prewarm(client: OpenAI, stats: PoolStats, connections: int = OPENAI_PREWARM_CONNECTIONS):
+    """
+    Open pooled connections ahead of the first recap.
+
+    Sends `connections` concurrent models.list() calls (free, and they
+    authenticate the key) so each one sets up its own TCP/TLS connection.
+    """
+    connections = min(connections, stats.limits.max_keepalive_connections)
+    if connections <= 0:
+        return
+    started = time.monotonic()
+    warm_client = client.with_options(max_retries=0)
+
+    def warm(_):
+        try:
+            warm_client.models.list()
+            return True
+        except Exception as e:
+            LOGGER.warning(f"OpenAI connection pre-warm failed: {e}")
+            return False
+
+    with ThreadPoolExecutor(max_workers=connections, thread_name_prefix="openai-prewarm") as pool:
+        warmed = sum(pool.map(warm, range(connections)))
+    stats.record_prewarm(warmed)
+    LOGGER.info(f"Pre-warmed {warmed} OpenAI connections in {time.monotonic() - started:.2f}s")
+
+
+_CLIENT: Optional[OpenAI] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_openai_client(organization: Optional[str], project: Optional[str], api_key: str,
+                      warm: bool = True) -> OpenAI:
+    """
+    Return the process-wide OpenAI client, creating it on first use.
+
+    Args:
+        organization: OpenAI organization id
+        project: OpenAI project id
+        api_key: API key
+        warm: Pre-warm connections in the background when the client is created
+
+    Returns:
+        The shared OpenAI client
+    """
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            stats = PoolStats(pool_limits(OPENAI_POOL_SIZE))
+            http_client = httpx.Client(
+                timeout=OPENAI_TIMEOUT,
+                transport=InstrumentedTransport(stats),
+                event_hooks={"response": [stats.record_response]},
+            )
+            _CLIENT = OpenAI(organization=organization, project=project, api_key=api_key, http_client=http_client)
+            register_connection_stats("openai", stats)
+            if warm:
+                threading.Thread(target=prewarm, args=(_CLIENT, stats), name="openai-prewarm", daemon=True).start()
+        return _CLIENT
+
+
+def build_async_openai_client(organization: Optional[str], project: Optional[str], api_key: str) -> AsyncOpenAI:
+    """
+    AsyncOpenAI client for the persona fan-out loop, sized like the sync pool
+    (admission bounds the generations of both together).
+
+    Must be called on the event loop that will use it.
+    """
+    stats = PoolStats(pool_limits(OPENAI_POOL_SIZE))
+
+    async def record_response(response: httpx.Response):
+        stats.record_response(response)
+
+    http_client = httpx.AsyncClient(
+        timeout=OPENAI_TIMEOUT,
+        transport=AsyncInstrumentedTransport(stats),
+        event_hooks={"response": [record_response]},
+    )
+    register_connection_stats("openai_async", stats)
+    return AsyncOpenAI(organization=organization, project=project, api_key=api_key, http_client=http_client)
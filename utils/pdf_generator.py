@@ -1,9 +1,17 @@
 """
 PDF Generator for Fantasy Football Recaps
 Converts AI-generated summaries into beautifully formatted PDF documents using ReportLab
+
+Built PDFs are content-addressed: the bytes are cached under a hash of
+everything that goes into the document, so reruns and repeat exports of the
+same recap reuse one ReportLab build per process (and across restarts when
+the disk tier is enabled).
 """
 
+import hashlib
 import io
+import json
+import os
 from datetime import datetime
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
@@ -14,6 +22,33 @@ from reportlab.pdfgen import canvas
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT, TA_JUSTIFY
 import streamlit as st
 
+from utils.cache_store import get_cache
+from utils.single_flight import SingleFlight
+
+PDF_CACHE_MAX_BYTES = int(os.environ.get("COMMISH_PDF_CACHE_MAX_BYTES", 16 * 1024 * 1024))
+PDF_CACHE_PERSIST = os.environ.get("COMMISH_PDF_CACHE_PERSIST", "1") != "0"
+
+_PDF_CACHE = get_cache("recap_pdfs", max_bytes=PDF_CACHE_MAX_BYTES, persistent=PDF_CACHE_PERSIST)
+# Concurrent requests for the same PDF wait for a single build
+_pdf_builds = SingleFlight()
+
+
+def pdf_cache_key(summary_content, character, league_name, week_number, summary_format, trash_talk_level) -> str:
+    """Content hash identifying a recap PDF; includes the date printed in the header."""
+    parts = [summary_content, character, league_name, week_number, summary_format, trash_talk_level,
+             datetime.now().strftime("%Y-%m-%d")]
+    return hashlib.sha256(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+
+
+def _build_pdf_cached(key, *args) -> bytes:
+    found, pdf_bytes = _PDF_CACHE.get(("pdf", key))
+    if found:
+        return pdf_bytes
+    pdf_bytes = build_pdf(*args)
+    _PDF_CACHE.set(("pdf", key), pdf_bytes)
+    return pdf_bytes
+
+
 def generate_pdf_from_summary(
     summary_content: str, 
     character: str, 
@@ -23,7 +58,34 @@ def generate_pdf_from_summary(
     trash_talk_level: int = 5
 ) -> bytes:
     """
-    Generate a PDF document from fantasy football summary content using ReportLab
+    Return the PDF for a summary, building it only if this exact recap hasn't been built before
+    
+    Args:
+        summary_content: The AI-generated summary text
+        character: Character persona used for the summary
+        league_name: Name of the fantasy league
+        week_number: Week being summarized
+        summary_format: Classic or Detailed format
+        trash_talk_level: Intensity level of trash talk (1-10)
+    
+    Returns:
+        bytes: PDF document as bytes
+    """
+    args = (summary_content, character, league_name, week_number, summary_format, trash_talk_level)
+    key = pdf_cache_key(*args)
+    return _pdf_builds.do(("pdf", key), _build_pdf_cached, key, *args)
+
+
+def build_pdf(
+    summary_content: str, 
+    character: str, 
+    league_name: str = "Fantasy Football League",
+    week_number: str = "Current Week",
+    summary_format: str = "Classic",
+    trash_talk_level: int = 5
+) -> bytes:
+    """
+    Build a PDF document from fantasy football summary content using ReportLab (uncached)
     
     Args:
         summary_content: The AI-generated summary text
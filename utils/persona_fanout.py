@@ -0,0 +1,162 @@
+"""
+Concurrent Multi-Persona Recaps
+
+Recapping the same week as several characters (or in both formats) used to
+mean one generate_gpt4_summary_streaming call after another. This module
+generates the variants concurrently with AsyncOpenAI, bounded by a
+semaphore, so the total wall time is close to that of the slowest variant.
+
+Every variant of a format sends the same system instructions followed by
+the same league summary (see summary_generator.build_summary_messages), so
+they share a prompt prefix. The first variant is started alone and the rest
+follow once it has produced its first token (or after a short wait), by
+which time OpenAI has processed, and can serve from cache, that prefix.
+
+Like the async Sleeper client, the AsyncOpenAI client lives on a background
+event loop thread shared by every session; synchronous callers use
+run_variants.
+"""
+
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Callable, List, Optional
+
+from streamlit.logger import get_logger
+
+from utils import summary_generator
+from utils.stream_events import Error
+
+LOGGER = get_logger(__name__)
+
+FANOUT_CONCURRENCY = int(os.environ.get("COMMISH_FANOUT_CONCURRENCY", "3"))
+MAX_VARIANTS = 6
+# Longest the other variants wait for the first one to warm the shared prefix
+PREFIX_WARMUP_SECONDS = 1.5
+FANOUT_TIMEOUT = 600.0  # seconds
+# How long a timed-out fan-out may take to stop its generations
+CANCEL_GRACE_SECONDS = 5.0
+
+
+class Variant:
+    """One persona/format combination of a recap."""
+
+    def __init__(self, character: str, summary_format: str):
+        self.character = character
+        self.summary_format = summary_format
+
+    @property
+    def key(self) -> str:
+        return f"{self.character} · {self.summary_format}"
+
+
+def build_variants(characters: List[str], formats: List[str]) -> List[Variant]:
+    """Every character in every format, de-duplicated and capped at MAX_VARIANTS."""
+    variants = []
+    seen = set()
+    for character in characters:
+        character = character.strip()
+        for summary_format in formats:
+            if character and (character, summary_format) not in seen:
+                seen.add((character, summary_format))
+                variants.append(Variant(character, summary_format))
+    return variants[:MAX_VARIANTS]
+
+
+class _FanoutLoop:
+    """A daemon thread running the event loop that owns the shared AsyncOpenAI client."""
+
+    def __init__(self, make_client: Callable[[], Any]):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="openai-fanout", daemon=True)
+        self._thread.start()
+        self.client = self.run(self._create_client(make_client), timeout=30.0)
+
+    async def _create_client(self, make_client):
+        # Created on the loop so its connection pool belongs to it
+        return make_client()
+
+    def run(self, coro, timeout: float = FANOUT_TIMEOUT):
+        """
+        Run a coroutine on the loop and wait for its result.
+
+        On timeout the coroutine is cancelled, and given CANCEL_GRACE_SECONDS
+        to stop, before TimeoutError is raised; otherwise its generations
+        would keep streaming after the caller gave up its admission slots.
+        """
+        finished = threading.Event()
+
+        async def tracked():
+            try:
+                return await coro
+            finally:
+                finished.set()
+
+        future = asyncio.run_coroutine_threadsafe(tracked(), self.loop)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            if not finished.wait(CANCEL_GRACE_SECONDS):
+                LOGGER.warning("Timed-out fan-out did not stop within the cancellation grace period")
+            raise
+
+
+_LOOP: Optional[_FanoutLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _get_loop(make_client: Callable[[], Any]) -> _FanoutLoop:
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            _LOOP = _FanoutLoop(make_client)
+        return _LOOP
+
+
+async def _generate_all(client, summary: str, variants: List[Variant], trash_talk_level, model: str,
+                        on_event: Callable[[Variant, Any], None], max_concurrency: int):
+    semaphore = asyncio.Semaphore(max_concurrency)
+    prefix_warm = asyncio.Event()
+
+    async def generate(index: int, variant: Variant):
+        if index > 0:
+            try:
+                await asyncio.wait_for(prefix_warm.wait(), PREFIX_WARMUP_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+        async with semaphore:
+            try:
+                async for event in summary_generator.generate_summary_streaming_async(
+                    client, summary, variant.character, trash_talk_level, model, variant.summary_format
+                ):
+                    prefix_warm.set()
+                    on_event(variant, event)
+            except Exception as e:
+                LOGGER.exception(e)
+                on_event(variant, Error("❌ Unable to generate AI summary. Please try again later.", str(e)))
+            finally:
+                prefix_warm.set()
+
+    await asyncio.gather(*(generate(index, variant) for index, variant in enumerate(variants)))
+
+
+def run_variants(make_client: Callable[[], Any], summary: str, variants: List[Variant], trash_talk_level,
+                 model: str, on_event: Callable[[Variant, Any], None],
+                 max_concurrency: int = FANOUT_CONCURRENCY) -> None:
+    """
+    Generate every variant concurrently, reporting events as they arrive.
+
+    Args:
+        make_client: Builds the AsyncOpenAI client (called once per process)
+        summary: League summary shared by every variant
+        variants: Persona/format combinations to generate
+        trash_talk_level: Trash talk intensity (1-10)
+        model: Model id
+        on_event: Called as on_event(variant, event) from the loop thread for every stream event
+        max_concurrency: Most generations in flight at once
+    """
+    loop = _get_loop(make_client)
+    loop.run(_generate_all(loop.client, summary, variants, trash_talk_level, model, on_event, max_concurrency))
+
@@ -10,45 +10,34 @@ This module calculates objective power rankings based on multiple statistical me
 - Point Differential Analysis
 
 Supports multiple ranking formulas including Oberon Mt. Power Rating style calculations.
+League data is loaded through utils.season_data, so Sleeper, ESPN and Yahoo leagues
+share the same scoring code.
 """
 
-from sleeper_wrapper import League as SleeperLeague
-from utils import sleeper_helper, helper
-import datetime
+from utils.season_data import SeasonDataSource, SleeperSeasonSource
 import statistics
-from typing import List, Dict, Tuple, Any
+from typing import List, Dict, Tuple, Any, Optional
 
 
 class PowerRankingCalculator:
     """Calculate comprehensive power rankings for fantasy football teams."""
     
-    def __init__(self, league_id: str):
+    def __init__(self, league_id: str, data_source: Optional[SeasonDataSource] = None):
         self.league_id = league_id
-        self.league = SleeperLeague(league_id)
-        self.current_week = helper.get_current_week(datetime.datetime.now()) - 1
+        self.data_source = data_source or SleeperSeasonSource(league_id)
+        self.current_week = self.data_source.current_week
+        if not self.current_week or self.current_week < 1:
+            raise ValueError("no completed weeks yet this season")
         self.team_data = {}
         self.league_averages = {}
         
     def gather_team_data(self) -> Dict[str, Any]:
         """Collect all necessary data for power ranking calculations."""
         
-        # Get basic league data
-        rosters = self.league.get_rosters()
-        users = self.league.get_users()
-        standings = self.league.get_standings(rosters, users)
-        
-        # Create mappings
-        user_team_mapping = self.league.map_users_to_team_name(users)
-        roster_owner_mapping = self.league.map_rosterid_to_ownerid(rosters)
-        
         # Initialize team data structure
-        for roster in rosters:
-            owner_id = roster['owner_id']
-            team_name = user_team_mapping.get(owner_id, f"Team {roster['roster_id']}")
-            
-            self.team_data[team_name] = {
-                'roster_id': roster['roster_id'],
-                'owner_id': owner_id,
+        for team in self.data_source.get_teams():
+            self.team_data[team['team_name']] = {
+                'team_id': team['team_id'],
                 'weekly_scores': [],
                 'wins': 0,
                 'losses': 0,
@@ -61,11 +50,11 @@ class PowerRankingCalculator:
                 'loss_streak': 0
             }
         
-        # Collect weekly data
-        for week in range(1, self.current_week + 1):
+        # Collect weekly data (completed weeks are fetched concurrently and cached)
+        weekly_scoreboards = self.data_source.get_weekly_scoreboards(range(1, self.current_week + 1))
+        for week in sorted(weekly_scoreboards):
             try:
-                matchups = self.league.get_matchups(week)
-                scoreboards = sleeper_helper.calculate_scoreboards(matchups, user_team_mapping, roster_owner_mapping)
+                scoreboards = weekly_scoreboards[week]
                 
                 # Process each matchup
                 for matchup_id, teams in scoreboards.items():
@@ -275,18 +264,18 @@ class PowerRankingCalculator:
         return rankings
 
 
-def get_sleeper_power_rankings_data(league_id: str) -> Dict[str, Any]:
+def get_power_rankings_data(data_source: SeasonDataSource) -> Dict[str, Any]:
     """
-    Get raw power rankings data for a Sleeper league.
+    Get raw power rankings data for any supported league.
     
     Args:
-        league_id: Sleeper league ID
+        data_source: Season data source for the league (Sleeper, ESPN or Yahoo)
     
     Returns:
         Dictionary containing rankings data and metadata
     """
     try:
-        calculator = PowerRankingCalculator(league_id)
+        calculator = PowerRankingCalculator(data_source.league_id, data_source)
         rankings = calculator.generate_power_rankings()
         
         if not rankings:
@@ -302,6 +291,22 @@ def get_sleeper_power_rankings_data(league_id: str) -> Dict[str, Any]:
         return {"error": f"Error generating power rankings: {str(e)}"}
 
 
+def get_sleeper_power_rankings_data(league_id: str) -> Dict[str, Any]:
+    """
+    Get raw power rankings data for a Sleeper league.
+    
+    Args:
+        league_id: Sleeper league ID
+    
+    Returns:
+        Dictionary containing rankings data and metadata
+    """
+    try:
+        return get_power_rankings_data(SleeperSeasonSource(league_id))
+    except Exception as e:
+        return {"error": f"Error generating power rankings: {str(e)}"}
+
+
 def generate_sleeper_power_rankings(league_id: str) -> str:
     """
     Generate formatted power rankings for a Sleeper league.
@@ -313,7 +318,23 @@ def generate_sleeper_power_rankings(league_id: str) -> str:
         Formatted string containing power rankings and analysis
     """
     try:
-        calculator = PowerRankingCalculator(league_id)
+        return generate_power_rankings(SleeperSeasonSource(league_id))
+    except Exception as e:
+        return f"Error generating power rankings: {str(e)}"
+
+
+def generate_power_rankings(data_source: SeasonDataSource) -> str:
+    """
+    Generate formatted power rankings for any supported league.
+    
+    Args:
+        data_source: Season data source for the league (Sleeper, ESPN or Yahoo)
+    
+    Returns:
+        Formatted string containing power rankings and analysis
+    """
+    try:
+        calculator = PowerRankingCalculator(data_source.league_id, data_source)
         rankings = calculator.generate_power_rankings()
         
         if not rankings:
@@ -0,0 +1,373 @@
+"""
+Rate Limiting, Adaptive Backoff and Circuit Breaking for Upstream APIs
+
+Every fetch path (the pooled HTTP clients, the async Sleeper client and the
+espn_api / yfpy library calls) goes through an UpstreamGuard for its host:
+
+- Token bucket: a process-wide request budget per host, so concurrent and
+  batch fetching saturates the allowed throughput without getting banned.
+- Adaptive backoff: a 429 (or 503) halves the bucket's rate and pauses it for
+  the Retry-After period; successful requests recover the rate gradually.
+- Circuit breaker: after repeated failures the host is considered down and
+  calls fail fast with CircuitOpenError until a probe request succeeds.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+import requests
+from streamlit.logger import get_logger
+
+from utils.deadline import DeadlineExceeded, current_deadline
+from utils.hedging import hedged_call
+
+LOGGER = get_logger(__name__)
+
+SLEEPER_HOST = "api.sleeper.app"
+ESPN_HOST = "lm-api-reads.fantasy.espn.com"
+YAHOO_HOST = "fantasysports.yahooapis.com"
+
+# (requests per second, burst capacity) per upstream host
+HOST_LIMITS = {
+    SLEEPER_HOST: (15.0, 20),  # Sleeper asks clients to stay under 1000 calls/minute
+    ESPN_HOST: (4.0, 8),
+    YAHOO_HOST: (1.5, 5),
+}
+DEFAULT_LIMIT = (10.0, 20)
+
+THROTTLE_STATUS_CODES = {429, 503}
+FAILURE_STATUS_CODES = {500, 502, 503, 504}
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30.0  # seconds
+MAX_THROTTLE_DELAY = 60.0  # seconds
+LIBRARY_CALL_RETRIES = 2
+
+
+class CircuitOpenError(Exception):
+    """Raised when an upstream's circuit breaker is open and calls fail fast."""
+
+
+class RateLimitedError(Exception):
+    """Raised by guarded library calls that are still throttled after retries."""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds (HTTP dates are ignored)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket whose refill rate adapts to throttling (AIMD)."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.max_rate = rate
+        self.min_rate = rate / 16
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens: float) -> float:
+        """Take tokens (possibly going negative) and return how long the caller must wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = max(0.0, -self._tokens / self.rate)
+            return max(wait, self._paused_until - now)
+
+    def _refund(self, tokens: float):
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + tokens)
+
+    def acquire(self, tokens: float = 1.0):
+        """Block until the requested tokens are available, unless that would overrun the current deadline."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            deadline = current_deadline()
+            if deadline is not None and wait > deadline.remaining():
+                self._refund(tokens)
+                raise DeadlineExceeded(f"rate limit wait of {wait:.1f}s exceeds the remaining budget")
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0):
+        """Await until the requested tokens are available."""
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens only if they are available right now."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if now < self._paused_until or self._tokens < tokens:
+                return False
+            self._tokens -= tokens
+            return True
+
+    def adjust(self, tokens: float):
+        """Correct an earlier reservation once its real cost is known (negative gives tokens back)."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens - tokens)
+
+    def throttle(self, delay: float):
+        """Multiplicative decrease: halve the rate and pause the bucket for delay seconds."""
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self._paused_until = max(self._paused_until, time.monotonic() + delay)
+
+    def recover(self):
+        """Additive increase back towards the configured rate."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open probe after a timeout."""
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_timeout: float = CIRCUIT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = "half_open"
+                self._probe_in_flight = False
+            if self.state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = "closed"
+            self.failures = 0
+            self._probe_in_flight = False
+
+    def release_probe(self):
+        """End a half-open probe that neither proved the host up nor down (e.g. a deadline hit)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == "half_open" or self.failures >= self.failure_threshold:
+                self.state = "open"
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+
+class UpstreamGuard:
+    """Token bucket + adaptive backoff + circuit breaker for one upstream host."""
+
+    def __init__(self, host: str):
+        self.host = host
+        rate, capacity = HOST_LIMITS.get(host, DEFAULT_LIMIT)
+        self.bucket = TokenBucket(rate, capacity)
+        self.breaker = CircuitBreaker()
+        self._consecutive_throttles = 0
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "throttled": 0, "failures": 0, "rejected": 0}
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._stats[counter] += 1
+
+    def _check_circuit(self):
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"{self.host} is unavailable; failing fast until it recovers")
+        self._count("requests")
+
+    def before_request(self, tokens: float = 1.0):
+        """Fail fast if the circuit is open or the deadline has passed, otherwise wait for a token."""
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check(f"request to {self.host}")
+        self._check_circuit()
+        try:
+            self.bucket.acquire(tokens)
+        except DeadlineExceeded:
+            self.breaker.release_probe()
+            raise
+
+    async def before_request_async(self, tokens: float = 1.0):
+        self._check_circuit()
+        await self.bucket.acquire_async(tokens)
+
+    def try_acquire(self) -> bool:
+        """Non-blocking admission for optional extra requests such as hedges."""
+        return self.breaker.state == "closed" and self.bucket.try_acquire()
+
+    def throttle_delay(self, retry_after: Optional[float] = None) -> float:
+        """Delay before retrying a throttled request: Retry-After if given, else jittered exponential."""
+        with self._lock:
+            self._consecutive_throttles += 1
+            attempt = self._consecutive_throttles
+        if retry_after is not None:
+            return min(retry_after, MAX_THROTTLE_DELAY)
+        return min(MAX_THROTTLE_DELAY, random.uniform(0.5, 1.0) * (2 ** attempt))
+
+    def record_status(self, status_code: int, retry_after: Optional[str] = None) -> Optional[float]:
+        """
+        Feed a response status back into the guard.
+
+        Args:
+            status_code: HTTP status code of the response
+            retry_after: Raw Retry-After header value, if any
+
+        Returns:
+            Seconds the caller should wait before retrying when throttled, else None
+        """
+        if status_code in THROTTLE_STATUS_CODES:
+            self._count("throttled")
+            delay = self.throttle_delay(parse_retry_after(retry_after))
+            self.bucket.throttle(delay)
+            if status_code in FAILURE_STATUS_CODES:
+                self.breaker.record_failure()
+            LOGGER.info(f"{self.host} throttled (HTTP {status_code}); backing off {delay:.1f}s")
+            return delay
+        if status_code in FAILURE_STATUS_CODES:
+            self._count("failures")
+            self.breaker.record_failure()
+            return None
+        self.record_success()
+        return None
+
+    def record_success(self):
+        with self._lock:
+            self._consecutive_throttles = 0
+        self.bucket.recover()
+        self.breaker.record_success()
+
+    def record_failure(self):
+        """Record a transport-level failure (timeout, connection refused, ...)."""
+        self._count("failures")
+        self.breaker.record_failure()
+
+    def release_probe(self):
+        """The call ended without telling whether the host is healthy; let another probe through."""
+        self.breaker.release_probe()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats.update({
+            "rate_per_sec": round(self.bucket.rate, 2),
+            "max_rate_per_sec": self.bucket.max_rate,
+            "circuit": self.breaker.state,
+        })
+        return stats
+
+
+_GUARDS: Dict[str, UpstreamGuard] = {}
+_GUARDS_LOCK = threading.Lock()
+
+
+def get_guard(host: str) -> UpstreamGuard:
+    """Return the process-wide guard for an upstream host."""
+    with _GUARDS_LOCK:
+        if host not in _GUARDS:
+            _GUARDS[host] = UpstreamGuard(host)
+        return _GUARDS[host]
+
+
+def _status_from_exception(e: Exception) -> Optional[int]:
+    """Best-effort HTTP status extraction from espn_api / yfpy exceptions."""
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    if status is not None:
+        return status
+    message = str(e).lower()
+    if "429" in message or "rate limit" in message or "too many requests" in message:
+        return 429
+    for code in FAILURE_STATUS_CODES:
+        if f"http {code}" in message or f"status code {code}" in message:
+            return code
+    return None
+
+
+def _is_transport_error(e: Exception) -> bool:
+    """Connection failures and timeouts, as raised by requests (espn_api, yfpy) or httpx."""
+    return isinstance(e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                          httpx.TransportError, ConnectionError, TimeoutError))
+
+
+def guarded_call(host: str, fn: Callable[..., Any], *args, tokens: float = 1.0, hedge_endpoint: Optional[str] = None, **kwargs) -> Any:
+    """
+    Run a library call (espn_api, yfpy) that makes HTTP requests to host under its guard.
+
+    Throttled calls are retried after the adaptive backoff delay. Only
+    transport errors and 5xx responses count against the circuit breaker:
+    a 4xx (bad league id, expired cookies) says the host is up, and other
+    exceptions (e.g. parse errors) say nothing either way. All are re-raised.
+
+    Args:
+        host: Upstream host the call talks to (e.g. ESPN_HOST)
+        fn: The library function or bound method
+        *args, **kwargs: Passed through to fn
+        tokens: Rate-limit tokens the call consumes (roughly its request count)
+        hedge_endpoint: When set, the call is an idempotent read hedged under this endpoint key
+
+    Returns:
+        The result of fn
+    """
+    guard = get_guard(host)
+    for attempt in range(LIBRARY_CALL_RETRIES + 1):
+        guard.before_request(tokens)
+        try:
+            if hedge_endpoint:
+                result = hedged_call(hedge_endpoint, fn, *args, can_hedge=guard.try_acquire, **kwargs)
+            else:
+                result = fn(*args, **kwargs)
+        except DeadlineExceeded:
+            guard.release_probe()
+            raise
+        except Exception as e:
+            status = _status_from_exception(e)
+            if status in THROTTLE_STATUS_CODES:
+                # The bucket is paused for the backoff delay, so the next before_request waits it out
+                guard.record_status(status)
+                guard.release_probe()
+                if attempt < LIBRARY_CALL_RETRIES:
+                    continue
+                raise RateLimitedError(f"{host} is still rate limiting after {attempt + 1} attempts") from e
+            if status in FAILURE_STATUS_CODES or (status is None and _is_transport_error(e)):
+                guard.record_failure()
+            elif status is not None and 400 <= status < 500:
+                # The host answered; the request itself was bad
+                guard.record_success()
+            else:
+                guard.release_probe()
+            raise
+        guard.record_success()
+        return result
+
+
+def get_rate_limit_stats() -> Dict[str, Any]:
+    """Return limiter, throttle and circuit state for every upstream host."""
+    with _GUARDS_LOCK:
+        guards = dict(_GUARDS)
+    return {host: guard.stats() for host, guard in guards.items()}
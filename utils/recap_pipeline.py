@@ -0,0 +1,143 @@
+"""
+Deadline-Budgeted Recap Stat Pipeline
+
+A recap is assembled from many independent stats. They run concurrently, and
+the optional ones share an overall time budget: when it runs out, an optional
+stat is served from the last value computed for the league (if still
+meaningful) or omitted, and the summary says so. Required stats always wait
+for their result, so the recap reaches the LLM stage within roughly the budget
+plus the slowest required call.
+
+Set COMMISH_RECAP_DEADLINE (seconds) to change the budget.
+"""
+
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List, Optional
+
+from streamlit.logger import get_logger
+
+from utils.cache_store import get_cache
+from utils.deadline import Deadline, set_deadline
+
+LOGGER = get_logger(__name__)
+
+RECAP_DEADLINE_SECONDS = float(os.environ.get("COMMISH_RECAP_DEADLINE", "15"))
+MAX_STAT_WORKERS = 8
+
+_STALE_STATS = get_cache("recap_stats")
+
+
+class RecapStat:
+    """
+    One line of a recap summary.
+
+    Args:
+        name: Stable identifier used for the stale cache
+        compute: Zero-argument callable returning the formatted summary line
+        required: Required stats are always waited for; optional ones obey the budget
+        season_scope: Season-level stats may be served stale from an earlier week
+    """
+
+    def __init__(self, name: str, compute: Callable[[], str], required: bool = False, season_scope: bool = False):
+        self.name = name
+        self.compute = compute
+        self.required = required
+        self.season_scope = season_scope
+
+
+class RecapResult:
+    """Formatted lines in stat order plus what was served stale or omitted."""
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self.stale: List[str] = []
+        self.omitted: List[str] = []
+        self.timings: Dict[str, float] = {}
+
+    def to_summary(self) -> str:
+        summary = "\n".join(f"- {line}" for line in self.lines)
+        if self.omitted:
+            summary += f"\n- Note: left out to keep this recap on time: {', '.join(self.omitted)}"
+        return summary
+
+
+def _stale_key(stat: RecapStat, platform: str, league_id: Any, season: int) -> tuple:
+    # League ids carry over between seasons (ESPN), so the season is part of the key
+    return (platform, str(league_id), season, stat.name)
+
+
+def _stale_line(stat: RecapStat, platform: str, league_id: Any, season: int, week: int) -> Optional[str]:
+    hit, cached = _STALE_STATS.get(_stale_key(stat, platform, league_id, season))
+    if not hit:
+        return None
+    cached_week, line = cached
+    if cached_week == week:
+        return line
+    if stat.season_scope:
+        return f"{line} (as of week {cached_week})"
+    return None
+
+
+def _run_timed(stat: RecapStat) -> tuple:
+    start = time.perf_counter()
+    line = stat.compute()
+    return line, time.perf_counter() - start
+
+
+def run_recap_stats(stats: List[RecapStat], platform: str, league_id: Any, season: int, week: int,
+                    budget_seconds: float = RECAP_DEADLINE_SECONDS) -> RecapResult:
+    """
+    Compute recap stats concurrently under a shared deadline.
+
+    Args:
+        stats: Stats in the order they should appear in the summary
+        platform: Platform name, used to key the stale cache
+        league_id: League identifier, used to key the stale cache
+        season: The league's season, used to key the stale cache
+        week: The recap week
+        budget_seconds: Time budget for optional stats
+
+    Returns:
+        RecapResult with the formatted lines and any degraded stats
+    """
+    deadline = Deadline(budget_seconds)
+    result = RecapResult()
+
+    def submit(pool, stat):
+        context = contextvars.copy_context()
+        # Optional stats see the deadline so upstream waits give up early; required ones do not
+        context.run(set_deadline, None if stat.required else deadline)
+        return pool.submit(context.run, _run_timed, stat)
+
+    pool = ThreadPoolExecutor(max_workers=min(MAX_STAT_WORKERS, len(stats)) or 1, thread_name_prefix="recap-stat")
+    try:
+        futures = [(stat, submit(pool, stat)) for stat in stats]
+        for stat, future in futures:
+            try:
+                timeout = None if stat.required else deadline.remaining()
+                line, elapsed = future.result(timeout=timeout)
+                result.timings[stat.name] = round(elapsed, 3)
+                result.lines.append(line)
+                _STALE_STATS.set(_stale_key(stat, platform, league_id, season), (week, line), week=week)
+                continue
+            except FutureTimeoutError:
+                LOGGER.info(f"Recap stat {stat.name} exceeded the {budget_seconds:.0f}s budget")
+            except Exception as e:
+                LOGGER.warning(f"Recap stat {stat.name} failed: {e}")
+                if stat.required and _stale_line(stat, platform, league_id, season, week) is None:
+                    raise
+
+            stale = _stale_line(stat, platform, league_id, season, week)
+            if stale is not None:
+                result.lines.append(stale)
+                result.stale.append(stat.name)
+            else:
+                result.omitted.append(stat.name.replace("_", " "))
+    finally:
+        # Don't block the recap on stats that missed the deadline; their threads finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return result
@@ -0,0 +1,164 @@
+"""
+NFL Season Calendar
+
+Derives the week boundaries of any NFL season instead of relying on a
+hard-coded table for a single year. The season kickoff comes from Sleeper's
+/state/nfl endpoint when it is reachable, falling back to a table of known
+kickoffs and finally to the league rule (the Thursday after Labor Day).
+
+Week 1 starts on kickoff Thursday; week N >= 2 starts on the Monday of week
+N-1's Monday night game, matching the boundaries the app has always used (so
+on that Monday the previous week becomes the recap week, and
+cache_policy.WEEK_FINALIZATION_DELAY covers the game itself).
+
+Calendars are built once per process and looked up with a bisect.
+"""
+
+import bisect
+import datetime
+import threading
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from streamlit.logger import get_logger
+
+from utils import sleeper_async
+
+LOGGER = get_logger(__name__)
+
+REGULAR_SEASON_WEEKS = 18
+# The NFL league year starts in March; January/February belong to the previous season
+LEAGUE_YEAR_START_MONTH = 3
+# Offline-derived calendars are retried against Sleeper after this many seconds
+OFFLINE_CALENDAR_TTL = 3600
+NFL_STATE_TIMEOUT = 5.0  # seconds
+
+KNOWN_KICKOFFS = {
+    2023: datetime.datetime(2023, 9, 7),
+    2024: datetime.datetime(2024, 9, 5),
+    2025: datetime.datetime(2025, 9, 4),
+    2026: datetime.datetime(2026, 9, 10),
+}
+
+
+def season_for(when: datetime.datetime) -> int:
+    """Return the NFL season a date belongs to."""
+    return when.year if when.month >= LEAGUE_YEAR_START_MONTH else when.year - 1
+
+
+def rule_kickoff(season: int) -> datetime.datetime:
+    """Kickoff by league rule: the Thursday after Labor Day (first Monday in September)."""
+    september_first = datetime.datetime(season, 9, 1)
+    labor_day = september_first + datetime.timedelta(days=(7 - september_first.weekday()) % 7)
+    return labor_day + datetime.timedelta(days=3)
+
+
+class SeasonCalendar:
+    """Week boundaries for one season."""
+
+    def __init__(self, season: int, kickoff: datetime.datetime, source: str):
+        self.season = season
+        self.kickoff = kickoff
+        self.source = source
+        first_monday = kickoff + datetime.timedelta(days=4)
+        # boundaries[i] is when week i + 1 starts; the final entry marks the end of the regular season
+        self.boundaries: List[datetime.datetime] = [kickoff] + [
+            first_monday + datetime.timedelta(weeks=week - 2)
+            for week in range(2, REGULAR_SEASON_WEEKS + 2)
+        ]
+
+    def week_at(self, when: datetime.datetime) -> int:
+        """
+        Week in progress at a given time.
+
+        Returns:
+            0 before kickoff, 1-18 during the regular season and 19 once week 18 is over
+        """
+        return bisect.bisect_right(self.boundaries, when)
+
+    def week_start(self, week: int) -> datetime.datetime:
+        return self.boundaries[week - 1]
+
+
+_CALENDARS: Dict[int, Tuple[SeasonCalendar, float]] = {}
+_CALENDARS_LOCK = threading.Lock()
+# Seasons whose calendar is being rebuilt in the background
+_REFRESHING: Set[int] = set()
+
+
+def _sleeper_kickoff(season: int) -> Optional[datetime.datetime]:
+    """Season start date reported by Sleeper, if it describes the requested season."""
+    try:
+        state = sleeper_async.run_sync("get_nfl_state", timeout=NFL_STATE_TIMEOUT)
+    except Exception as e:
+        LOGGER.info(f"Sleeper NFL state unavailable, using offline calendar: {e}")
+        return None
+    start_date = state.get("season_start_date")
+    if str(state.get("season")) != str(season) or not start_date:
+        return None
+    try:
+        return datetime.datetime.strptime(start_date, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _build_calendar(season: int) -> SeasonCalendar:
+    # Sleeper only reports the current season
+    kickoff = _sleeper_kickoff(season) if season == season_for(datetime.datetime.now()) else None
+    if kickoff is not None:
+        return SeasonCalendar(season, kickoff, "sleeper")
+    if season in KNOWN_KICKOFFS:
+        return SeasonCalendar(season, KNOWN_KICKOFFS[season], "table")
+    return SeasonCalendar(season, rule_kickoff(season), "rule")
+
+
+def _refresh_calendar(season: int) -> SeasonCalendar:
+    """Build a season's calendar without holding the lock, then publish it."""
+    try:
+        calendar = _build_calendar(season)
+        expires_at = float("inf") if calendar.source == "sleeper" else time.monotonic() + OFFLINE_CALENDAR_TTL
+        with _CALENDARS_LOCK:
+            _CALENDARS[season] = (calendar, expires_at)
+        return calendar
+    finally:
+        with _CALENDARS_LOCK:
+            _REFRESHING.discard(season)
+
+
+def get_calendar(season: int) -> SeasonCalendar:
+    """
+    Return the (process-cached) calendar for a season.
+
+    An expired calendar keeps being served while a background thread
+    rebuilds it, so callers never wait on Sleeper once a calendar exists.
+    """
+    with _CALENDARS_LOCK:
+        cached = _CALENDARS.get(season)
+        if cached is not None:
+            calendar, expires_at = cached
+            if expires_at <= time.monotonic() and season not in _REFRESHING:
+                _REFRESHING.add(season)
+                threading.Thread(target=_refresh_calendar, args=(season,),
+                                 name="season-calendar-refresh", daemon=True).start()
+            return calendar
+    return _refresh_calendar(season)
+
+
+def current_week(now: Optional[datetime.datetime] = None) -> Optional[int]:
+    """
+    Regular-season week in progress, or None before the season's kickoff.
+
+    After week 18 this stays at 18 until the next league year.
+    """
+    now = now or datetime.datetime.now()
+    week = get_calendar(season_for(now)).week_at(now)
+    if week == 0:
+        return None
+    return min(week, REGULAR_SEASON_WEEKS)
+
+
+def recap_week(now: Optional[datetime.datetime] = None) -> int:
+    """Most recent week whose recap can be generated (0 before week 1 is over)."""
+    now = now or datetime.datetime.now()
+    week = get_calendar(season_for(now)).week_at(now)
+    return min(max(week - 1, 0), REGULAR_SEASON_WEEKS)
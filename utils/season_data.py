@@ -0,0 +1,257 @@
+"""
+Season Data Sources for Fantasy Football Leagues
+
+Provides a platform-neutral view of a league's season (teams and weekly
+scoreboards) so that statistical calculations such as power rankings can run
+against Sleeper, ESPN and Yahoo leagues without duplicating scoring code.
+
+Every source returns weekly scoreboards in the same shape produced by
+sleeper_helper.calculate_scoreboards:
+
+    {matchup_id: [(team_name, points), (team_name, points)]}
+
+with the teams of each matchup sorted by points in descending order.
+Completed weeks never change, so they are fetched concurrently and kept in
+the tiered cache store (memory, disk and optional shared store); a week still
+being played is never cached.
+"""
+
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+
+from espn_api.football import League as EspnLeague
+from espn_api.football.matchup import Matchup as EspnMatchup
+from yfpy.query import YahooFantasySportsQuery
+
+from utils import espn_helper, season_calendar, sleeper_async, sleeper_helper, yahoo_helper
+from utils.cache_policy import is_week_final
+from utils.cache_store import get_cache
+from utils.rate_limiter import ESPN_HOST, YAHOO_HOST, guarded_call
+from utils.single_flight import league_fetches
+
+# Completed weeks keyed by (platform, league_id, week)
+_COMPLETED_WEEK_CACHE = get_cache("season_weeks")
+
+
+class SeasonDataSource:
+    """Base class for loading a league's season data from a fantasy platform."""
+
+    platform = "base"
+    max_workers = 6
+
+    def __init__(self, league_id: str):
+        self.league_id = str(league_id)
+
+    @property
+    def current_week(self) -> int:
+        """Most recently completed week of the season."""
+        raise NotImplementedError
+
+    def get_teams(self) -> List[Dict[str, Any]]:
+        """Return a list of {'team_id', 'team_name'} dicts for every team in the league."""
+        raise NotImplementedError
+
+    def fetch_week(self, week: int) -> Dict[Any, list]:
+        """Fetch the scoreboard for a single week from the platform."""
+        raise NotImplementedError
+
+    def get_weekly_scoreboards(self, weeks: Iterable[int]) -> Dict[int, Dict[Any, list]]:
+        """
+        Load scoreboards for the requested weeks.
+
+        Weeks already in the completed-week cache are served from the tiered
+        cache store; the rest are fetched concurrently via fetch_weeks.
+
+        Args:
+            weeks: Week numbers to load
+
+        Returns:
+            Dictionary mapping week number to scoreboard
+        """
+        scoreboards = {}
+        missing = []
+        for week in weeks:
+            found, cached = _COMPLETED_WEEK_CACHE.get((self.platform, self.league_id, week))
+            if found:
+                scoreboards[week] = cached
+            else:
+                missing.append(week)
+
+        if missing:
+            for week, scoreboard in self.fetch_weeks(missing).items():
+                scoreboards[week] = scoreboard
+                if week <= self.current_week and is_week_final(week):
+                    _COMPLETED_WEEK_CACHE.set((self.platform, self.league_id, week), scoreboard)
+
+        return scoreboards
+
+    def fetch_weeks(self, weeks: List[int]) -> Dict[int, Dict[Any, list]]:
+        """
+        Fetch several weeks concurrently.
+
+        The default runs fetch_week on a thread pool, sharing any identical
+        fetch already in flight for another session. Weeks that fail are
+        logged and left out of the result.
+        """
+        scoreboards = {}
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(weeks))) as executor:
+            futures = {
+                executor.submit(league_fetches.do, (self.platform, self.league_id, week), self.fetch_week, week): week
+                for week in weeks
+            }
+            for future in as_completed(futures):
+                week = futures[future]
+                try:
+                    scoreboards[week] = future.result()
+                except Exception as e:
+                    print(f"Error processing week {week}: {e}")
+        return scoreboards
+
+
+class SleeperSeasonSource(SeasonDataSource):
+    """Season data for a Sleeper league, fetched through the async Sleeper client."""
+
+    platform = "sleeper"
+
+    def __init__(self, league_id: str):
+        super().__init__(league_id)
+        self._current_week = season_calendar.recap_week()
+        self._mappings = None
+        self._mappings_lock = threading.Lock()
+
+    @property
+    def current_week(self) -> int:
+        return self._current_week
+
+    def _load_mappings(self):
+        with self._mappings_lock:
+            if self._mappings is None:
+                teams = sleeper_async.fetch_teams(self.league_id)
+                self._mappings = (
+                    teams['rosters'],
+                    sleeper_helper.map_users_to_team_name(teams['users']),
+                    sleeper_helper.map_rosterid_to_ownerid(teams['rosters']),
+                )
+        return self._mappings
+
+    def get_teams(self) -> List[Dict[str, Any]]:
+        rosters, user_team_mapping, _ = self._load_mappings()
+        return [
+            {
+                'team_id': roster['roster_id'],
+                'team_name': user_team_mapping.get(roster['owner_id'], f"Team {roster['roster_id']}"),
+            }
+            for roster in rosters
+        ]
+
+    def _scoreboard(self, matchups: list) -> Dict[Any, list]:
+        _, user_team_mapping, roster_owner_mapping = self._load_mappings()
+        return sleeper_helper.calculate_scoreboards(matchups, user_team_mapping, roster_owner_mapping)
+
+    def fetch_week(self, week: int) -> Dict[Any, list]:
+        return self._scoreboard(sleeper_async.run_sync("get_matchups", self.league_id, week))
+
+    def fetch_weeks(self, weeks: List[int]) -> Dict[int, Dict[Any, list]]:
+        """Fetch every requested week in one concurrent batch on the async client."""
+        results = league_fetches.do(
+            (self.platform, self.league_id, tuple(weeks)),
+            sleeper_async.fetch_matchups_for_weeks, self.league_id, weeks,
+        )
+        scoreboards = {}
+        for week, matchups in results.items():
+            if isinstance(matchups, Exception):
+                print(f"Error processing week {week}: {matchups}")
+                continue
+            scoreboards[week] = self._scoreboard(matchups)
+        return scoreboards
+
+
+class EspnSeasonSource(SeasonDataSource):
+    """
+    Season data for an ESPN league.
+
+    ESPN returns the schedule for every matchup period in a single
+    mMatchupScore payload, so all completed weeks are materialized from one
+    request rather than one request per week.
+    """
+
+    platform = "espn"
+
+    def __init__(self, league_id: str, espn_s2: str, swid: str, year: Optional[int] = None):
+        super().__init__(league_id)
+        self.league = guarded_call(
+            ESPN_HOST,
+            EspnLeague,
+            league_id=league_id,
+            year=year or datetime.datetime.now().year,
+            espn_s2=espn_s2,
+            swid=swid,
+            tokens=3,
+        )
+        self._schedule = None
+        self._schedule_lock = threading.Lock()
+
+    @property
+    def current_week(self) -> int:
+        return self.league.current_week - 1
+
+    def get_teams(self) -> List[Dict[str, Any]]:
+        return [
+            {'team_id': team.team_id, 'team_name': espn_helper.clean_team_name(team.team_name)}
+            for team in self.league.teams
+        ]
+
+    def _load_schedule(self) -> list:
+        with self._schedule_lock:
+            if self._schedule is None:
+                data = guarded_call(ESPN_HOST, self.league.espn_request.league_get, params={'view': 'mMatchupScore'})
+                self._schedule = data['schedule']
+        return self._schedule
+
+    def fetch_week(self, week: int) -> Dict[Any, list]:
+        team_names = {team['team_id']: team['team_name'] for team in self.get_teams()}
+        scoreboard = {}
+        for data in self._load_schedule():
+            if data['matchupPeriodId'] != week:
+                continue
+            matchup = EspnMatchup(data)
+            teams = [(team_names.get(matchup._home_team_id, f"Team {matchup._home_team_id}"), matchup.home_score)]
+            if matchup._away_team_id:
+                teams.append((team_names.get(matchup._away_team_id, f"Team {matchup._away_team_id}"), matchup.away_score))
+            scoreboard[data.get('id', len(scoreboard) + 1)] = sorted(teams, key=lambda x: -x[1])
+        return scoreboard
+
+
+class YahooSeasonSource(SeasonDataSource):
+    """Season data for a Yahoo league."""
+
+    platform = "yahoo"
+    max_workers = 4
+
+    def __init__(self, league_id: str, auth_path: str):
+        super().__init__(league_id)
+        self.sc = YahooFantasySportsQuery(
+            auth_dir=auth_path,
+            league_id=league_id,
+            game_code="nfl"
+        )
+        self._current_week = yahoo_helper.get_most_recent_week(self.sc)
+
+    @property
+    def current_week(self) -> int:
+        return self._current_week
+
+    def get_teams(self) -> List[Dict[str, Any]]:
+        return [
+            {'team_id': team.team_id, 'team_name': team.name.decode('utf-8')}
+            for team in guarded_call(YAHOO_HOST, self.sc.get_league_teams)
+        ]
+
+    def fetch_week(self, week: int) -> Dict[Any, list]:
+        scoreboard = {}
+        for matchup_id, matchup in enumerate(guarded_call(YAHOO_HOST, self.sc.get_league_matchups_by_week, week), start=1):
+            teams = [(team.name.decode('utf-8'), team.team_points.total) for team in matchup.teams]
+            scoreboard[matchup_id] = sorted(teams, key=lambda x: -x[1])
+        return scoreboard
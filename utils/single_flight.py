@@ -0,0 +1,87 @@
+"""
+Single-Flight Request Coalescing
+
+When several Streamlit sessions ask for the same league data at the same
+time (e.g. a whole league opening the app on Tuesday morning), only the first
+caller performs the fetch. Concurrent callers with the same key wait for that
+in-flight call and share its result or exception.
+
+Keys are tuples whose first element is the platform name; coalescing counts
+are recorded per platform.
+"""
+
+import threading
+from typing import Any, Callable, Dict
+
+
+class _Call:
+    """A single in-flight call and the callers waiting on it."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls that share a key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[tuple, _Call] = {}
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, group: str, counter: str):
+        group_stats = self._stats.setdefault(group, {"executions": 0, "coalesced": 0})
+        group_stats[counter] += 1
+
+    def do(self, key: tuple, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn once per key at a time; concurrent callers share the result.
+
+        Args:
+            key: Hashable key, e.g. (platform, league_id, week)
+            fn: Function performing the fetch
+            *args, **kwargs: Passed through to fn
+
+        Returns:
+            The result of the (possibly shared) call
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+                self._count(key[0], "executions")
+            else:
+                self._count(key[0], "coalesced")
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return executions and coalesced request counts per platform."""
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "platforms": {group: dict(counters) for group, counters in self._stats.items()},
+            }
+
+
+# Process-wide instance shared by every league data fetch path
+league_fetches = SingleFlight()
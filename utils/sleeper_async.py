@@ -0,0 +1,223 @@
+"""
+Async Sleeper API Client
+
+sleeper_wrapper is synchronous, so a recap used to fetch rosters, users and
+matchups one after another and power rankings fetched one week at a time.
+This client issues those requests concurrently on a single long-lived
+httpx.AsyncClient, bounded by a semaphore.
+
+The client lives on a background event loop thread so its connection pool is
+shared by every Streamlit session. Synchronous callers use the facade
+functions at the bottom of the module, which submit coroutines to that loop.
+"""
+
+import asyncio
+import random
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+from streamlit.logger import get_logger
+
+from utils.http_client import (
+    BACKOFF_BASE,
+    BACKOFF_CAP,
+    DEFAULT_HEADERS,
+    DEFAULT_LIMITS,
+    DEFAULT_TIMEOUT,
+    HTTP2_AVAILABLE,
+    MAX_RETRIES,
+    RETRYABLE_STATUS_CODES,
+    ConnectionStats,
+    register_connection_stats,
+)
+from utils.hedging import endpoint_key, hedged_call_async
+from utils.rate_limiter import SLEEPER_HOST, get_guard
+
+LOGGER = get_logger(__name__)
+
+SLEEPER_API_BASE = "https://api.sleeper.app/v1"
+MAX_CONCURRENT_REQUESTS = 8
+SYNC_CALL_TIMEOUT = 60.0  # seconds
+
+
+class AsyncSleeperClient:
+    """Concurrent client for the Sleeper read-only API."""
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_REQUESTS):
+        self.stats = ConnectionStats()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=SLEEPER_API_BASE,
+            http2=HTTP2_AVAILABLE,
+            timeout=DEFAULT_TIMEOUT,
+            limits=DEFAULT_LIMITS,
+            headers=DEFAULT_HEADERS,
+            event_hooks={"response": [self._record_response]},
+        )
+
+    async def _record_response(self, response: httpx.Response):
+        self.stats.record_response(response)
+
+    async def aclose(self):
+        await self._client.aclose()
+
+    async def _get(self, path: str) -> Any:
+        """GET a Sleeper endpoint (hedged, with jittered retries), bounded by the semaphore and the host rate limit."""
+        guard = get_guard(SLEEPER_HOST)
+        async with self._semaphore:
+            for attempt in range(MAX_RETRIES + 1):
+                await guard.before_request_async()
+                try:
+                    response = await hedged_call_async(
+                        endpoint_key(SLEEPER_HOST, path),
+                        lambda: self._client.get(path),
+                        can_hedge=guard.try_acquire,
+                    )
+                    throttle_delay = guard.record_status(response.status_code, response.headers.get("Retry-After"))
+                    if response.status_code in RETRYABLE_STATUS_CODES and attempt < MAX_RETRIES:
+                        self.stats.record_retry()
+                        if throttle_delay is None:
+                            await asyncio.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))))
+                        continue
+                    response.raise_for_status()
+                    return response.json()
+                except httpx.TransportError as e:
+                    guard.record_failure()
+                    if attempt >= MAX_RETRIES:
+                        self.stats.record_error()
+                        raise
+                    LOGGER.debug(f"Sleeper request to {path} failed ({type(e).__name__}), retrying")
+                    self.stats.record_retry()
+                    await asyncio.sleep(random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt))))
+                except httpx.HTTPStatusError:
+                    self.stats.record_error()
+                    raise
+
+    async def get_league(self, league_id: str) -> dict:
+        return await self._get(f"/league/{league_id}")
+
+    async def get_rosters(self, league_id: str) -> list:
+        return await self._get(f"/league/{league_id}/rosters")
+
+    async def get_users(self, league_id: str) -> list:
+        return await self._get(f"/league/{league_id}/users")
+
+    async def get_matchups(self, league_id: str, week: int) -> list:
+        return await self._get(f"/league/{league_id}/matchups/{week}")
+
+    async def get_transactions(self, league_id: str, week: int) -> list:
+        return await self._get(f"/league/{league_id}/transactions/{week}")
+
+    async def get_nfl_state(self) -> dict:
+        return await self._get("/state/nfl")
+
+    async def get_league_week(self, league_id: str, week: int) -> Dict[str, list]:
+        """Fetch rosters, users and a week's matchups concurrently."""
+        rosters, users, matchups = await asyncio.gather(
+            self.get_rosters(league_id),
+            self.get_users(league_id),
+            self.get_matchups(league_id, week),
+        )
+        return {"rosters": rosters, "users": users, "matchups": matchups}
+
+    async def get_teams(self, league_id: str) -> Dict[str, list]:
+        """Fetch rosters and users concurrently."""
+        rosters, users = await asyncio.gather(self.get_rosters(league_id), self.get_users(league_id))
+        return {"rosters": rosters, "users": users}
+
+    async def get_matchups_for_weeks(self, league_id: str, weeks: Iterable[int]) -> Dict[int, Any]:
+        """
+        Fetch matchups for several weeks concurrently.
+
+        Returns:
+            Dictionary mapping week to its matchups, or to the exception raised
+            while fetching that week
+        """
+        weeks = list(weeks)
+        results = await asyncio.gather(
+            *(self.get_matchups(league_id, week) for week in weeks),
+            return_exceptions=True,
+        )
+        return dict(zip(weeks, results))
+
+    async def get_transactions_for_weeks(self, league_id: str, weeks: Iterable[int]) -> Dict[int, Any]:
+        """Fetch transactions for several weeks concurrently (exceptions are returned per week)."""
+        weeks = list(weeks)
+        results = await asyncio.gather(
+            *(self.get_transactions(league_id, week) for week in weeks),
+            return_exceptions=True,
+        )
+        return dict(zip(weeks, results))
+
+
+class _LoopThread:
+    """A daemon thread running the event loop that owns the shared AsyncSleeperClient."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.client: Optional[AsyncSleeperClient] = None
+        self._thread = threading.Thread(target=self.loop.run_forever, name="sleeper-async", daemon=True)
+        self._thread.start()
+        self.client = self.run(self._create_client())
+
+    async def _create_client(self) -> AsyncSleeperClient:
+        client = AsyncSleeperClient()
+        register_connection_stats("sleeper_async", client.stats)
+        return client
+
+    def run(self, coro, timeout: float = SYNC_CALL_TIMEOUT):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+
+_LOOP_THREAD: Optional[_LoopThread] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _get_loop_thread() -> _LoopThread:
+    global _LOOP_THREAD
+    with _LOOP_LOCK:
+        if _LOOP_THREAD is None:
+            _LOOP_THREAD = _LoopThread()
+        return _LOOP_THREAD
+
+
+def run_sync(method: str, *args, timeout: float = SYNC_CALL_TIMEOUT) -> Any:
+    """
+    Call an AsyncSleeperClient method from synchronous code.
+
+    Args:
+        method: Name of the client coroutine method, e.g. 'get_league_week'
+        *args: Arguments for the method
+        timeout: Seconds to wait for the result
+
+    Returns:
+        The method's result
+    """
+    loop_thread = _get_loop_thread()
+    return loop_thread.run(getattr(loop_thread.client, method)(*args), timeout=timeout)
+
+
+def fetch_league_week(league_id: str, week: int) -> Dict[str, list]:
+    """Sync facade: rosters, users and matchups for a week, fetched concurrently."""
+    return run_sync("get_league_week", str(league_id), week)
+
+
+def fetch_teams(league_id: str) -> Dict[str, list]:
+    """Sync facade: rosters and users, fetched concurrently."""
+    return run_sync("get_teams", str(league_id))
+
+
+def fetch_matchups_for_weeks(league_id: str, weeks: List[int]) -> Dict[int, Any]:
+    """Sync facade: matchups for every requested week, fetched concurrently."""
+    return run_sync("get_matchups_for_weeks", str(league_id), weeks)
+
+
+def fetch_transactions_for_weeks(league_id: str, weeks: List[int]) -> Dict[int, Any]:
+    """Sync facade: transactions for every requested week, fetched concurrently."""
+    return run_sync("get_transactions_for_weeks", str(league_id), weeks)
+
+
+def fetch_nfl_state() -> dict:
+    """Sync facade: Sleeper's current NFL state (season, week, season type)."""
+    return run_sync("get_nfl_state")
@@ -1,5 +1,33 @@
-from sleeper_wrapper import League
-import requests
+from utils.http_client import get_http_client
+
+
+# League mapping helpers (same behavior as sleeper_wrapper.League, without
+# needing a League instance and its blocking constructor request)
+
+def map_users_to_team_name(users):
+    users_dict = {}
+    for user in users:
+        try:
+            users_dict[user["user_id"]] = user["metadata"]["team_name"]
+        except (KeyError, TypeError):
+            users_dict[user["user_id"]] = user["display_name"]
+    return users_dict
+
+def map_rosterid_to_ownerid(rosters):
+    return {roster["roster_id"]: roster["owner_id"] for roster in rosters}
+
+def get_standings(rosters, users):
+    users_dict = map_users_to_team_name(users)
+    roster_standings_list = []
+    for roster in rosters:
+        wins = roster["settings"]["wins"]
+        points = roster["settings"]["fpts"]
+        losses = roster["settings"]["losses"]
+        name = roster["owner_id"]
+        roster_standings_list.append((wins, losses, points, users_dict[name] if name is not None else None))
+
+    roster_standings_list.sort(reverse=True)
+    return [(item[3], str(item[0]), str(item[1]), str(item[2])) for item in roster_standings_list]
 
 
 def map_player_to_team(player_id, rosters, users):
@@ -38,10 +66,11 @@ def top_3_teams(standings):
 
 
 def load_player_data(url):
-    response = requests.get(url)
-    if response.status_code == 200:
-        return response.json()
-    else:
+    try:
+        # The player database is a multi-MB static file; never download it twice at once
+        return get_http_client("sleeper").get_json(url, hedge=False)
+    except Exception as e:
+        print(f"Failed to load player data: {e}")
         return None
 
 
@@ -154,20 +183,30 @@ def closest_match_of_week(scoreboards):
     return closest_match, smallest_margin
 
 
-def team_with_most_moves(rosters, user_team_mapping, roster_owner_mapping):
+def team_with_most_moves(move_totals, user_team_mapping, roster_owner_mapping):
+    """
+    Find the team with the most completed transactions this season.
+
+    Args:
+        move_totals: Per-roster totals from sleeper_transactions.get_move_totals
+        user_team_mapping: owner_id -> team name
+        roster_owner_mapping: roster_id -> owner_id
+
+    Returns:
+        Tuple of (team name, that team's totals)
+    """
     most_moves = -1
     team_with_most_moves = "Unknown Team"
-    
-    for roster in rosters:
-        owner_id = roster_owner_mapping.get(roster['roster_id'])
-        team_name = user_team_mapping.get(owner_id, "Unknown Team")
-        total_moves = roster['settings']['total_moves']
-        
-        if total_moves > most_moves:
-            most_moves = total_moves
-            team_with_most_moves = team_name
-            
-    return team_with_most_moves, most_moves
+    team_totals = {}
+
+    for roster_id, totals in move_totals.items():
+        if totals['moves'] > most_moves:
+            most_moves = totals['moves']
+            owner_id = roster_owner_mapping.get(roster_id)
+            team_with_most_moves = user_team_mapping.get(owner_id, "Unknown Team")
+            team_totals = totals
+
+    return team_with_most_moves, team_totals
 
 
 def team_on_hottest_streak(rosters, user_team_mapping, roster_owner_mapping):
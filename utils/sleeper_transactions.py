@@ -0,0 +1,124 @@
+"""
+Sleeper Transactions Ingestion
+
+Sleeper doesn't populate roster['settings']['total_moves'], so "most moves"
+has to be derived from the league's transactions. This module fetches every
+week's transactions concurrently and keeps per-team totals of adds, drops,
+trades and FAAB spent.
+
+Totals for completed weeks are stored permanently with the last week they
+include, so each run only fetches the weeks after it: in season that is one
+request for the week being recapped plus the live week. Live-week
+transactions are counted but not persisted, since waivers can still run.
+"""
+
+import copy
+from typing import Any, Dict, List
+
+from streamlit.logger import get_logger
+
+from utils import sleeper_async
+from utils.cache_policy import is_week_final
+from utils.cache_store import NO_WEEK, get_cache
+from utils.single_flight import league_fetches
+
+LOGGER = get_logger(__name__)
+
+COUNTED_TRANSACTION_TYPES = {"waiver", "free_agent", "trade", "commissioner"}
+
+_SEASON_MOVES = get_cache("sleeper_transactions")
+
+
+def _empty_totals() -> Dict[str, int]:
+    return {"moves": 0, "adds": 0, "drops": 0, "trades": 0, "faab_spent": 0}
+
+
+def tally_transactions(transactions: List[dict]) -> Dict[int, Dict[str, int]]:
+    """
+    Count completed moves per roster for a list of Sleeper transactions.
+
+    Args:
+        transactions: Transactions from /league/<id>/transactions/<week>
+
+    Returns:
+        Dictionary mapping roster_id to its moves, adds, drops, trades and FAAB spent
+    """
+    tallies: Dict[int, Dict[str, int]] = {}
+
+    def team(roster_id):
+        return tallies.setdefault(roster_id, _empty_totals())
+
+    for transaction in transactions or []:
+        if transaction.get("status") != "complete" or transaction.get("type") not in COUNTED_TRANSACTION_TYPES:
+            continue
+        roster_ids = transaction.get("roster_ids") or []
+        for roster_id in roster_ids:
+            team(roster_id)["moves"] += 1
+            if transaction["type"] == "trade":
+                team(roster_id)["trades"] += 1
+        for roster_id in (transaction.get("adds") or {}).values():
+            team(roster_id)["adds"] += 1
+        for roster_id in (transaction.get("drops") or {}).values():
+            team(roster_id)["drops"] += 1
+        if transaction["type"] == "waiver" and roster_ids:
+            bid = (transaction.get("settings") or {}).get("waiver_bid") or 0
+            team(roster_ids[0])["faab_spent"] += bid
+    return tallies
+
+
+def _merge(totals: Dict[int, Dict[str, int]], tallies: Dict[int, Dict[str, int]]):
+    for roster_id, counts in tallies.items():
+        team_totals = totals.setdefault(roster_id, _empty_totals())
+        for counter, value in counts.items():
+            team_totals[counter] += value
+
+
+def _update_move_totals(league_id: str, through_week: int) -> Dict[int, Dict[str, int]]:
+    key = ("sleeper", league_id, "season_moves")
+    found, season = _SEASON_MOVES.get(key)
+    season = copy.deepcopy(season) if found else {"through_week": 0, "totals": {}}
+
+    weeks = list(range(season["through_week"] + 1, through_week + 1))
+    if not weeks:
+        return season["totals"]
+
+    results = sleeper_async.fetch_transactions_for_weeks(league_id, weeks)
+    live_totals: Dict[int, Dict[str, int]] = {}
+    final_through = season["through_week"]
+    for week in weeks:
+        transactions = results.get(week)
+        if isinstance(transactions, Exception):
+            raise transactions
+        tallies = tally_transactions(transactions)
+        if final_through == week - 1 and is_week_final(week):
+            _merge(season["totals"], tallies)
+            final_through = week
+        else:
+            _merge(live_totals, tallies)
+
+    if final_through > season["through_week"]:
+        season["through_week"] = final_through
+        _SEASON_MOVES.set(key, season, week=NO_WEEK)
+        LOGGER.info(f"Sleeper move totals for league {league_id} now cover weeks 1-{final_through}")
+
+    totals = copy.deepcopy(season["totals"])
+    _merge(totals, live_totals)
+    return totals
+
+
+def get_move_totals(league_id: Any, through_week: int) -> Dict[int, Dict[str, int]]:
+    """
+    Season-to-date move totals per roster, fetching only weeks not yet ingested.
+
+    Args:
+        league_id: Sleeper league id
+        through_week: Last week to include (usually the live week)
+
+    Returns:
+        Dictionary mapping roster_id to {"moves", "adds", "drops", "trades", "faab_spent"}
+    """
+    league_id = str(league_id)
+    return league_fetches.do(
+        ("sleeper", league_id, "transactions", through_week),
+        _update_move_totals, league_id, through_week,
+    )
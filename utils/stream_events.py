@@ -0,0 +1,105 @@
+"""
+Typed Events for Streamed Recaps
+
+generate_gpt4_summary_streaming yields these instead of plain strings with
+usage tunnelled through magic sentinel strings, so consumers dispatch on the
+event type rather than inspecting every chunk:
+
+- TextDelta: a piece of generated text
+- Usage:     token usage of the generation (sent once, at the end)
+- Timing:    time to first token, throughput and total latency (at the end)
+- Error:     the generation failed; carries a user-facing message and the cause
+- Route:     which model the model router picked, and why (before any text)
+"""
+
+from typing import List, Optional
+
+
+class TextDelta:
+    """A chunk of generated text."""
+
+    __slots__ = ("text",)
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def __repr__(self):
+        return f"TextDelta({self.text!r})"
+
+
+class Usage:
+    """
+    Token usage for one generation; accepted by model_config.calculate_cost.
+
+    A summary replayed from the completion cache reports zero billed tokens
+    with from_cache set and the original generation's total in original_tokens.
+    """
+
+    def __init__(self, prompt_tokens: int, completion_tokens: int, total_tokens: int, model: str,
+                 cached_tokens: int = 0, estimated: bool = False, from_cache: bool = False,
+                 original_tokens: int = 0):
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.total_tokens = total_tokens
+        self.cached_tokens = cached_tokens  # Prompt tokens served from OpenAI's prompt cache
+        self.model = model
+        self.estimated = estimated
+        self.from_cache = from_cache
+        self.original_tokens = original_tokens
+
+    def __repr__(self):
+        return (f"Usage(prompt={self.prompt_tokens}, completion={self.completion_tokens}, "
+                f"cached={self.cached_tokens}, model={self.model!r}, estimated={self.estimated}, "
+                f"from_cache={self.from_cache})")
+
+
+class Timing:
+    """Latency of one generation, in seconds."""
+
+    def __init__(self, time_to_first_token: Optional[float], total_seconds: float, output_tokens: int, model: str):
+        self.time_to_first_token = time_to_first_token
+        self.total_seconds = total_seconds
+        self.output_tokens = output_tokens
+        self.model = model
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Output throughput once the first token arrived."""
+        streaming_seconds = self.total_seconds - (self.time_to_first_token or 0.0)
+        return self.output_tokens / streaming_seconds if streaming_seconds > 0 else 0.0
+
+    def __repr__(self):
+        ttft = f"{self.time_to_first_token:.2f}s" if self.time_to_first_token is not None else "n/a"
+        return f"Timing(ttft={ttft}, total={self.total_seconds:.2f}s, tokens_per_second={self.tokens_per_second:.1f})"
+
+
+class Error:
+    """The generation failed."""
+
+    def __init__(self, message: str, detail: str):
+        self.message = message  # User-facing explanation
+        self.detail = detail    # Underlying error, for logs and error mapping
+
+    def __repr__(self):
+        return f"Error({self.detail!r})"
+
+
+class Route:
+    """
+    The model router's choice for a generation.
+
+    Sent before any text, and again whenever the router fails over to the
+    next model in the chain.
+    """
+
+    def __init__(self, requested_model: str, model: str, notes: List[str]):
+        self.requested_model = requested_model
+        self.model = model
+        self.notes = notes  # Why earlier models in the chain were skipped or abandoned
+
+    @property
+    def rerouted(self) -> bool:
+        return self.model != self.requested_model
+
+    def __repr__(self):
+        return f"Route({self.requested_model!r} -> {self.model!r}, notes={self.notes!r})"
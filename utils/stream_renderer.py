@@ -0,0 +1,114 @@
+"""
+Throttled Rendering for Streamed Recaps
+
+Streamlit elements can't be appended to, so every update of the recap
+placeholder re-sends the whole text. Rendering once per chunk made a long
+Detailed recap quadratic in its length and stalled the frontend. The
+renderer here buffers incoming chunks and redraws at most once per frame
+interval, or sooner once enough new text has piled up, with a final flush
+when the stream ends.
+
+Render counts and time spent rendering are kept per recap and in aggregate
+for the debug panel.
+"""
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from streamlit.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+# Minimum seconds between redraws while streaming
+RENDER_FRAME_INTERVAL = float(os.environ.get("COMMISH_RENDER_FRAME_INTERVAL", "0.2"))
+# Redraw early once this many new characters are waiting
+RENDER_FLUSH_CHARS = 600
+
+_TOTALS = {"streams": 0, "chunks": 0, "renders": 0, "render_seconds": 0.0}
+_TOTALS_LOCK = threading.Lock()
+
+
+class StreamRenderer:
+    """Coalesces streamed text and redraws it at a bounded rate."""
+
+    def __init__(self, render: Callable[[str, bool], None],
+                 frame_interval: float = RENDER_FRAME_INTERVAL, flush_chars: int = RENDER_FLUSH_CHARS):
+        """
+        Args:
+            render: Called as render(full_text, final) to redraw the text
+            frame_interval: Minimum seconds between redraws
+            flush_chars: Pending characters that trigger a redraw before the interval is up
+        """
+        self.render = render
+        self.frame_interval = frame_interval
+        self.flush_chars = flush_chars
+        self._parts = []
+        self._pending_chars = 0
+        self._last_render = 0.0
+        self.chunks = 0
+        self.renders = 0
+        self.render_seconds = 0.0
+
+    @property
+    def text(self) -> str:
+        return "".join(self._parts)
+
+    def push(self, chunk: str) -> bool:
+        """
+        Add streamed text, redrawing if a frame is due.
+
+        An empty chunk (a poll that found nothing new) still redraws text
+        held back from earlier chunks once its frame is due.
+
+        Returns:
+            True if the text was redrawn
+        """
+        if chunk:
+            self._parts.append(chunk)
+            self._pending_chars += len(chunk)
+            self.chunks += 1
+        if not self._pending_chars:
+            return False
+        due = time.monotonic() - self._last_render >= self.frame_interval
+        if due or self._pending_chars >= self.flush_chars:
+            self._draw(final=False)
+            return True
+        return False
+
+    def flush(self):
+        """Draw the complete text once the stream has ended."""
+        if self._parts:
+            self._draw(final=True)
+        with _TOTALS_LOCK:
+            _TOTALS["streams"] += 1
+            _TOTALS["chunks"] += self.chunks
+            _TOTALS["renders"] += self.renders
+            _TOTALS["render_seconds"] += self.render_seconds
+        LOGGER.debug(f"Rendered {self.chunks} chunks in {self.renders} redraws ({self.render_seconds:.3f}s)")
+
+    def _draw(self, final: bool):
+        started = time.monotonic()
+        self.render(self.text, final)
+        self._last_render = time.monotonic()
+        self.render_seconds += self._last_render - started
+        self.renders += 1
+        self._pending_chars = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunks": self.chunks,
+            "renders": self.renders,
+            "render_seconds": round(self.render_seconds, 4),
+            "chars": sum(len(part) for part in self._parts),
+        }
+
+
+def get_render_stats() -> Dict[str, Any]:
+    """Aggregate render counts and time across finished streams."""
+    with _TOTALS_LOCK:
+        totals = dict(_TOTALS)
+    totals["render_seconds"] = round(totals["render_seconds"], 4)
+    totals["renders_per_stream"] = round(totals["renders"] / totals["streams"], 1) if totals["streams"] else 0.0
+    return totals
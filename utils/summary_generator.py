@@ -1,12 +1,16 @@
 from espn_api.football import League
 from yfpy.query import YahooFantasySportsQuery
-from sleeper_wrapper import League as SleeperLeague
-from utils import espn_helper, yahoo_helper, sleeper_helper, helper
+from utils import espn_helper, yahoo_helper, sleeper_helper, sleeper_async, sleeper_transactions, season_calendar, completion_cache, token_counter
+from utils.cache_policy import week_cached
+from utils.model_config import estimate_cost
+from utils.rate_limiter import ESPN_HOST, guarded_call
+from utils.recap_pipeline import RecapStat, run_recap_stats
+from utils.stream_events import Error, TextDelta, Timing, Usage
 # from openai import OpenAI
 from openai import OpenAI
 import datetime
 import os
-import streamlit as st
+import time
 from streamlit.logger import get_logger
 LOGGER = get_logger(__name__)
 
@@ -35,14 +39,20 @@ def moderate_text(client, text):
 
 # Lateny troubleshooting: https://platform.openai.com/docs/guides/production-best-practices/improving-latencies
 
-def generate_gpt4_summary_streaming(client, summary, character_choice, trash_talk_level, model="gpt-4o-mini", summary_format="Classic"):
-    # Construct the instruction for GPT-4 based on user inputs and format choice
-    if summary_format == "Detailed":
-        instruction = f"""You will be provided a summary below containing the most recent weekly stats for a fantasy football league.
+# The format instructions never change between requests, so they are sent
+# as the system message: an identical leading prefix is what OpenAI's prompt
+# caching matches on. Everything request-specific goes in the user message,
+# league summary first so personas generated for the same league share it.
+# OpenAI only caches prompts of 1024 tokens or more, and on their own the
+# instructions are shorter (about 510 tokens for Classic and 790 for Detailed
+# with o200k_base). Caching therefore depends on the league summary: it only
+# applies once the instructions plus the summary reach 1024 tokens. That means
+# roughly 510 summary tokens for Classic and 230 for Detailed.
+DETAILED_INSTRUCTIONS = """You will be provided a summary containing the most recent weekly stats for a fantasy football league, followed by the character whose style to write in and the trash talk level (1-10) to use.
 
 CRITICAL LENGTH REQUIREMENT: You MUST write AT LEAST 1500 words. DO NOT write anything shorter than 1500 words. This is MANDATORY.
 
-Create an EPIC, comprehensive, and hilariously detailed weekly recap in the style of {character_choice}. This should be a masterpiece of fantasy football commentary - think ESPN highlight reel meets roast comedy special. Make it EXTREMELY LONG, DETAILED, FUNNY, and SNARKY.
+Create an EPIC, comprehensive, and hilariously detailed weekly recap in the style of the requested character. This should be a masterpiece of fantasy football commentary - think ESPN highlight reel meets roast comedy special. Make it EXTREMELY LONG, DETAILED, FUNNY, and SNARKY.
 
 STRUCTURE YOUR RECAP AS FOLLOWS:
 
@@ -62,7 +72,7 @@ STRUCTURE YOUR RECAP AS FOLLOWS:
    For EVERY SINGLE matchup, provide:
    - A creative nickname/storyline for each game ("The Bloodbath," "David vs Goliath," etc.)
    - Detailed play-by-play style commentary on what happened
-   - ROAST poor performances mercilessly (within trash talk level {trash_talk_level})
+   - ROAST poor performances mercilessly (within the requested trash talk level)
    - Celebrate great performances with over-the-top praise
    - Make jokes about team names, player choices, and strategies
    - Include specific point totals and what they mean
@@ -83,14 +93,14 @@ STRUCTURE YOUR RECAP AS FOLLOWS:
    - Be creative with categories and RUTHLESS with commentary
 
 6. **TRASH TALK AND PREDICTIONS**:
-   - Unleash appropriate trash talk (level {trash_talk_level}/10)
+   - Unleash appropriate trash talk (at the requested level out of 10)
    - Make bold predictions for next week
    - Call out managers by name for their successes/failures
    - End with a memorable one-liner or challenge
 
 WRITING STYLE REQUIREMENTS:
 - Write 1500-2500 words minimum - make it SUBSTANTIAL
-- Channel {character_choice} personality throughout
+- Channel the requested character's personality throughout
 - Use humor, sarcasm, and wit liberally
 - Include sports analogies and pop culture references
 - Be entertaining AF - this should be the highlight of their week
@@ -100,16 +110,13 @@ WRITING STYLE REQUIREMENTS:
 
 REMEMBER: This isn't just a summary - it's ENTERTAINMENT. Make it legendary.
 
-FINAL WARNING: If your response is under 1500 words, you have COMPLETELY FAILED. Write extensive content, add more jokes, expand every section with detailed commentary, and provide maximum entertainment value. DO NOT WRITE SHORT RESPONSES.
+FINAL WARNING: If your response is under 1500 words, you have COMPLETELY FAILED. Write extensive content, add more jokes, expand every section with detailed commentary, and provide maximum entertainment value. DO NOT WRITE SHORT RESPONSES."""
 
-Here is the provided weekly fantasy summary: {summary}"""
-    else:
-        # Classic format (existing)
-        instruction = f"""You will be provided a summary below containing the most recent weekly stats for a fantasy football league.
+CLASSIC_INSTRUCTIONS = """You will be provided a summary containing the most recent weekly stats for a fantasy football league, followed by the character whose style to write in and the trash talk level (1-10) to use.
 
 CRITICAL REQUIREMENT: You MUST write a MINIMUM of 800 words. DO NOT write anything shorter than 800 words. This is NON-NEGOTIABLE.
 
-Create a hilarious and engaging weekly recap in the style of {character_choice}. This needs to be SUBSTANTIALLY longer, funnier, and more detailed than a typical summary.
+Create a hilarious and engaging weekly recap in the style of the requested character. This needs to be SUBSTANTIALLY longer, funnier, and more detailed than a typical summary.
 
 MANDATORY LENGTH REQUIREMENTS:
 - MINIMUM 800 words - anything shorter is unacceptable
@@ -119,8 +126,8 @@ MANDATORY LENGTH REQUIREMENTS:
 - If you're under 800 words, ADD MORE CONTENT
 
 YOUR EXPANDED MISSION:
-- Channel {character_choice}'s personality with extensive humor and wit
-- Include trash talk at level {trash_talk_level}/10 (be appropriately ruthless)
+- Channel the requested character's personality with extensive humor and wit
+- Include trash talk at the requested level out of 10 (be appropriately ruthless)
 - Make this the most anticipated and entertaining part of their league experience
 
 DETAILED CONTENT REQUIREMENTS (EXPAND EACH):
@@ -142,74 +149,289 @@ MANDATORY STYLE EXPANSION:
 - Include detailed storytelling for close games and blowouts
 - Add extensive character-based commentary on every major point
 
-ABSOLUTE REQUIREMENT: If your response is under 800 words, you have FAILED. Write more content, add more jokes, expand every section, and provide extensive entertainment value.
+ABSOLUTE REQUIREMENT: If your response is under 800 words, you have FAILED. Write more content, add more jokes, expand every section, and provide extensive entertainment value."""
+
 
-Here is the provided weekly fantasy summary: {summary}"""
+def build_summary_messages(summary, character_choice, trash_talk_level, summary_format="Classic"):
+    """
+    Assemble the chat messages for a recap with the static instructions as a cacheable prefix.
+
+    The instructions are under OpenAI's 1024-token caching minimum, so the
+    prefix is only cached once the league summary makes it long enough.
 
-    # Create the messages array
-    messages = [
-        {"role": "system", "content": "You are a helpful assistant."},
-        {"role": "user", "content": instruction}
+    Args:
+        summary: League summary text
+        character_choice: Persona to write as
+        trash_talk_level: Trash talk intensity (1-10)
+        summary_format: Classic or Detailed
+
+    Returns:
+        List of chat messages
+    """
+    instructions = DETAILED_INSTRUCTIONS if summary_format == "Detailed" else CLASSIC_INSTRUCTIONS
+    request = (
+        f"Here is the provided weekly fantasy summary: {summary}\n\n"
+        f"Character: {character_choice}\n"
+        f"Trash talk level: {trash_talk_level}/10"
+    )
+    return [
+        {"role": "system", "content": instructions},
+        {"role": "user", "content": request}
     ]
 
+
+SUMMARY_REQUEST_PARAMS = {"max_tokens": 15000}  # Control response length
+
+
+def get_cached_summary(summary, character_choice, trash_talk_level, model="gpt-4o-mini", summary_format="Classic"):
+    """The completion cache entry for exactly this recap request, if any."""
+    messages = build_summary_messages(summary, character_choice, trash_talk_level, summary_format)
+    return completion_cache.get_completion(completion_cache.completion_key(model, messages, SUMMARY_REQUEST_PARAMS))
+
+
+def friendly_error_message(e):
+    """User-facing explanation of an OpenAI API error."""
+    error_str = str(e)
+    # Handle specific OpenAI API errors with user-friendly messages
+    if "insufficient_quota" in error_str or "429" in error_str:
+        return "⚠️ OpenAI API quota exceeded. Please check your billing plan or try again later."
+    elif "401" in error_str or "unauthorized" in error_str.lower():
+        return "🔐 OpenAI API key is invalid or expired. Please check your credentials."
+    elif "503" in error_str or "service_unavailable" in error_str:
+        return "🔧 OpenAI service is temporarily unavailable. Please try again in a few minutes."
+    elif "rate_limit" in error_str.lower() or "too_many_requests" in error_str.lower():
+        return "⏱️ Rate limit exceeded. Please wait a moment and try again."
+    # Generic error message for other issues
+    return f"❌ Unable to generate AI summary. Please try again later. (Error: {type(e).__name__})"
+
+
+def _finish_generation(cache_key, messages, content_chunks, usage_data, model, started, first_token_at):
+    """Build the closing Usage and Timing events and cache the completed summary."""
+    total_seconds = time.monotonic() - started
+    if usage_data:
+        # Prompt tokens served from OpenAI's prompt cache are billed at a discount
+        cached_tokens = getattr(getattr(usage_data, 'prompt_tokens_details', None), 'cached_tokens', None) or 0
+        usage = Usage(usage_data.prompt_tokens, usage_data.completion_tokens, usage_data.total_tokens,
+                      model, cached_tokens=cached_tokens)
+    else:
+        # Fallback: If no usage data captured, count tokens locally
+        LOGGER.warning("No usage data captured from streaming response")
+        estimated_input = token_counter.count_message_tokens(messages, model)
+        estimated_output = token_counter.count_tokens(''.join(content_chunks), model)
+        usage = Usage(estimated_input, estimated_output, estimated_input + estimated_output, model, estimated=True)
+
+    completion_cache.store_completion(
+        cache_key, ''.join(content_chunks), model,
+        None if usage.estimated else (usage.prompt_tokens, usage.completion_tokens, usage.total_tokens),
+    )
+    timing = Timing(
+        first_token_at - started if first_token_at is not None else None,
+        total_seconds, usage.completion_tokens, model,
+    )
+    return usage, timing
+
+
+# Typical completion length used for pre-flight estimates (~1100 / ~2000 words)
+EXPECTED_OUTPUT_TOKENS = {"Classic": 1500, "Detailed": 2700}
+
+
+def estimate_summary_cost(summary, character_choice, trash_talk_level, model="gpt-4o-mini", summary_format="Classic"):
+    """Pre-flight cost estimate for a recap, counting the exact prompt that will be sent."""
+    messages = build_summary_messages(summary, character_choice, trash_talk_level, summary_format)
+    return estimate_cost(messages, EXPECTED_OUTPUT_TOKENS.get(summary_format, 1500), model)
+
+
+def stream_summary(client, summary, character_choice, trash_talk_level, model="gpt-4o-mini", summary_format="Classic"):
+    """
+    Stream an AI recap as typed events, raising API errors instead of yielding Error.
+
+    Used by the model router, which fails over to another model on some
+    errors; other callers want generate_gpt4_summary_streaming.
+    """
+    # Create the messages array (static instructions first for prompt caching)
+    messages = build_summary_messages(summary, character_choice, trash_talk_level, summary_format)
+
+    # Identical requests are replayed from the completion cache at no cost
+    cache_key = completion_cache.completion_key(model, messages, SUMMARY_REQUEST_PARAMS)
+    cached = completion_cache.get_completion(cache_key)
+    if cached is not None:
+        LOGGER.info(f"Replaying cached {model} completion")
+        yield from completion_cache.replay(cached)
+        return
+
+    started = time.monotonic()
+    first_token_at = None
+    # Send the messages to OpenAI for analysis with selected model
+    response = client.chat.completions.create(
+        model=model,  # Use the selected model
+        messages=messages,
+        **SUMMARY_REQUEST_PARAMS,
+        stream=True,
+        stream_options={"include_usage": True}  # Enable usage tracking for cost calculation
+    )
+    
+    # Extract and yield the generated message, capturing usage data
+    usage_data = None
+    content_chunks = []
+    
+    for chunk in response:
+        # Check if this chunk contains usage information (final chunk)
+        if chunk.usage is not None:
+            usage_data = chunk.usage
+            LOGGER.debug(f"Usage data found: {usage_data}")
+        
+        # Process content chunks
+        if chunk.choices and chunk.choices[0].delta.content:
+            content = chunk.choices[0].delta.content
+            if first_token_at is None:
+                first_token_at = time.monotonic()
+            content_chunks.append(content)
+            yield TextDelta(content)
+
+    yield from _finish_generation(cache_key, messages, content_chunks, usage_data, model, started, first_token_at)
+
+
+def generate_gpt4_summary_streaming(client, summary, character_choice, trash_talk_level, model="gpt-4o-mini", summary_format="Classic"):
+    """
+    Stream an AI recap as typed events (see utils.stream_events).
+
+    Yields TextDelta events as text arrives, then Usage and Timing; on failure
+    an Error event is yielded instead of raising.
+    """
     try:
-        # Send the messages to OpenAI for analysis with selected model
-        response = client.chat.completions.create(
-            model=model,  # Use the selected model
+        yield from stream_summary(client, summary, character_choice, trash_talk_level, model, summary_format)
+    except Exception as e:
+        LOGGER.error(f"Summary generation failed: {e}")
+        yield Error(friendly_error_message(e), str(e))
+
+
+async def generate_summary_streaming_async(async_client, summary, character_choice, trash_talk_level, model="gpt-4o-mini", summary_format="Classic"):
+    """
+    AsyncOpenAI counterpart of generate_gpt4_summary_streaming, yielding the same events.
+
+    Used to generate several persona/format variants of one recap concurrently.
+    """
+    messages = build_summary_messages(summary, character_choice, trash_talk_level, summary_format)
+
+    cache_key = completion_cache.completion_key(model, messages, SUMMARY_REQUEST_PARAMS)
+    cached = completion_cache.get_completion(cache_key)
+    if cached is not None:
+        LOGGER.info(f"Replaying cached {model} completion")
+        for event in completion_cache.replay(cached, delay=0):
+            yield event
+        return
+
+    started = time.monotonic()
+    first_token_at = None
+    try:
+        response = await async_client.chat.completions.create(
+            model=model,
             messages=messages,
-            max_tokens=15000,  # Control response length
+            **SUMMARY_REQUEST_PARAMS,
             stream=True,
-            stream_options={"include_usage": True}  # Enable usage tracking for cost calculation
+            stream_options={"include_usage": True}
         )
-        
-        # Extract and yield the generated message, capturing usage data
         usage_data = None
         content_chunks = []
-        
-        for chunk in response:
-            # Debug: Log chunk structure
-            LOGGER.debug(f"Chunk type: {type(chunk)}, has usage: {hasattr(chunk, 'usage')}")
-            
-            # Check if this chunk contains usage information (final chunk)
-            if hasattr(chunk, 'usage') and chunk.usage is not None:
+        async for chunk in response:
+            if chunk.usage is not None:
                 usage_data = chunk.usage
-                LOGGER.debug(f"Usage data found: {usage_data}")
-            
-            # Process content chunks
-            if chunk.choices and hasattr(chunk.choices[0].delta, 'content') and chunk.choices[0].delta.content:
+            if chunk.choices and chunk.choices[0].delta.content:
                 content = chunk.choices[0].delta.content
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
                 content_chunks.append(content)
-                yield content
-        
-        # After streaming is complete, yield usage data if available
-        if usage_data:
-            LOGGER.debug(f"Yielding usage data: prompt={usage_data.prompt_tokens}, completion={usage_data.completion_tokens}, total={usage_data.total_tokens}")
-            yield f"__USAGE_DATA__{usage_data.prompt_tokens},{usage_data.completion_tokens},{usage_data.total_tokens}__{model}__"
-        else:
-            # Fallback: If no usage data captured, log this for debugging
-            LOGGER.warning("No usage data captured from streaming response")
-            # Try to estimate tokens as fallback
-            total_content = ''.join(content_chunks)
-            estimated_output_tokens = len(total_content) // 4  # Rough estimate
-            LOGGER.debug(f"Fallback: estimated output tokens: {estimated_output_tokens}")
-            yield f"__USAGE_DATA_FALLBACK__{estimated_output_tokens}__{model}__"
+                yield TextDelta(content)
+
+        for event in _finish_generation(cache_key, messages, content_chunks, usage_data, model, started, first_token_at):
+            yield event
 
     except Exception as e:
-        error_str = str(e)
-        # Handle specific OpenAI API errors with user-friendly messages
-        if "insufficient_quota" in error_str or "429" in error_str:
-            yield "⚠️ OpenAI API quota exceeded. Please check your billing plan or try again later."
-        elif "401" in error_str or "unauthorized" in error_str.lower():
-            yield "🔐 OpenAI API key is invalid or expired. Please check your credentials."
-        elif "503" in error_str or "service_unavailable" in error_str:
-            yield "🔧 OpenAI service is temporarily unavailable. Please try again in a few minutes."
-        elif "rate_limit" in error_str.lower() or "too_many_requests" in error_str.lower():
-            yield "⏱️ Rate limit exceeded. Please wait a moment and try again."
-        else:
-            # Generic error message for other issues
-            yield f"❌ Unable to generate AI summary. Please try again later. (Error: {type(e).__name__})"
+        LOGGER.error(f"Summary generation failed: {e}")
+        yield Error(friendly_error_message(e), str(e))
 
 # @st.cache_data(ttl=3600) - Cannot hash argument 'league'
+def build_espn_recap(league, cw):
+    """
+    Compute the ESPN recap stats under the recap deadline.
+
+    Standings, weekly scoring and match stats are required; season-long,
+    transaction, injury and bench stats are optional and may be served stale
+    or omitted when the upstream is slow.
+
+    Args:
+    - league (League): The league object.
+    - cw (int): The recap week.
+
+    Returns:
+    - RecapResult: Formatted summary lines plus any degraded stats.
+    """
+    clean = espn_helper.clean_team_name
+
+    def top_scoring_team():
+        return f"Top scoring fantasy team this week: {espn_helper.highest_scoring_team(league, cw)}"
+
+    def top_three():
+        top_teams = espn_helper.top_three_teams(league)
+        return f"Top 3 fantasy teams: {clean(top_teams[0].team_name)}, {clean(top_teams[1].team_name)}, {clean(top_teams[2].team_name)}"
+
+    def top_scorer_week():
+        player, points = espn_helper.top_scorer_of_week(league, cw)
+        return f"Top scoring NFL player of the week: {player.name} with {points} points."
+
+    def worst_scorer_week():
+        player, points = espn_helper.worst_scorer_of_week(league, cw)
+        return f"Worst scoring NFL player of the week: {player.name} with {points} points."
+
+    def top_scorer_season():
+        player, points = espn_helper.top_scorer_of_season(league)
+        return f"Top scoring NFL player of the season: {player.name} with {points} points."
+
+    def worst_scorer_season():
+        player, points = espn_helper.worst_scorer_of_season(league)
+        return f"Worst scoring NFL player of the season: {player.name} with {points} points."
+
+    def most_transactions():
+        most_trans = espn_helper.team_with_most_transactions(league)
+        return f"Fantasy Team with the most transactions: {clean(most_trans[0].team_name)} ({most_trans[1]} transactions)"
+
+    def most_injured():
+        team, count, players = espn_helper.team_with_most_injured_players(league)
+        return f"Fantasy Team with the most injured players: {clean(team.team_name)} ({count} players: {', '.join(players)})"
+
+    def highest_bench():
+        player, team = espn_helper.highest_scoring_benched_player(league, cw)
+        return f"Highest scoring benched player: {player.name} with {player.points} points (Rostered by {clean(team.team_name)})"
+
+    def lowest_start():
+        player, team = espn_helper.lowest_scoring_starting_player(league, cw)
+        return f"Lowest scoring starting player of the week: {player.name} with {player.points} points (Rostered by {clean(team.team_name)})"
+
+    def biggest_blowout():
+        match = espn_helper.biggest_blowout_match(league, cw)
+        return f"Biggest blowout match of the week: {clean(match.home_team.team_name)} ({match.home_score} points) vs {clean(match.away_team.team_name)} ({match.away_score} points)"
+
+    def closest_game():
+        match = espn_helper.closest_game_match(league, cw)
+        return f"Closest game of the week: {clean(match.home_team.team_name)} ({match.home_score} points) vs {clean(match.away_team.team_name)} ({match.away_score} points)"
+
+    stats = [
+        RecapStat("top_scoring_team", top_scoring_team, required=True),
+        RecapStat("top_three_teams", top_three, required=True),
+        RecapStat("top_scorer_of_week", top_scorer_week, required=True),
+        RecapStat("worst_scorer_of_week", worst_scorer_week, required=True),
+        RecapStat("top_scorer_of_season", top_scorer_season, season_scope=True),
+        RecapStat("worst_scorer_of_season", worst_scorer_season, season_scope=True),
+        RecapStat("most_transactions", most_transactions, season_scope=True),
+        RecapStat("most_injured_players", most_injured),
+        RecapStat("highest_scoring_benched_player", highest_bench),
+        RecapStat("lowest_scoring_starting_player", lowest_start),
+        RecapStat("biggest_blowout", biggest_blowout, required=True),
+        RecapStat("closest_game", closest_game, required=True),
+    ]
+    return run_recap_stats(stats, "espn", league.league_id, league.year, cw)
+
+
 def generate_espn_summary(league, cw):
     """
     Generate a human-friendly summary based on the league stats.
@@ -220,74 +442,15 @@ def generate_espn_summary(league, cw):
     Returns:
     - str: A human-friendly summary.
     """
-    # Extracting required data using helper functions
-    start_time = datetime.datetime.now()
-    top_teams = espn_helper.top_three_teams(league)
-    print(f"Time for top_three_teams: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    top_scorer_week = espn_helper.top_scorer_of_week(league, cw)
-    print(f"Time for top_scorer_of_week: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    worst_scorer_week = espn_helper.worst_scorer_of_week(league, cw)
-    print(f"Time for worst_scorer_of_week: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    top_scorer_szn = espn_helper.top_scorer_of_season(league)
-    print(f"Time for top_scorer_of_season: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    worst_scorer_szn = espn_helper.worst_scorer_of_season(league)
-    print(f"Time for worst_scorer_of_season: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    most_trans = espn_helper.team_with_most_transactions(league)
-    print(f"Time for team_with_most_transactions: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    most_injured = espn_helper.team_with_most_injured_players(league)
-    print(f"Time for team_with_most_injured_players: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    highest_bench = espn_helper.highest_scoring_benched_player(league, cw)
-    print(f"Time for highest_scoring_benched_player: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    lowest_start = espn_helper.lowest_scoring_starting_player(league, cw)
-    print(f"Time for lowest_scoring_starting_player: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    biggest_blowout = espn_helper.biggest_blowout_match(league, cw)
-    print(f"Time for biggest_blowout_match: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    closest_game = espn_helper.closest_game_match(league, cw)
-    print(f"Time for closest_game_match: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    start_time = datetime.datetime.now()
-    top_scoring_team_Week = espn_helper.highest_scoring_team(league, cw)
-    print(f"Time for top_scoring_team_string: {(datetime.datetime.now() - start_time).total_seconds()} seconds")
-    
-    # Formatting the summary
-    summary = f"""
-    - Top scoring fantasy team this week: {top_scoring_team_Week} 
-    - Top 3 fantasy teams: {espn_helper.clean_team_name(top_teams[0].team_name)}, {espn_helper.clean_team_name(top_teams[1].team_name)}, {espn_helper.clean_team_name(top_teams[2].team_name)}
-    - Top scoring NFL player of the week: {top_scorer_week[0].name} with {top_scorer_week[1]} points.
-    - Worst scoring NFL player of the week: {worst_scorer_week[0].name} with {worst_scorer_week[1]} points.
-    - Top scoring NFL player of the season: {top_scorer_szn[0].name} with {top_scorer_szn[1]} points.
-    - Worst scoring NFL player of the season: {worst_scorer_szn[0].name} with {worst_scorer_szn[1]} points.
-    - Fantasy Team with the most transactions: {espn_helper.clean_team_name(most_trans[0].team_name)} ({most_trans[1]} transactions)
-    - Fantasy Team with the most injured players: {espn_helper.clean_team_name(most_injured[0].team_name)} ({most_injured[1]} players: {', '.join(most_injured[2])})
-    - Highest scoring benched player: {highest_bench[0].name} with {highest_bench[0].points} points (Rostered by {espn_helper.clean_team_name(highest_bench[1].team_name)})
-    - Lowest scoring starting player of the week: {lowest_start[0].name} with {lowest_start[0].points} points (Rostered by {espn_helper.clean_team_name(lowest_start[1].team_name)})
-    - Biggest blowout match of the week: {espn_helper.clean_team_name(biggest_blowout.home_team.team_name)} ({biggest_blowout.home_score} points) vs {espn_helper.clean_team_name(biggest_blowout.away_team.team_name)} ({biggest_blowout.away_score} points)
-    - Closest game of the week: {espn_helper.clean_team_name(closest_game.home_team.team_name)} ({closest_game.home_score} points) vs {espn_helper.clean_team_name(closest_game.away_team.team_name)} ({closest_game.away_score} points)
-    """
-    
-    return summary.strip()
+    return build_espn_recap(league, cw).to_summary()
 
-@st.cache_data(ttl=3600)
+
+def _espn_summary_cacheable(result):
+    """Only cache complete ESPN recaps; degraded ones are recomputed on the next request."""
+    summary, debug_info = result
+    return debug_info != "Error occurred during validation" and "Degraded:" not in debug_info
+
+@week_cached("espn", cache_if=_espn_summary_cacheable)
 def get_espn_league_summary(league_id, espn2, SWID):
     # Fetch data from ESPN Fantasy API and compute statistics   
     start_time_league_connect = datetime.datetime.now() 
@@ -297,7 +460,8 @@ def get_espn_league_summary(league_id, espn2, SWID):
     swid = SWID
     # Initialize league & current week
     try:
-        league = League(league_id=league_id, year=year, espn_s2=espn_s2, swid=swid)
+        # League() issues several requests (settings, teams, rosters) while loading
+        league = guarded_call(ESPN_HOST, League, league_id=league_id, year=year, espn_s2=espn_s2, swid=swid, tokens=3)
     except Exception as e:
         return str(e), "Error occurred during validation"
     end_time_league_connect = datetime.datetime.now()
@@ -305,14 +469,17 @@ def get_espn_league_summary(league_id, espn2, SWID):
     cw = league.current_week-1
     # Generate summary
     start_time_summary = datetime.datetime.now()
-    summary = generate_espn_summary(league, cw)
+    recap = build_espn_recap(league, cw)
+    summary = recap.to_summary()
     end_time_summary = datetime.datetime.now()
     summary_duration = (end_time_summary - start_time_summary).total_seconds()
     # Generage debugging information, placeholder for now
-    debug_info = "Summary: " + summary + " ~~~Timings~~~ " + f"League Connect Duration: {league_connect_duration} seconds " + f"Summary Duration: {summary_duration} seconds "
+    debug_info = "Summary: " + summary + " ~~~Timings~~~ " + f"League Connect Duration: {league_connect_duration} seconds " + f"Summary Duration: {summary_duration} seconds " + f"Stat Durations: {recap.timings} "
+    if recap.stale or recap.omitted:
+        debug_info += f"Degraded: stale={recap.stale} omitted={recap.omitted} "
     return summary, debug_info
 
-@st.cache_data(ttl=3600)
+@week_cached("yahoo", key_args=lambda league_id, auth_path: (league_id,))
 def get_yahoo_league_summary(league_id, auth_path):    
     league_id = league_id
     LOGGER.info(f"League id: {league_id}")
@@ -328,25 +495,25 @@ def get_yahoo_league_summary(league_id, auth_path):
     return recap
 
 
-@st.cache_data(ttl=3600)
+@week_cached("sleeper")
 def generate_sleeper_summary(league_id):
-    # Initialize the Sleeper API League object
-    league = SleeperLeague(league_id)
-    current_date_today = datetime.datetime.now()
-    week = helper.get_current_week(current_date_today)-1 #force to always be most recent completed week
-    # Get necessary data from the league
-    rosters = league.get_rosters()
-    users = league.get_users()
-    matchups = league.get_matchups(week)
-    standings = league.get_standings(rosters, users)
+    week = season_calendar.recap_week() #force to always be most recent completed week
+    if week < 1:
+        return "No completed weeks yet this season - check back after week 1."
+    # Get necessary data from the league (rosters, users and matchups are fetched concurrently)
+    league_data = sleeper_async.fetch_league_week(league_id, week)
+    rosters = league_data['rosters']
+    users = league_data['users']
+    matchups = league_data['matchups']
+    standings = sleeper_helper.get_standings(rosters, users)
 
     # Get weekly players data from public json file
     players_url = "https://raw.githubusercontent.com/jeisey/commish/main/players_data.json"
     players_data = sleeper_helper.load_player_data(players_url)
 
     # Generate mappings
-    user_team_mapping = league.map_users_to_team_name(users)
-    roster_owner_mapping = league.map_rosterid_to_ownerid(rosters)
+    user_team_mapping = sleeper_helper.map_users_to_team_name(users)
+    roster_owner_mapping = sleeper_helper.map_rosterid_to_ownerid(rosters)
     
     # Generate scoreboards for the week
     scoreboards = sleeper_helper.calculate_scoreboards(matchups, user_team_mapping, roster_owner_mapping)
@@ -372,8 +539,20 @@ def generate_sleeper_summary(league_id):
     # 7. Closest Match of the Week
     close_teams, point_differential_close = sleeper_helper.closest_match_of_week(scoreboards)
 
-    # 8. Team with Most Moves (this always seems to be zero, UPDATE)
-    # team_most_moves, most_moves = sleeper_helper.team_with_most_moves(rosters, user_team_mapping, roster_owner_mapping)
+    # 8. Team with Most Moves (season-to-date, from ingested transactions including the live week)
+    try:
+        move_totals = sleeper_transactions.get_move_totals(league_id, week + 1)
+        team_most_moves, most_moves = sleeper_helper.team_with_most_moves(move_totals, user_team_mapping, roster_owner_mapping)
+    except Exception as e:
+        LOGGER.warning(f"Sleeper transactions unavailable for league {league_id}: {e}")
+        team_most_moves, most_moves = None, {}
+    most_moves_line = ""
+    if team_most_moves and most_moves:
+        most_moves_line = (
+            f"🔄 Most Moves: {team_most_moves} with {most_moves['moves']} moves "
+            f"({most_moves['adds']} adds, {most_moves['drops']} drops, {most_moves['trades']} trades, "
+            f"${most_moves['faab_spent']} FAAB spent)\n"
+        )
     
     # 9. Team on Hottest Streak
     hottest_streak_team, longest_streak = sleeper_helper.team_on_hottest_streak(rosters, user_team_mapping, roster_owner_mapping)
@@ -414,6 +593,7 @@ def generate_sleeper_summary(league_id):
         f"💥 Biggest Blowout: {blowout_teams[0]} vs {blowout_teams[1]} (Point Differential: {round(point_differential_blowout, 2)})\n"
         f"⚡ Closest Match: {close_teams[0]} vs {close_teams[1]} (Point Differential: {round(point_differential_close, 2)})\n"
         f"🔥 Hottest Streak: {hottest_streak_team} with a {longest_streak} game win streak\n"
+        f"{most_moves_line}"
     )
     LOGGER.info(f"Sleeper Summary Generated: \n{summary}")
 
@@ -0,0 +1,170 @@
+"""
+Token Counting for Cost Estimates
+
+Cost estimates and the usage fallback used to assume four characters per
+token, which is badly off for emoji-heavy summaries ("🏆 WEEK ..."). Counts
+here come from the model's own tokenizer via tiktoken: encoders are loaded
+lazily, once per encoding per process, and counts of the static prompt
+instructions are memoized.
+
+The o200k_base and cl100k_base BPE files ship in data/tiktoken_cache
+(COMMISH_TIKTOKEN_CACHE_DIR) and their encodings are built from those files
+directly, with their hashes verified, so counting works offline. If tiktoken
+itself is unavailable, counts fall back to a byte-aware heuristic instead of
+failing, and that is logged once.
+"""
+
+import functools
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+
+from streamlit.logger import get_logger
+
+LOGGER = get_logger(__name__)
+
+TIKTOKEN_CACHE_DIR = os.environ.get(
+    "COMMISH_TIKTOKEN_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "tiktoken_cache"),
+)
+
+# Models tiktoken may not know yet, by prefix
+MODEL_ENCODINGS = {
+    "gpt-5": "o200k_base",
+    "gpt-4o": "o200k_base",
+    "o3": "o200k_base",
+    "o4": "o200k_base",
+    "gpt-4": "cl100k_base",
+    "gpt-3.5": "cl100k_base",
+}
+DEFAULT_ENCODING = "o200k_base"
+# Bundled encodings (<TIKTOKEN_CACHE_DIR>/<name>.tiktoken): file hash, split pattern
+# and special tokens, as tiktoken_ext.openai_public defines them
+BUNDLED_ENCODINGS = {
+    "o200k_base": {
+        "sha256": "446a9538cb6c348e3516120d7c08b09f57c36495e2acfffe59a5bf8b0cfb1a2d",
+        "pat_str": "|".join([
+            r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]*[\p{Ll}\p{Lm}\p{Lo}\p{M}]+(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+            r"""[^\r\n\p{L}\p{N}]?[\p{Lu}\p{Lt}\p{Lm}\p{Lo}\p{M}]+[\p{Ll}\p{Lm}\p{Lo}\p{M}]*(?i:'s|'t|'re|'ve|'m|'ll|'d)?""",
+            r"""\p{N}{1,3}""",
+            r""" ?[^\s\p{L}\p{N}]+[\r\n/]*""",
+            r"""\s*[\r\n]+""",
+            r"""\s+(?!\S)""",
+            r"""\s+""",
+        ]),
+        "special_tokens": {"<|endoftext|>": 199999, "<|endofprompt|>": 200018},
+    },
+    "cl100k_base": {
+        "sha256": "223921b76ee99bde995b7ff738513eef100fb51d18c93597a113bcffe865b2a7",
+        "pat_str": r"""'(?i:[sdmt]|ll|ve|re)|[^\r\n\p{L}\p{N}]?+\p{L}++|\p{N}{1,3}+| ?[^\s\p{L}\p{N}]++[\r\n]*+|\s++$|\s*[\r\n]|\s+(?!\S)|\s""",
+        "special_tokens": {
+            "<|endoftext|>": 100257,
+            "<|fim_prefix|>": 100258,
+            "<|fim_middle|>": 100259,
+            "<|fim_suffix|>": 100260,
+            "<|endofprompt|>": 100276,
+        },
+    },
+}
+
+# Chat formatting overhead: tokens per message and for priming the reply
+TOKENS_PER_MESSAGE = 3
+REPLY_PRIMING_TOKENS = 3
+
+_ENCODERS: Dict[str, object] = {}
+_ENCODERS_LOCK = threading.Lock()
+_UNAVAILABLE = object()
+_fallback_logged = False
+
+
+def _encoding_name(model: str) -> str:
+    for prefix, encoding in MODEL_ENCODINGS.items():
+        if model.startswith(prefix):
+            return encoding
+    return DEFAULT_ENCODING
+
+
+def _load_encoding(name: str):
+    """Build an encoding from its bundled BPE file, or let tiktoken fetch one that isn't bundled."""
+    import tiktoken
+    from tiktoken.load import load_tiktoken_bpe
+    spec = BUNDLED_ENCODINGS.get(name)
+    path = os.path.join(TIKTOKEN_CACHE_DIR, f"{name}.tiktoken")
+    if spec is None or not os.path.isfile(path):
+        return tiktoken.get_encoding(name)
+    return tiktoken.Encoding(
+        name=name,
+        pat_str=spec["pat_str"],
+        mergeable_ranks=load_tiktoken_bpe(path, expected_hash=spec["sha256"]),
+        special_tokens=spec["special_tokens"],
+    )
+
+
+def _get_encoder(model: str):
+    """The tokenizer for a model, or None if tiktoken can't load it."""
+    global _fallback_logged
+    name = _encoding_name(model)
+    with _ENCODERS_LOCK:
+        encoder = _ENCODERS.get(name)
+        if encoder is None:
+            try:
+                encoder = _load_encoding(name)
+            except Exception as e:
+                if not _fallback_logged:
+                    LOGGER.warning(f"Tokenizer {name} unavailable, token counts are heuristic estimates: {e}")
+                    _fallback_logged = True
+                encoder = _UNAVAILABLE
+            _ENCODERS[name] = encoder
+    return None if encoder is _UNAVAILABLE else encoder
+
+
+def heuristic_tokens(text: str) -> int:
+    """
+    Tokenizer-free estimate: about four ASCII characters per token, while
+    non-ASCII characters (emoji, accents) cost roughly a token per two UTF-8 bytes.
+    """
+    ascii_chars = sum(1 for char in text if ord(char) < 128)
+    other_bytes = len(text.encode("utf-8")) - ascii_chars
+    return math.ceil(ascii_chars / 4 + other_bytes / 2)
+
+
+def count_tokens(text: str, model: str) -> int:
+    """Number of tokens the model's tokenizer produces for text."""
+    if not text:
+        return 0
+    encoder = _get_encoder(model)
+    if encoder is None:
+        return heuristic_tokens(text)
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+@functools.lru_cache(maxsize=64)
+def count_static_tokens(text: str, model: str) -> int:
+    """count_tokens for text that never changes (e.g. prompt instructions), memoized."""
+    return count_tokens(text, model)
+
+
+def count_message_tokens(messages: List[Dict[str, str]], model: str,
+                         static_roles: Optional[set] = None) -> int:
+    """
+    Prompt tokens of a chat request, including per-message formatting overhead.
+
+    Args:
+        messages: Chat messages
+        model: Model id
+        static_roles: Roles whose content is a fixed template (counted with the memo);
+            defaults to the system message
+    """
+    static_roles = {"system"} if static_roles is None else static_roles
+    total = REPLY_PRIMING_TOKENS
+    for message in messages:
+        counter = count_static_tokens if message["role"] in static_roles else count_tokens
+        total += TOKENS_PER_MESSAGE + counter(message["content"], model)
+    return total
+
+
+def tokenizer_status() -> Dict[str, str]:
+    """Which encodings are loaded and whether each is exact or heuristic."""
+    with _ENCODERS_LOCK:
+        return {name: "heuristic" if encoder is _UNAVAILABLE else "tiktoken" for name, encoder in _ENCODERS.items()}
@@ -1,5 +1,6 @@
 from yfpy.query import YahooFantasySportsQuery
 from streamlit.logger import get_logger
+from utils.rate_limiter import YAHOO_HOST, guarded_call
 LOGGER = get_logger(__name__)
 
 def get_most_recent_week(sc):
@@ -13,7 +14,7 @@ def get_most_recent_week(sc):
     - int: The most recently completed week.
     """
     try:
-        league_info = sc.get_league_info()
+        league_info = guarded_call(YAHOO_HOST, sc.get_league_info)
         completed_week = league_info.current_week - 1
         LOGGER.info(f"Most recent week retrieved successfully: {completed_week}")
         return completed_week
@@ -64,7 +65,7 @@ def find_extreme_scorers_and_banged_up_team(sc, team_ids, week=3):
     
     for team_id, team_name in team_ids.items():
         # Get player stats for the team
-        players_stats = sc.get_team_roster_player_stats_by_week(team_id, chosen_week=week)
+        players_stats = guarded_call(YAHOO_HOST, sc.get_team_roster_player_stats_by_week, team_id, chosen_week=week)
         
         banged_up_count = 0  # Counter for the number of 'banged up' players in the current team
         
@@ -133,7 +134,7 @@ def analyze_weekly_performance(sc, chosen_week):
     Returns:
     - dict: A dictionary containing the analysis results.
     """
-    matchups = sc.get_league_matchups_by_week(chosen_week)
+    matchups = guarded_call(YAHOO_HOST, sc.get_league_matchups_by_week, chosen_week)
     
     highest_scoring_team = None
     biggest_blowout = {"teams": None, "point_diff": 0}
@@ -206,7 +207,7 @@ def generate_weekly_recap(sc, week):
     - str: A string containing the weekly recap.
     """
     # Get relevant data
-    teams = sc.get_league_teams()
+    teams = guarded_call(YAHOO_HOST, sc.get_league_teams)
     team_ids = extract_team_ids(teams)
     highest_scorer, lowest_scorer, highest_scorer_bench, lowest_scorer_started, most_banged_up_team = find_extreme_scorers_and_banged_up_team(sc, team_ids, week)
     analysis_result = analyze_weekly_performance(sc, week)
@@ -230,7 +231,7 @@ def generate_weekly_recap(sc, week):
 
 # Helper function to get top teams string
 def get_top_teams_string(sc):
-    standings_data = sc.get_league_standings()
+    standings_data = guarded_call(YAHOO_HOST, sc.get_league_standings)
     top_3_teams = sorted(standings_data.teams, key=lambda x: x.team_standings.rank)[:3]
     top_teams_string = ", ".join([f"{team.name.decode('utf-8')} ({ordinal(team.team_standings.rank)} place - {team.team_points.total} points)" for team in top_3_teams])
     return f"{top_teams_string}"